@@ -1,193 +1,146 @@
 #!/usr/bin/env python3
 """
-PQC CRL Generator v2 - Uses oqsprovider.dll directly via ctypes
-Bypasses OpenSSL STORE entirely. Calls OQS_SIG_ml_dsa_87_sign directly.
+PQC CRL Generator v2 - Signs ML-DSA-87 directly via ctypes
+Bypasses OpenSSL STORE entirely. Signing goes through the fastest backend
+in signer_backends.py (liboqs, or OpenSSL EVP with ML-DSA).
+
+--mode publish keeps running: it reissues the CRL when index.txt changes
+or nextUpdate approaches and serves it over HTTP with ETag and
+If-Modified-Since revalidation (see CRLPublisher).
+
+--classical-key signs ML-DSA-87 + ECDSA/RSA composite CRLs instead, both
+component signatures made concurrently (CompositeBackend).
+
+--sign-mode external-mu / hash stream the TBSCertList to disk while its
+FIPS 204 mu is computed, so memory and signing time no longer grow with
+the revoked list (see issue_crl_streamed).
 """
 
-import ctypes
-import ctypes.util
 import os
 import sys
+import json
+import mmap
+import time
 import base64
+import hashlib
+import argparse
+import functools
+import threading
 from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from asn1crypto import pem as asn1_pem, core as asn1core, x509 as asn1x509
 
+# Shared index.txt parser lives with the OCSP responder in <repo>/scripts
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "scripts")
+sys.path.insert(0, os.path.normpath(SCRIPTS_DIR))
+from index_parser import REASON_KEYWORDS, load_columns
+from signing_pool import SigningPool
+from chain_verifier import STATUS_UNCHECKED, STATUS_UNSUPPORTED, verify_crl_file
+import ocsp_der
+from signer_backends import (COMPOSITE_OIDS, BackendUnavailable, MuHasher, compose, mldsa_tr,
+                             open_backend, select_backend)
+from http_cache import not_modified
+
 # ── CONFIGURATION ────────────────────────────────────────────────────────────
 BASE_DIR    = r"C:\Users\user\Desktop\PQC\pqc-lab\lab-work\openssl-pqc-stepbystep-lab\fipsqs\03_fips_quantum_ca_intermediate\intermediate"
 INDEX_FILE  = os.path.join(BASE_DIR, "index.txt")
 KEY_FILE    = os.path.join(BASE_DIR, "private", "intermediate_ca.key")
 CERT_FILE   = os.path.join(BASE_DIR, "certs", "intermediate_ca.crt")
 OUTPUT_CRL  = os.path.join(BASE_DIR, "intermediate.crl.pem")
-OQS_DLL     = r"C:\Ruby33-x64\msys64\mingw64\lib\ossl-modules\oqsprovider.dll"
+OUTPUT_DELTA_CRL = os.path.join(BASE_DIR, "intermediate.delta.crl.pem")
+CRL_NUMBER_FILE  = os.path.join(BASE_DIR, "crlnumber")
+SERIAL_FILE      = os.path.join(BASE_DIR, "serial")
+BASE_STATE_FILE  = os.path.join(BASE_DIR, "crl_base_state.json")
+SIGNING_BACKENDS = ("liboqs", "openssl")   # timed at start-up, fastest wins
+CLASSICAL_KEY_FILE = None   # ECDSA/RSA key (PEM): sign ML-DSA-87 + classical composites
 
 # ML-DSA-87 parameters (from FIPS 204)
-MLDSA87_SK_LEN  = 4896   # secret key bytes
-MLDSA87_SIG_LEN = 4627   # max signature bytes
-MLDSA87_OID     = "2.16.840.1.101.3.4.3.18"
+MLDSA87_OID     = "2.16.840.1.101.3.4.3.19"      # id-ml-dsa-87
+HASHMLDSA87_OID = "2.16.840.1.101.3.4.3.34"      # id-hash-ml-dsa-87-with-sha512
+
+# "pure" signs the TBS held in memory. "external-mu" streams it to disk and
+# signs only its 64-byte mu (same ML-DSA-87 signature); "hash" streams it
+# and signs HashML-DSA-87 with SHA-512 (different algorithm OID).
+SIGN_MODES = ("pure", "external-mu", "hash")
+SIGN_MODE  = "pure"
+STREAM_CHUNK = 57 * 1024      # whole base64 lines per read when writing PEM
 
 CRL_DAYS = 30
+
+# Base+delta cycle: a full base CRL every BASE_CRL_HOURS, and in between a
+# delta CRL every DELTA_CRL_HOURS carrying only changes since that base
+BASE_CRL_HOURS  = 24 * 7
+DELTA_CRL_HOURS = 1
+REASON_REMOVE_FROM_CRL = 8
+
+# Partitioned CRLs: revoked entries are sharded into several CRLs, each
+# scoped by an Issuing Distribution Point and signed in its own process
+PARTITION_DIR        = os.path.join(BASE_DIR, "crl_partitions")
+PARTITION_MANIFEST   = os.path.join(PARTITION_DIR, "manifest.json")
+PARTITION_URI        = "http://crl.pqclab.example.com/intermediate-{index}.crl"
+PARTITION_COUNT      = 8          # shards in "hash" mode
+PARTITION_RANGE_SIZE = 0x10000    # serials per shard in "range" mode
+PARTITION_MAX_RANGE_SHARDS = 4096 # more means random serials: use "hash" mode
+
+# Publisher daemon: full CRL served as DER at PUBLISH_PATH, PEM at
+# PUBLISH_PATH + ".pem"; reissued when index.txt changes (checked every
+# PUBLISH_POLL_SECONDS) or PUBLISH_REFRESH_HOURS before nextUpdate
+PUBLISH_HOST          = "127.0.0.1"
+PUBLISH_PORT          = 8580
+PUBLISH_PATH          = "/intermediate.crl"
+PUBLISH_POLL_SECONDS  = 30
+PUBLISH_REFRESH_HOURS = 24
 # ─────────────────────────────────────────────────────────────────────────────
 
-def load_oqs_dll():
-    """Load oqsprovider.dll and set up ML-DSA-87 sign function."""
-    print(f"[*] Loading OQS DLL: {OQS_DLL}")
-    try:
-        mingw_bin = r"C:\Ruby33-x64\msys64\mingw64\bin"
-        os.environ["PATH"] = mingw_bin + os.pathsep + os.environ.get("PATH", "")
-        # Pre-load libcrypto so oqsprovider can find its dependency
-        libcrypto_path = os.path.join(mingw_bin, "libcrypto-3-x64.dll")
-        ctypes.CDLL(libcrypto_path)
-        print(f"[*] libcrypto pre-loaded")
-        lib = ctypes.CDLL(OQS_DLL)
-        print(f"[✓] DLL loaded successfully")
-        return lib
-    except OSError as e:
-        print(f"[!] Failed to load DLL: {e}")
-        raise
-
-def setup_sign_function(lib):
-    """Configure OQS_SIG_ml_dsa_87_sign ctypes signature."""
-    # int OQS_SIG_ml_dsa_87_sign(
-    #     uint8_t *sig, size_t *siglen,
-    #     const uint8_t *msg, size_t msglen,
-    #     const uint8_t *sk
-    # )
-    fn = lib.OQS_SIG_ml_dsa_87_sign
-    fn.restype  = ctypes.c_int
-    fn.argtypes = [
-        ctypes.POINTER(ctypes.c_uint8),   # sig output buffer
-        ctypes.POINTER(ctypes.c_size_t),  # siglen (in/out)
-        ctypes.POINTER(ctypes.c_uint8),   # message
-        ctypes.c_size_t,                  # message length
-        ctypes.POINTER(ctypes.c_uint8),   # secret key
-    ]
-    return fn
-
-def extract_private_key_bytes(key_file):
-    """
-    Extract raw ML-DSA-87 secret key bytes from PKCS#8 PEM file.
-    
-    PKCS#8 structure:
-      SEQUENCE {
-        INTEGER 0                    (version)
-        SEQUENCE { OID mldsa87 }     (algorithmIdentifier)
-        OCTET STRING {               (privateKey)
-          SEQUENCE {
-            OCTET STRING <32-byte seed>
-            OCTET STRING <4864-byte expanded key>  <- this is the full SK
-          }
-        }
-      }
-    
-    liboqs expects the full expanded secret key (4896 bytes).
-    """
-    print(f"[*] Extracting private key from: {key_file}")
-    
+def open_signer(key_file, backend=None, classical_key=None):
+    """ML-DSA-87 signer for key_file: the named backend spec, or the fastest.
+    With classical_key, a composite signer over both keys."""
     with open(key_file, "rb") as f:
-        key_data = f.read()
-    
-    # Decode PEM
-    if b"BEGIN" in key_data:
-        _, _, der = asn1_pem.unarmor(key_data)
-    else:
-        der = key_data
-    
-    # Scan DER directly for the 4896-byte ML-DSA-87 secret key
-    # oqsprovider encodes it as OCTET STRING: 04 82 13 20 <4896 bytes>
-    print(f"[*] Scanning DER for {MLDSA87_SK_LEN}-byte key material...")
-    
-    # Try OCTET STRING with 3-byte length: 04 82 13 20 (4896 = 0x1320)
-    target = bytes([0x04, 0x82, 0x13, 0x20])
-    idx = der.find(target)
-    if idx != -1:
-        candidate = der[idx + 4: idx + 4 + MLDSA87_SK_LEN]
-        if len(candidate) == MLDSA87_SK_LEN:
-            print(f"[*] Found SK at DER offset {idx}")
-            return candidate
-
-    # Try seed+expanded pattern:
-    # seed = 04 20 <32 bytes>, expanded = 04 82 13 00 <4864 bytes>
-    target2 = bytes([0x04, 0x82, 0x13, 0x00])
-    idx2 = der.find(target2)
-    if idx2 != -1:
-        chunk = der[max(0, idx2-40):idx2]
-        seed_pos = chunk.rfind(bytes([0x04, 0x20]))
-        if seed_pos != -1:
-            abs_seed = max(0, idx2-40) + seed_pos
-            seed = der[abs_seed + 2: abs_seed + 34]
-            expanded = der[idx2 + 4: idx2 + 4 + 4864]
-            full_sk = seed + expanded
-            if len(full_sk) == MLDSA87_SK_LEN:
-                print(f"[*] Assembled SK from seed+expanded ({len(full_sk)} bytes)")
-                return full_sk
-
-    # Debug output
-    print(f"[!] DER length: {len(der)} bytes, first bytes: {der[:20].hex()}")
-    octet_strs = []
-    i = 0
-    while i < len(der) - 4:
-        if der[i] == 0x04 and der[i+1] == 0x82:
-            length = (der[i+2] << 8) | der[i+3]
-            if length > 100:
-                octet_strs.append((i, length))
-        i += 1
-    print(f"[!] Large OCTET STRINGs: {octet_strs}")
-    raise ValueError(f"Could not find {MLDSA87_SK_LEN}-byte ML-DSA-87 secret key in key file")
-
-def sign_tbs(lib, tbs_der, sk_bytes):
-    """Sign TBS bytes using OQS_SIG_ml_dsa_87_sign via ctypes."""
-    sign_fn = setup_sign_function(lib)
-    
-    sig_buf = (ctypes.c_uint8 * MLDSA87_SIG_LEN)()
-    sig_len = ctypes.c_size_t(MLDSA87_SIG_LEN)
-    
-    msg_buf = (ctypes.c_uint8 * len(tbs_der))(*tbs_der)
-    sk_buf  = (ctypes.c_uint8 * len(sk_bytes))(*sk_bytes)
-    
-    print(f"[*] Calling OQS_SIG_ml_dsa_87_sign ({len(tbs_der)} byte TBS, {len(sk_bytes)} byte SK)...")
-    rc = sign_fn(sig_buf, ctypes.byref(sig_len), msg_buf, len(tbs_der), sk_buf)
-    
-    if rc != 0:
-        raise RuntimeError(f"OQS_SIG_ml_dsa_87_sign failed with return code {rc}")
-    
-    actual_len = sig_len.value
-    signature = bytes(sig_buf[:actual_len])
-    print(f"[✓] Signature generated: {actual_len} bytes")
+        key_pem = f.read()
+    classical_pem = None
+    if classical_key:
+        with open(classical_key, "rb") as f:
+            classical_pem = f.read()
+    if backend:
+        if classical_pem and backend.partition(":")[0] == "composite":
+            key_pem += classical_pem
+        return open_backend(backend, key_pem)
+    print(f"[*] Timing signing backends for: {key_file}")
+    signer = select_backend(key_pem, SIGNING_BACKENDS)
+    if classical_pem:
+        signer = compose(signer, classical_pem)
+        print(f"[✓] Composite signing: {signer.algorithm}")
+    return signer
+
+def sign_tbs(signer, tbs_der):
+    """Sign TBS DER with an ML-DSA-87 (or composite) signing backend.
+
+    tbs_der may be any bytes-like object (the bytearray it was built in, a
+    memoryview, an mmap); the backends pass it to C without copying.
+    """
+    print(f"[*] Signing {len(tbs_der)} byte TBS ({signer.name})...")
+    signature = signer.sign(tbs_der)
+    print(f"[✓] Signature generated: {len(signature)} bytes")
     return signature
 
 def parse_index(index_path):
     """Parse OpenSSL CA index.txt, return list of revoked entries."""
-    reason_map = {
-        "unspecified": 0, "keyCompromise": 1, "cACompromise": 2,
-        "affiliationChanged": 3, "superseded": 4, "cessationOfOperation": 5,
-        "certificateHold": 6, "removeFromCRL": 8, "privilegeWithdrawn": 9,
-        "aACompromise": 10,
-    }
+    cols = load_columns(index_path)
+    times = {}
     revoked = []
-    with open(index_path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split("\t")
-            if len(parts) < 6 or parts[0] != "R":
-                continue
-            rev_field = parts[2]
-            if "," in rev_field:
-                rev_date_str, reason_str = rev_field.split(",", 1)
-            else:
-                rev_date_str, reason_str = rev_field, "unspecified"
-            serial_hex = parts[3]
-            try:
-                rev_time = datetime.strptime(rev_date_str, "%y%m%d%H%M%SZ").replace(tzinfo=timezone.utc)
-            except ValueError:
-                rev_time = datetime.strptime(rev_date_str, "%Y%m%d%H%M%SZ").replace(tzinfo=timezone.utc)
-            revoked.append({
-                "serial": int(serial_hex, 16),
-                "revocation_time": rev_time,
-                "reason": reason_str.strip(),
-                "reason_int": reason_map.get(reason_str.strip(), 0),
-            })
+    for i in cols.revoked_rows():
+        epoch = cols.rev_times[i]
+        rev_time = times.get(epoch)
+        if rev_time is None:
+            rev_time = times[epoch] = datetime.fromtimestamp(epoch, timezone.utc)
+        reason = cols.reasons[i]
+        revoked.append({
+            "serial": cols.serials[i],
+            "revocation_time": rev_time,
+            "reason": REASON_KEYWORDS.get(reason, "unspecified"),
+            "reason_int": reason,
+        })
     return revoked
 
 # ── DER helpers ──────────────────────────────────────────────────────────────
@@ -212,7 +165,12 @@ def der_len(n):
     if n < 0x80:   return bytes([n])
     if n < 0x100:  return bytes([0x81, n])
     if n < 0x10000: return bytes([0x82, n >> 8, n & 0xff])
-    return bytes([0x83, n >> 16, (n >> 8) & 0xff, n & 0xff])
+    if n < 0x1000000: return bytes([0x83, n >> 16, (n >> 8) & 0xff, n & 0xff])
+    size = (n.bit_length() + 7) // 8
+    return bytes([0x80 | size]) + n.to_bytes(size, "big")
+
+def header(t, length): return bytes([t]) + der_len(length)
+def tlv_len(content_len): return 1 + len(der_len(content_len)) + content_len
 
 def tag(t, content):   return bytes([t]) + der_len(len(content)) + content
 def seq(c):            return tag(0x30, c)
@@ -236,9 +194,13 @@ def make_extension(extn_oid, critical, value_der):
     parts += octet_str(value_der)
     return seq(parts)
 
-def build_tbs_crl(issuer_cert_path, revoked_list, now, next_update, crl_num):
-    """Build TBSCertList DER."""
-    # Load issuer cert
+def issuing_distribution_point(uri):
+    """IssuingDistributionPoint { distributionPoint fullName { URI } }"""
+    general_names = tag(0xa0, tag(0x86, uri.encode()))   # fullName [0] { uniformResourceIdentifier [6] }
+    return seq(tag(0xa0, general_names))                  # distributionPoint [0]
+
+def load_issuer(issuer_cert_path):
+    """Return (issuer Name DER, Subject Key Identifier or None) for the CA cert."""
     with open(issuer_cert_path, "rb") as f:
         cert_data = f.read()
     if b"BEGIN" in cert_data:
@@ -261,23 +223,10 @@ def build_tbs_crl(issuer_cert_path, revoked_list, now, next_update, crl_num):
                     ski_bytes = bytes(ski_hex)
     except Exception:
         pass
+    return issuer_der, ski_bytes
 
-    # AlgorithmIdentifier for ML-DSA-87
-    alg_id = seq(oid(MLDSA87_OID))
-
-    # Build revoked certificates block
-    rev_items = b""
-    for r in revoked_list:
-        reason_ext = make_extension("2.5.29.21", False, enumerated(r["reason_int"]))
-        rc = seq(
-            integer(r["serial"]) +
-            gentime(r["revocation_time"]) +
-            seq(reason_ext)
-        )
-        rev_items += rc
-    revoked_block = tag(0x30, rev_items)
-
-    # Extensions
+def crl_extensions(crl_num, ski_bytes, delta_base=None, idp_uri=None):
+    """The [0] crlExtensions block."""
     crl_num_ext = make_extension("2.5.29.20", False, integer(crl_num))
     if ski_bytes:
         aki_value = seq(tag(0x80, ski_bytes))
@@ -285,42 +234,270 @@ def build_tbs_crl(issuer_cert_path, revoked_list, now, next_update, crl_num):
         exts_content = crl_num_ext + aki_ext
     else:
         exts_content = crl_num_ext
-    extensions = explicit(0, seq(exts_content))
-
-    # TBSCertList
-    tbs_content = (
-        alg_id +
-        issuer_der +
-        gentime(now) +
-        gentime(next_update) +
-        revoked_block +
-        extensions
-    )
-    return seq(tbs_content), alg_id
+    if delta_base is not None:
+        exts_content += make_extension("2.5.29.27", True, integer(delta_base))
+    if idp_uri is not None:
+        exts_content += make_extension("2.5.29.28", True, issuing_distribution_point(idp_uri))
+    return explicit(0, seq(exts_content))
+
+# Every revoked entry ends in GeneralizedTime (17 bytes) + a reasonCode
+# extension wrapped in its SEQUENCE OF (14 bytes), so entry length depends
+# only on the serial and can be computed without encoding the entry.
+_ENTRY_FIXED_LEN = 17 + 14
+
+def integer_content_len(n):
+    return 1 if n == 0 else n.bit_length() // 8 + 1
+
+def revoked_entry_len(r):
+    return tlv_len(tlv_len(integer_content_len(r["serial"])) + _ENTRY_FIXED_LEN)
+
+_gentime_memo = {}   # revocation times repeat a lot (batch revocations)
+
+def revoked_entry(r):
+    """revokedCertificates entry: SEQUENCE { serial, revocationDate, { reasonCode } }"""
+    when = r["revocation_time"]
+    time_der = _gentime_memo.get(when)
+    if time_der is None:
+        if len(_gentime_memo) > 4096:
+            _gentime_memo.clear()
+        time_der = _gentime_memo[when] = gentime(when)
+    reason_ext = make_extension("2.5.29.21", False, enumerated(r["reason_int"]))
+    return seq(integer(r["serial"]) + time_der + seq(reason_ext))
+
+def write_tbs_crl(out, issuer_der, ski_bytes, revoked_list, now, next_update, crl_num,
+                  delta_base=None, idp_uri=None, sig_oid=MLDSA87_OID):
+    """Stream a TBSCertList to out (a file, or a bytearray) in one pass.
+
+    Lengths are computed up front from the serials, so every TLV header is
+    written before its content and nothing is re-copied per nesting level.
+    revoked_list must be iterable twice (once for lengths, once for
+    output); only one encoded entry is held at a time. Returns
+    (bytes written, alg_id).
+    """
+    write = out.extend if isinstance(out, bytearray) else out.write
+
+    # AlgorithmIdentifier for ML-DSA-87 (or HashML-DSA-87)
+    alg_id = seq(oid(sig_oid))
+    prefix = alg_id + issuer_der + gentime(now) + gentime(next_update)
+    extensions = crl_extensions(crl_num, ski_bytes, delta_base, idp_uri)
+
+    rev_content_len = sum(revoked_entry_len(r) for r in revoked_list)
+    tbs_content_len = len(prefix) + tlv_len(rev_content_len) + len(extensions)
+
+    tbs_header = header(0x30, tbs_content_len)
+    write(tbs_header)
+    write(prefix)
+    write(header(0x30, rev_content_len))
+    for r in revoked_list:
+        write(revoked_entry(r))
+    write(extensions)
+    return len(tbs_header) + tbs_content_len, alg_id
+
+def build_tbs_crl(issuer_cert_path, revoked_list, now, next_update, crl_num,
+                  delta_base=None, idp_uri=None, sig_oid=MLDSA87_OID):
+    """Build TBSCertList DER.
+
+    With delta_base set, the CRL is a delta CRL: it carries a critical
+    Delta CRL Indicator naming the base CRL number it applies to.
+    With idp_uri set, the CRL carries a critical Issuing Distribution Point
+    so it only covers certificates whose CDP names that URI.
+    """
+    issuer_der, ski_bytes = load_issuer(issuer_cert_path)
+    buf = bytearray()
+    _, alg_id = write_tbs_crl(buf, issuer_der, ski_bytes, revoked_list, now, next_update,
+                              crl_num, delta_base, idp_uri, sig_oid)
+    return buf, alg_id      # signed and assembled in place, never copied to bytes
+
+def assemble_crl(tbs_der, alg_id, signature):
+    """CertificateList DER in one buffer: the TBS is copied exactly once."""
+    sig = bit_str(signature)
+    crl = bytearray(header(0x30, len(tbs_der) + len(alg_id) + len(sig)))
+    crl += tbs_der
+    crl += alg_id
+    crl += sig
+    return crl
 
 def der_to_pem(der_bytes, label="X509 CRL"):
     b64 = base64.encodebytes(der_bytes).decode()
     return f"-----BEGIN {label}-----\n{b64}-----END {label}-----\n"
 
-def main():
-    print("=" * 60)
-    print("  PQC CRL Generator v2 — Direct liboqs ctypes signing")
-    print("=" * 60)
+# ── CRL number and base-CRL state ────────────────────────────────────────────
+def read_crl_number():
+    crl_num = 1
+    if os.path.exists(CRL_NUMBER_FILE):
+        with open(CRL_NUMBER_FILE) as f:
+            crl_num = int(f.read().strip(), 16)
+    return crl_num
+
+def atomic_write(path, data):
+    """Write via a temp file and rename, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w" if isinstance(data, str) else "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def der_output_path(pem_path):
+    """DER twin of a PEM output: intermediate.crl.pem -> intermediate.crl"""
+    return pem_path[:-4] if pem_path.endswith(".pem") else pem_path + ".der"
+
+def write_crl_number(crl_num):
+    atomic_write(CRL_NUMBER_FILE, f"{crl_num:02X}\n")
+
+def save_base_state(crl_num, revoked, this_update):
+    """Record the revoked set that went into base CRL number crl_num."""
+    state = {
+        "base_crl_number": crl_num,
+        "this_update": this_update.isoformat(),
+        "revoked": {f"{r['serial']:X}": r["reason_int"] for r in revoked},
+    }
+    tmp = BASE_STATE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, BASE_STATE_FILE)
+
+def load_base_state():
+    """Return the last base CRL state, or None if no base was issued yet."""
+    if not os.path.exists(BASE_STATE_FILE):
+        return None
+    with open(BASE_STATE_FILE) as f:
+        state = json.load(f)
+    state["this_update"] = datetime.fromisoformat(state["this_update"])
+    state["revoked"] = {int(k, 16): v for k, v in state["revoked"].items()}
+    return state
+
+def delta_entries(revoked, base_state, now):
+    """Revocations that are new (or whose reason changed) since the base CRL,
+    plus removeFromCRL entries for serials that are no longer revoked."""
+    base = base_state["revoked"]
+    current = {r["serial"] for r in revoked}
+    entries = [r for r in revoked if base.get(r["serial"]) != r["reason_int"]]
+    for serial in sorted(base.keys() - current):
+        entries.append({
+            "serial": serial,
+            "revocation_time": now,
+            "reason": "removeFromCRL",
+            "reason_int": REASON_REMOVE_FROM_CRL,
+        })
+    return entries
+
+# ── CRL issuance ─────────────────────────────────────────────────────────────
+def issue_crl(signer, entries, now, next_update, crl_num, output_path,
+              delta_base=None, mode=SIGN_MODE):
+    """Build, sign and write one CRL; returns its DER length."""
+    if mode != "pure":
+        return issue_crl_streamed(signer, entries, now, next_update, crl_num, output_path,
+                                  delta_base, mode)
+    kind = "delta CRL" if delta_base is not None else "CRL"
+    print(f"[*] Building TBSCertList ({kind} #{crl_num}, {len(entries)} entries)...")
+    tbs_der, alg_id = build_tbs_crl(CERT_FILE, entries, now, next_update, crl_num,
+                                    delta_base=delta_base, sig_oid=signer.algorithm_oid)
+    print(f"[*] TBSCertList: {len(tbs_der)} bytes")
     print()
 
-    # Verify files
-    for path, label in [(INDEX_FILE,"index.txt"), (KEY_FILE,"private key"), (CERT_FILE,"issuer cert"), (OQS_DLL,"oqsprovider.dll")]:
-        if not os.path.exists(path):
-            print(f"[!] ERROR: {label} not found: {path}")
-            sys.exit(1)
-        print(f"[✓] Found {label}")
+    signature = sign_tbs(signer, tbs_der)
+    print()
+
+    print(f"[*] Assembling {kind}...")
+    crl_der = assemble_crl(tbs_der, alg_id, signature)
+    atomic_write(der_output_path(output_path), crl_der)
+    atomic_write(output_path, der_to_pem(crl_der))
+    print(f"[✓] {kind} written to: {output_path} (and DER)")
+    print(f"[*] {kind} size: {len(crl_der)} bytes")
     print()
+    return len(crl_der)
+
+class _MuWriter:
+    """File wrapper that feeds every byte written into a MuHasher."""
+    def __init__(self, f, hasher):
+        self.f, self.hasher = f, hasher
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.f.write(data)
+
+def sign_mu(signer, mu, tbs_path, mode):
+    """Sign the streamed TBS by its mu; in "external-mu" mode, backends that
+    cannot sign a mu sign the memory-mapped TBS file instead (same result)."""
+    print(f"[*] Signing 64-byte mu ({signer.name}, {mode})...")
+    try:
+        signature = signer.sign_mu(mu)
+    except BackendUnavailable as e:
+        if mode == "hash":
+            raise
+        print(f"[!] {e}; signing the memory-mapped TBS instead")
+        with open(tbs_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as tbs:
+            signature = signer.sign(tbs)
+    print(f"[✓] Signature generated: {len(signature)} bytes")
+    return signature
 
-    # Load DLL
-    lib = load_oqs_dll()
+def write_crl_files(output_path, tbs_path, tbs_len, alg_id, signature):
+    """Write the CertificateList as PEM and DER, streaming the TBS from
+    tbs_path; both replace their targets atomically and match what the
+    in-memory path writes. Returns the DER length."""
+    sig = bit_str(signature)
+    crl_header = header(0x30, tbs_len + len(alg_id) + len(sig))
+    der_path = der_output_path(output_path)
+    with open(output_path + ".tmp", "w") as pem, open(der_path + ".tmp", "wb") as der, \
+            open(tbs_path, "rb") as tbs:
+        pem.write("-----BEGIN X509 CRL-----\n")
+        der.write(crl_header)
+        pending = crl_header
+        for chunk in iter(lambda: tbs.read(STREAM_CHUNK), b""):
+            der.write(chunk)
+            pending += chunk
+            cut = len(pending) - len(pending) % 57      # 57 bytes per 76-char line
+            pem.write(base64.encodebytes(pending[:cut]).decode())
+            pending = pending[cut:]
+        der.write(alg_id + sig)
+        pem.write(base64.encodebytes(pending + alg_id + sig).decode())
+        pem.write("-----END X509 CRL-----\n")
+        for f in (pem, der):
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(der_path + ".tmp", der_path)
+    os.replace(output_path + ".tmp", output_path)
+    return len(crl_header) + tbs_len + len(alg_id) + len(sig)
+
+def issue_crl_streamed(signer, entries, now, next_update, crl_num, output_path,
+                       delta_base=None, mode="external-mu"):
+    """Issue a CRL without holding its TBSCertList in memory.
+
+    The TBS goes to a scratch file next to output_path while its FIPS 204
+    mu is hashed from the same bytes (HashML-DSA-87 over SHA-512 in "hash"
+    mode), so only the 64-byte mu crosses into the signer and signing time
+    does not depend on the CRL size. Returns the DER length.
+    """
+    kind = "delta CRL" if delta_base is not None else "CRL"
+    prehash = "sha512" if mode == "hash" else None
+    sig_oid = HASHMLDSA87_OID if prehash else signer.algorithm_oid
+    issuer_der, ski_bytes = load_issuer(CERT_FILE)
+    tr = mldsa_tr(ocsp_der.load_issuer(CERT_FILE).key_bytes)
+    hasher = MuHasher(tr, prehash)
+
+    tbs_path = output_path + ".tbs"
+    print(f"[*] Streaming TBSCertList ({kind} #{crl_num}, {len(entries)} entries, {mode})...")
+    try:
+        with open(tbs_path, "wb") as f:
+            tbs_len, alg_id = write_tbs_crl(_MuWriter(f, hasher), issuer_der, ski_bytes,
+                                            entries, now, next_update, crl_num,
+                                            delta_base, sig_oid=sig_oid)
+        print(f"[*] TBSCertList: {tbs_len} bytes")
+        print()
+        signature = sign_mu(signer, hasher.digest(), tbs_path, mode)
+        print()
+        crl_len = write_crl_files(output_path, tbs_path, tbs_len, alg_id, signature)
+    finally:
+        if os.path.exists(tbs_path):
+            os.remove(tbs_path)
+    print(f"[✓] {kind} written to: {output_path} (and DER)")
+    print(f"[*] {kind} size: {crl_len} bytes")
     print()
+    return crl_len
 
-    # Parse index
+def generate_base(signer, mode=SIGN_MODE):
+    """Issue a full CRL and remember its revoked set as the new base."""
     print("[*] Parsing index.txt...")
     revoked = parse_index(INDEX_FILE)
     print(f"[*] Found {len(revoked)} revoked certificates:")
@@ -328,63 +505,431 @@ def main():
         print(f"    Serial {r['serial']:04X} ({r['serial']}) — {r['reason']} — {r['revocation_time'].strftime('%Y-%m-%d %H:%M UTC')}")
     print()
 
-    # Timestamps
     now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
     next_update = now + timedelta(days=CRL_DAYS)
     print(f"[*] This Update: {now.strftime('%Y-%m-%d %H:%M:%S UTC')}")
     print(f"[*] Next Update: {next_update.strftime('%Y-%m-%d %H:%M:%S UTC')}")
 
-    # CRL number
-    crl_number_file = os.path.join(BASE_DIR, "crlnumber")
-    crl_num = 1
-    if os.path.exists(crl_number_file):
-        with open(crl_number_file) as f:
-            crl_num = int(f.read().strip(), 16)
+    crl_num = read_crl_number()
     print(f"[*] CRL Number: {crl_num}")
     print()
 
-    # Extract private key
-    sk_bytes = extract_private_key_bytes(KEY_FILE)
+    issue_crl(signer, revoked, now, next_update, crl_num, OUTPUT_CRL, mode=mode)
+    save_base_state(crl_num, revoked, now)
+    write_crl_number(crl_num + 1)
+    print(f"[*] Base state saved; CRL number incremented to {crl_num + 1}")
     print()
+    verify_pem(OUTPUT_CRL)
 
-    # Build TBS
-    print("[*] Building TBSCertList...")
-    tbs_der, alg_id = build_tbs_crl(CERT_FILE, revoked, now, next_update, crl_num)
-    print(f"[*] TBSCertList: {len(tbs_der)} bytes")
+def generate_delta(signer, mode=SIGN_MODE):
+    """Issue a delta CRL against the last base; returns False if there is none."""
+    base_state = load_base_state()
+    if base_state is None:
+        print("[!] No base CRL state found — issue a base CRL first")
+        return False
+
+    revoked = parse_index(INDEX_FILE)
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    next_update = now + timedelta(hours=DELTA_CRL_HOURS)
+    entries = delta_entries(revoked, base_state, now)
+    base_num = base_state["base_crl_number"]
+    print(f"[*] Delta against base CRL #{base_num}: {len(entries)} changed entries "
+          f"(of {len(revoked)} revoked)")
+
+    crl_num = read_crl_number()
+    issue_crl(signer, entries, now, next_update, crl_num, OUTPUT_DELTA_CRL,
+              delta_base=base_num, mode=mode)
+    write_crl_number(crl_num + 1)
+    print(f"[*] CRL number incremented to {crl_num + 1}")
     print()
+    verify_pem(OUTPUT_DELTA_CRL)
+    return True
 
-    # Sign
-    signature = sign_tbs(lib, tbs_der, sk_bytes)
+def run_cycle(signer, mode=SIGN_MODE):
+    """Issue a base CRL every BASE_CRL_HOURS and deltas every DELTA_CRL_HOURS."""
+    print(f"[*] Base+delta cycle: base every {BASE_CRL_HOURS}h, delta every {DELTA_CRL_HOURS}h")
+    print("[*] Press Ctrl+C to stop")
     print()
+    try:
+        while True:
+            base_state = load_base_state()
+            now = datetime.now(timezone.utc)
+            if (base_state is None or
+                    now - base_state["this_update"] >= timedelta(hours=BASE_CRL_HOURS)):
+                generate_base(signer, mode)
+            else:
+                generate_delta(signer, mode)
+            time.sleep(DELTA_CRL_HOURS * 3600)
+    except KeyboardInterrupt:
+        print("\n[!] Cycle stopped")
+
+# ── Partitioned CRLs ─────────────────────────────────────────────────────────
+def hash_partition(serial, count):
+    """Shard for a serial in "hash" mode: SHA-256 of its big-endian bytes."""
+    serial_bytes = serial.to_bytes(max(1, (serial.bit_length() + 7) // 8), "big")
+    return int.from_bytes(hashlib.sha256(serial_bytes).digest()[:8], "big") % count
+
+def partition_revoked(revoked, scheme, count=PARTITION_COUNT, range_size=PARTITION_RANGE_SIZE,
+                      next_serial=0):
+    """Split revoked entries into shards; returns {shard index: [entries]}.
+
+    "range" puts serials [i*range_size, (i+1)*range_size) in shard i, so a
+    certificate's shard is fixed at issuance; every shard up to the one
+    holding next_serial is emitted, even if empty. That only suits serials
+    issued in sequence; with random 64-159-bit serials the shard count
+    explodes, so more than PARTITION_MAX_RANGE_SHARDS raises ValueError.
+    "hash" spreads serials evenly over a fixed number of shards.
+    """
+    if scheme == "hash":
+        shards = {i: [] for i in range(count)}
+        for r in revoked:
+            shards[hash_partition(r["serial"], count)].append(r)
+    else:
+        top = max([next_serial] + [r["serial"] for r in revoked])
+        if top // range_size >= PARTITION_MAX_RANGE_SHARDS:
+            raise ValueError(f"range partitioning of serials up to {top:X} needs "
+                             f"{top // range_size + 1} shards (limit "
+                             f"{PARTITION_MAX_RANGE_SHARDS}); serials look random, "
+                             f"use --partition-by hash")
+        shards = {i: [] for i in range(top // range_size + 1)}
+        for r in revoked:
+            shards[r["serial"] // range_size].append(r)
+    return shards
+
+def read_next_serial():
+    """Next serial the CA will issue, from OpenSSL's serial file."""
+    if not os.path.exists(SERIAL_FILE):
+        return 0
+    with open(SERIAL_FILE) as f:
+        return int(f.read().strip(), 16)
+
+def open_worker_signer(key_file, backend, classical_key=None):
+    """SigningPool factory: open the backend and secret key once per worker."""
+    signer = open_signer(key_file, backend, classical_key)
+    return lambda tbs_der: sign_tbs(signer, tbs_der)
+
+def generate_partitioned(scheme, count, workers, backend, classical_key=None,
+                         sig_oid=MLDSA87_OID):
+    """Issue one IDP-scoped CRL per shard, signed in parallel, plus a manifest."""
+    print("[*] Parsing index.txt...")
+    revoked = parse_index(INDEX_FILE)
+    shards = partition_revoked(revoked, scheme, count, PARTITION_RANGE_SIZE,
+                               next_serial=read_next_serial())
+    print(f"[*] {len(revoked)} revoked certificates in {len(shards)} shards ({scheme})")
 
-    # Assemble CRL
-    print("[*] Assembling CRL...")
-    crl_der = seq(tbs_der + alg_id + bit_str(signature))
-    crl_pem = der_to_pem(crl_der)
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    next_update = now + timedelta(days=CRL_DAYS)
+    crl_num = read_crl_number()
+    print(f"[*] CRL Number: {crl_num}")
+    print()
 
-    with open(OUTPUT_CRL, "w") as f:
-        f.write(crl_pem)
-    print(f"[✓] CRL written to: {OUTPUT_CRL}")
-    print(f"[*] CRL size: {len(crl_der)} bytes")
+    # DER building is cheap; only the signatures go to the pool
+    jobs = []
+    for index in sorted(shards):
+        uri = PARTITION_URI.format(index=index)
+        tbs_der, alg_id = build_tbs_crl(CERT_FILE, shards[index], now, next_update,
+                                        crl_num, idp_uri=uri, sig_oid=sig_oid)
+        jobs.append((index, uri, tbs_der, alg_id))
+
+    print(f"[*] Signing {len(jobs)} shards across {workers or os.cpu_count()} worker processes...")
+    factory = functools.partial(open_worker_signer, KEY_FILE, backend, classical_key)
+    with SigningPool(factory, workers) as pool:
+        signatures = pool.sign_many([job[2] for job in jobs])
     print()
 
-    # Increment CRL number
-    with open(crl_number_file, "w") as f:
-        f.write(f"{crl_num + 1:02X}\n")
+    os.makedirs(PARTITION_DIR, exist_ok=True)
+    manifest = {
+        "crl_number": crl_num,
+        "this_update": now.isoformat(),
+        "next_update": next_update.isoformat(),
+        "scheme": scheme,
+        "shards": [],
+    }
+    if scheme == "hash":
+        manifest["count"] = count
+        manifest["rule"] = "sha256(serial as minimal big-endian bytes)[0:8] mod count"
+    else:
+        manifest["range_size"] = PARTITION_RANGE_SIZE
+
+    for (index, uri, tbs_der, alg_id), signature in zip(jobs, signatures):
+        crl_der = assemble_crl(tbs_der, alg_id, signature)
+        path = os.path.join(PARTITION_DIR, f"intermediate-{index}.crl")
+        atomic_write(path, crl_der)
+        shard = {
+            "index": index,
+            "uri": uri,
+            "file": os.path.basename(path),
+            "entries": len(shards[index]),
+            "size": len(crl_der),
+            "sha256": hashlib.sha256(crl_der).hexdigest(),
+        }
+        if scheme == "range":
+            shard["serial_range"] = [f"{index * PARTITION_RANGE_SIZE:X}",
+                                     f"{(index + 1) * PARTITION_RANGE_SIZE - 1:X}"]
+        manifest["shards"].append(shard)
+        print(f"[✓] Shard {index}: {len(shards[index])} entries, {len(crl_der)} bytes → {path}")
+
+    atomic_write(PARTITION_MANIFEST, json.dumps(manifest, indent=2))
+    print(f"[✓] Manifest written to: {PARTITION_MANIFEST}")
+
+    write_crl_number(crl_num + 1)
     print(f"[*] CRL number incremented to {crl_num + 1}")
     print()
 
-    # Quick verify — check PEM structure at least
+# ── Publisher daemon ─────────────────────────────────────────────────────────
+def _index_signature():
+    st = os.stat(INDEX_FILE)
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+class CRLPublisher:
+    """Resident CRL publisher.
+
+    Keeps the signer open and the parsed index in memory, reissues the full
+    CRL (DER and PEM, atomically) when index.txt changes or nextUpdate is
+    PUBLISH_REFRESH_HOURS away, and serves the current one over HTTP. Each
+    response carries an ETag and Last-Modified (thisUpdate), so CDP fetchers
+    that revalidate get a bodiless 304 until the CRL actually changes.
+    """
+
+    def __init__(self, signer, mode=SIGN_MODE, host=PUBLISH_HOST, port=PUBLISH_PORT):
+        self.signer = signer
+        self.mode = mode
+        self.revoked = []
+        self.current = None         # swapped whole on reissue; see _publish()
+        self.stats = {"200": 0, "304": 0, "404": 0}
+        self._index_sig = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    def reissue_reason(self):
+        """Why the CRL should be reissued now, or None."""
+        if self.current is None:
+            return "start-up"
+        if _index_signature() != self._index_sig:
+            return "index.txt changed"
+        if self._refresh_due():
+            return "nextUpdate approaching"
+        return None
+
+    def _refresh_due(self):
+        refresh_at = self.current["next_update"] - timedelta(hours=PUBLISH_REFRESH_HOURS)
+        return datetime.now(timezone.utc) >= refresh_at
+
+    def reissue(self, reason):
+        sig = _index_signature()        # before parsing: a later change is seen next poll
+        if sig != self._index_sig:
+            revoked = parse_index(INDEX_FILE)
+            self._index_sig = sig
+            if self.current is not None and revoked == self.revoked and not self._refresh_due():
+                # e.g. a certificate was issued: keep the CRL, and fetchers' caches
+                print(f"[*] {reason}, revoked set unchanged; keeping CRL #{self.current['number']}")
+                return
+            self.revoked = revoked
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        next_update = now + timedelta(days=CRL_DAYS)
+        crl_num = read_crl_number()
+        print(f"[*] Reissuing CRL #{crl_num} ({reason}): {len(self.revoked)} revoked")
+        issue_crl(self.signer, self.revoked, now, next_update, crl_num, OUTPUT_CRL,
+                  mode=self.mode)
+        save_base_state(crl_num, self.revoked, now)
+        write_crl_number(crl_num + 1)
+        with open(der_output_path(OUTPUT_CRL), "rb") as f:
+            der = f.read()
+        self.current = {
+            "number": crl_num,
+            "der": der,
+            "pem": der_to_pem(der).encode(),
+            "etag": hashlib.sha256(der).hexdigest()[:32],
+            "this_update": now,
+            "next_update": next_update,
+        }
+
+    def _handler(self):
+        publisher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._serve(head=False)
+
+            def do_HEAD(self):
+                self._serve(head=True)
+
+            def _serve(self, head):
+                crl = publisher.current
+                path = self.path.split("?")[0]
+                if crl is None or path not in (PUBLISH_PATH, PUBLISH_PATH + ".pem"):
+                    publisher.stats["404"] += 1
+                    self.send_error(404)
+                    return
+                pem = path.endswith(".pem")
+                body = crl["pem"] if pem else crl["der"]
+                etag = f'"{crl["etag"]}{"-pem" if pem else ""}"'
+                max_age = int((crl["next_update"] - datetime.now(timezone.utc)).total_seconds())
+                headers = {
+                    "ETag": etag,
+                    "Last-Modified": format_datetime(crl["this_update"], usegmt=True),
+                    "Expires": format_datetime(crl["next_update"], usegmt=True),
+                    "Cache-Control": f"public, max-age={max(0, max_age)}, no-transform, "
+                                     f"must-revalidate",
+                }
+                request_headers = {k.lower(): v for k, v in self.headers.items()}
+                if not_modified(request_headers, etag, crl["this_update"]):
+                    publisher.stats["304"] += 1
+                    self.send_response(304)
+                    body = b""
+                else:
+                    publisher.stats["200"] += 1
+                    self.send_response(200)
+                    headers["Content-Type"] = ("application/x-pem-file" if pem
+                                               else "application/pkix-crl")
+                    headers["Content-Length"] = str(len(body))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if body and not head:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def run(self):
+        """Issue, serve, and reissue as needed until Ctrl+C."""
+        self.reissue("start-up")
+        server = threading.Thread(target=self.httpd.serve_forever, name="crl-http",
+                                  daemon=True)
+        server.start()
+        host, port = self.httpd.server_address[:2]
+        print(f"[✓] Serving http://{host}:{port}{PUBLISH_PATH} (DER) and {PUBLISH_PATH}.pem")
+        print(f"[*] Checking index.txt every {PUBLISH_POLL_SECONDS}s; Ctrl+C to stop")
+        print()
+        try:
+            while True:
+                time.sleep(PUBLISH_POLL_SECONDS)
+                try:
+                    reason = self.reissue_reason()
+                    if reason:
+                        self.reissue(reason)
+                except FileNotFoundError:
+                    pass    # index.txt mid-rename; next poll
+                except Exception as e:
+                    print(f"[!] Reissue failed, still serving CRL #{self.current['number']}: {e}")
+        except KeyboardInterrupt:
+            print("\n[!] Publisher stopped")
+        finally:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            print(f"[*] HTTP responses: {self.stats}")
+
+def verify_pem(path):
+    """Check PEM structure, then the signature against the issuer cert via liboqs."""
     print("[*] Verifying output PEM structure...")
-    with open(OUTPUT_CRL) as f:
+    with open(path) as f:
         content = f.read()
     if "BEGIN X509 CRL" in content and "END X509 CRL" in content:
         print("[✓] PEM structure valid")
+    try:
+        result = verify_crl_file(path, CERT_FILE)
+    except BackendUnavailable as e:
+        print(f"[!] Signature not checked (no liboqs to verify with): {e}")
+    except ocsp_der.DERError as e:
+        print(f"[!] CRL does not parse: {e}")
+    else:
+        if result.ok:
+            print("[✓] Signature verifies against the issuer certificate")
+        elif (result.status == STATUS_UNSUPPORTED
+              and result.item.sig_oid in COMPOSITE_OIDS.values()):
+            print("[*] Composite signature not checked: the issuer certificate "
+                  "carries only the ML-DSA-87 key")
+        elif result.status == STATUS_UNCHECKED:
+            print(f"[*] Signature not checked: {result.reason}")
+        else:
+            print(f"[!] CRL verification failed: {result.reason}")
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description="PQC CRL generator (ML-DSA-87 via liboqs)")
+    parser.add_argument("--mode", choices=["base", "delta", "cycle", "partitioned", "publish"],
+                        default="base",
+                        help="base: full CRL (default); delta: changes since the last "
+                             "base; cycle: scheduled base+delta loop; partitioned: "
+                             "one IDP-scoped CRL per serial shard; publish: resident "
+                             "daemon serving the CRL over HTTP")
+    parser.add_argument("--port", type=int, default=PUBLISH_PORT,
+                        help=f"HTTP port in publish mode (default: {PUBLISH_PORT})")
+    parser.add_argument("--partition-by", choices=["range", "hash"], default="range",
+                        help="how partitioned mode shards serials (default: range)")
+    parser.add_argument("--partitions", type=int, default=PARTITION_COUNT,
+                        help=f"number of shards in hash mode (default: {PARTITION_COUNT})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="signing processes in partitioned mode (default: CPU count)")
+    parser.add_argument("--backend", default=None,
+                        help="signing backend spec, e.g. liboqs or liboqs:/opt/oqs/liboqs.so "
+                             "(default: time each available backend and use the fastest)")
+    parser.add_argument("--classical-key", default=CLASSICAL_KEY_FILE,
+                        help="ECDSA P-384/P-521 or RSA-3072/4096 key (PEM): sign ML-DSA-87 + "
+                             "classical composite CRLs (pure and external-mu sign modes)")
+    parser.add_argument("--sign-mode", choices=SIGN_MODES, default=SIGN_MODE,
+                        help="pure: sign the TBS in memory (default); external-mu: stream "
+                             "it to disk and sign its mu; hash: stream it and sign "
+                             "HashML-DSA-87/SHA-512 (base, delta and cycle modes)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  PQC CRL Generator v2 — Direct ML-DSA-87 ctypes signing")
+    print("=" * 60)
+    print()
+
+    # Verify files
+    for path, label in [(INDEX_FILE,"index.txt"), (KEY_FILE,"private key"), (CERT_FILE,"issuer cert")]:
+        if not os.path.exists(path):
+            print(f"[!] ERROR: {label} not found: {path}")
+            sys.exit(1)
+        print(f"[✓] Found {label}")
+    print()
+
+    # Pick the backend once; partitioned-mode workers reopen the same one
+    signer = open_signer(KEY_FILE, args.backend, args.classical_key)
     print()
+
+    if args.mode == "partitioned":
+        backend, sig_oid = signer.spec, signer.algorithm_oid
+        signer.close()
+        try:
+            generate_partitioned(args.partition_by, args.partitions, args.workers, backend,
+                                 args.classical_key, sig_oid)
+        except ValueError as e:
+            print(f"[!] ERROR: {e}")
+            sys.exit(1)
+        print("=" * 60)
+        print(f"  DONE! Publish {PARTITION_DIR} at the shard URIs")
+        print("=" * 60)
+        return
+
+    with signer:
+        try:
+            if args.mode == "cycle":
+                run_cycle(signer, args.sign_mode)
+                return
+            if args.mode == "publish":
+                CRLPublisher(signer, args.sign_mode, port=args.port).run()
+                return
+            if args.mode == "delta":
+                if not generate_delta(signer, args.sign_mode):
+                    sys.exit(1)
+                published = OUTPUT_DELTA_CRL
+            else:
+                generate_base(signer, args.sign_mode)
+                published = OUTPUT_CRL
+        except BackendUnavailable as e:
+            print(f"[!] ERROR: {e} - pick a backend that can, or --sign-mode pure")
+            sys.exit(1)
+
     print("=" * 60)
-    print("  DONE! Copy intermediate.crl.pem to your Docker container")
+    print(f"  DONE! Copy {os.path.basename(published)} to your Docker container")
     print("  and verify with:")
-    print("  openssl crl -in intermediate.crl.pem -text -noout")
+    print(f"  openssl crl -in {os.path.basename(published)} -text -noout")
     print("=" * 60)
 
 if __name__ == "__main__":
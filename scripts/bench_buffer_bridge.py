@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: handing large messages to the signing library
+For inputs from 1 KB to 100 MB, times how long each way of turning a Python
+buffer into a C pointer takes: the old per-byte ctypes array
+((c_uint8 * n)(*data)), one from_buffer_copy(), and buffer_bridge.borrow(),
+which copies nothing but small non-bytes inputs. With --key it also times whole signatures per input
+type (bytes, bytearray, memoryview, mmap) on a signing backend.
+"""
+
+import os
+import time
+import mmap
+import argparse
+import tempfile
+from ctypes import c_uint8
+
+from buffer_bridge import borrow
+from signer_backends import open_backend, select_backend
+
+SIZES = (1 << 10, 64 << 10, 1 << 20, 16 << 20, 100 << 20)
+PER_BYTE_LIMIT = 1 << 20    # the per-byte path needs minutes and GBs beyond this
+
+# ============================================================================
+# BRIDGES
+# ============================================================================
+
+def per_byte(data):
+    return (c_uint8 * len(data))(*memoryview(data))
+
+def copy_once(data):
+    return (c_uint8 * len(data)).from_buffer_copy(data)
+
+def borrowed(data):
+    with borrow(data) as (ptr, length):
+        return ptr
+
+BRIDGES = (("per-byte", per_byte), ("copy", copy_once), ("borrow", borrowed))
+
+def best_of(fn, data, repeat: int) -> float:
+    """Fastest of `repeat` calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def repeats(size: int) -> int:
+    return max(3, min(1000, (64 << 20) // size))
+
+def label(size: int) -> str:
+    return f"{size >> 20} MB" if size >= 1 << 20 else f"{size >> 10} KB"
+
+def inputs(payload: bytes, mapped: mmap.mmap):
+    """The same bytes as each buffer type a caller might hold"""
+    return (("bytes", payload), ("bytearray", bytearray(payload)),
+            ("memoryview", memoryview(payload)), ("mmap", mapped))
+
+def mapped_copy(payload: bytes) -> mmap.mmap:
+    with tempfile.TemporaryFile() as f:
+        f.write(payload)
+        f.flush()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda t: [int(v) for v in t.split(",")],
+                        default=list(SIZES), help="input sizes in bytes, comma-separated")
+    parser.add_argument("--key", help="ML-DSA-87 PEM key: also time signing")
+    parser.add_argument("--backend", help="backend spec to sign with (default: fastest)")
+    args = parser.parse_args()
+
+    print("\n⏱  Buffer bridge microbenchmark")
+    print("=" * 70)
+    print(f"  {'size':>7} {'input':<11}" + "".join(f" {name:>14}" for name, _ in BRIDGES))
+    for size in args.sizes:
+        payload = os.urandom(size)
+        with mapped_copy(payload) as mapped:
+            for kind, data in inputs(payload, mapped):
+                cells = []
+                for name, bridge in BRIDGES:
+                    if bridge is per_byte and size > PER_BYTE_LIMIT:
+                        cells.append(f"{'skipped':>14}")
+                        continue
+                    elapsed = best_of(bridge, data, 3 if bridge is per_byte else repeats(size))
+                    cells.append(f" {elapsed * 1e6:>11.1f} µs")
+                print(f"  {label(size):>7} {kind:<11}" + "".join(cells))
+
+    if not args.key:
+        print("\n[*] Pass --key to time signing as well")
+        return
+
+    with open(args.key, "rb") as f:
+        key_pem = f.read()
+    signer = open_backend(args.backend, key_pem) if args.backend else select_backend(key_pem)
+    print(f"\n✍  Signing throughput ({signer.spec})")
+    print(f"  {'size':>7} {'input':<11} {'in place':>12} {'copied first':>14}")
+    with signer:
+        for size in args.sizes:
+            payload = os.urandom(size)
+            with mapped_copy(payload) as mapped:
+                for kind, data in inputs(payload, mapped):
+                    n = max(3, min(50, (16 << 20) // size))
+                    direct = best_of(signer.sign, data, n)
+                    copied = best_of(lambda d: signer.sign(bytes(d)), data, n)
+                    print(f"  {label(size):>7} {kind:<11} {size / direct / 1e6:>8.0f} MB/s "
+                          f"{size / copied / 1e6:>10.0f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: TBSCertList build time and peak RSS
+Compares the original concatenating DER helpers with the streaming
+write_tbs_crl() writer (into a bytearray and into a file) for growing
+revoked lists. Each case runs in a fresh process so peak RSS is its own.
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from datetime import datetime, timezone, timedelta
+
+CRL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "fipsqs", "03_fips_quantum_ca_intermediate", "intermediate")
+sys.path.insert(0, CRL_DIR)
+
+import generate_crl as crl
+
+ISSUER_CERT = os.path.join(CRL_DIR, "certs", "intermediate_ca.crt")
+REASONS = [1, 3, 4, 5]
+
+# ============================================================================
+# SYNTHETIC REVOKED LIST
+# ============================================================================
+
+class SyntheticRevoked:
+    """Re-iterable revoked list that generates entries on the fly"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.base_time = datetime(2026, 2, 14, 2, 12, tzinfo=timezone.utc)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield {
+                "serial": 0x1000 + i,
+                "revocation_time": self.base_time + timedelta(minutes=i % 1440),
+                "reason_int": REASONS[i % len(REASONS)],
+            }
+
+    def __len__(self):
+        return self.count
+
+# ============================================================================
+# BUILDERS
+# ============================================================================
+
+def build_legacy(issuer_der, ski_bytes, revoked, now, next_update):
+    """The original build: rev_items += rc, then tag()/seq() at every level"""
+    alg_id = crl.seq(crl.oid(crl.MLDSA87_OID))
+    rev_items = b""
+    for r in revoked:
+        reason_ext = crl.make_extension("2.5.29.21", False, crl.enumerated(r["reason_int"]))
+        rc = crl.seq(crl.integer(r["serial"]) + crl.gentime(r["revocation_time"]) +
+                     crl.seq(reason_ext))
+        rev_items += rc
+    revoked_block = crl.tag(0x30, rev_items)
+    extensions = crl.crl_extensions(1, ski_bytes)
+    tbs = crl.seq(alg_id + issuer_der + crl.gentime(now) + crl.gentime(next_update) +
+                  revoked_block + extensions)
+    return len(tbs)
+
+def build_stream_bytearray(issuer_der, ski_bytes, revoked, now, next_update):
+    buf = bytearray()
+    length, _ = crl.write_tbs_crl(buf, issuer_der, ski_bytes, revoked, now, next_update, 1)
+    return length
+
+def build_stream_file(issuer_der, ski_bytes, revoked, now, next_update):
+    with tempfile.TemporaryFile() as f:
+        length, _ = crl.write_tbs_crl(f, issuer_der, ski_bytes, revoked, now, next_update, 1)
+    return length
+
+BUILDERS = {
+    "legacy": build_legacy,
+    "stream-bytearray": build_stream_bytearray,
+    "stream-file": build_stream_file,
+}
+
+def run_case(name, count, queue):
+    """Child process: build once and report (seconds, bytes, RSS growth in KB)"""
+    issuer_der, ski_bytes = crl.load_issuer(ISSUER_CERT)
+    revoked = SyntheticRevoked(count)
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    length = BUILDERS[name](issuer_der, ski_bytes, revoked, now, now + timedelta(days=30))
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, length, rss_after, rss_after - rss_before))
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="comma-separated revoked-list sizes (default: 10k,100k,1M)")
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="largest size to run the quadratic legacy builder on")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    print("\n📊 TBSCertList build benchmark")
+    print("=" * 70)
+    print(f"  {'entries':>9}  {'builder':<17} {'time':>9} {'TBS size':>12} "
+          f"{'peak RSS':>10} {'RSS growth':>11}")
+    for count in (int(s) for s in args.sizes.split(",")):
+        for name in BUILDERS:
+            if name == "legacy" and count > args.legacy_max:
+                print(f"  {count:>9,}  {name:<17} skipped (above --legacy-max)")
+                continue
+            queue = ctx.Queue()
+            proc = ctx.Process(target=run_case, args=(name, count, queue))
+            proc.start()
+            elapsed, length, peak_kb, growth_kb = queue.get()
+            proc.join()
+            print(f"  {count:>9,}  {name:<17} {elapsed:>8.2f}s {length / 1e6:>10.2f}MB "
+                  f"{peak_kb / 1024:>8.1f}MB {growth_kb / 1024:>9.1f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: ML-DSA-87 sign calls per second
+Compares the old per-call path (OQS_SIG_new/free, key copy and fresh
+signature buffer on every call) with the liboqs backend's persistent context.
+"""
+
+import time
+import argparse
+from ctypes import c_uint8, c_size_t, byref
+
+from ocsp_responder_enhanced import MLDSA87Signer
+from signer_backends import LibOQSBackend, MLDSA87_SIG_LEN
+
+# ============================================================================
+# SIGNING PATHS
+# ============================================================================
+
+def sign_per_call(signer: LibOQSBackend, message: bytes) -> bytes:
+    """The pre-context sign path: set everything up and tear it down per call"""
+    sig_obj = signer.OQS_SIG_new(b"ML-DSA-87")
+    if not sig_obj:
+        raise Exception("Failed to create ML-DSA-87 signer")
+    try:
+        msg_buf = (c_uint8 * len(message)).from_buffer_copy(message)
+        key_buf = (c_uint8 * len(signer.key_bytes)).from_buffer_copy(signer.key_bytes)
+        sig_len = c_size_t(MLDSA87_SIG_LEN)
+        sig_buf = (c_uint8 * MLDSA87_SIG_LEN)()
+        result = signer.OQS_SIG_sign(sig_obj, sig_buf, byref(sig_len),
+                                     msg_buf, len(message), key_buf)
+        if result != 0:
+            raise Exception(f"Signing failed with code {result}")
+        return bytes(sig_buf)[:sig_len.value]
+    finally:
+        signer.OQS_SIG_free(sig_obj)
+
+def measure(label, fn, message, seconds):
+    """Call fn(message) for roughly `seconds` and report calls per second"""
+    fn(message)  # warm-up
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        fn(message)
+        calls += 1
+    elapsed = time.perf_counter() - start
+    rate = calls / elapsed
+    print(f"  {label:<22} {calls:>7} calls  {rate:>10.1f} sign/s  "
+          f"{1e6 / rate:>9.1f} µs/call")
+    return rate
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0,
+                        help="time spent on each path (default: 5)")
+    parser.add_argument("--message-size", type=int, default=64,
+                        help="message length in bytes (default: 64)")
+    args = parser.parse_args()
+
+    message = b"OCSP|1004|REVOKED|Superseded|".ljust(args.message_size, b"x")
+
+    print("\n⏱  ML-DSA-87 sign microbenchmark")
+    print("=" * 70)
+    with MLDSA87Signer("liboqs") as signer:
+        print(f"[*] Message: {len(message)} bytes, {args.seconds:.1f}s per path\n")
+        before = measure("per-call context", lambda m: sign_per_call(signer.backend, m),
+                         message, args.seconds)
+        after = measure("persistent context", signer.sign, message, args.seconds)
+    print(f"\n[✓] Speed-up: {after / before:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ML-DSA-87 signatures per second against worker processes
+Signs the same batch in-process and then through SigningPool with a
+growing number of workers. Pool start-up (DLL and key load) is timed
+separately from signing.
+"""
+
+import os
+import time
+import argparse
+
+from ocsp_responder_enhanced import MLDSA87Signer, open_signer
+from signing_pool import SigningPool
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000,
+                        help="signatures per run (default: 2000)")
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, 4, cpus})),
+                        help="comma-separated worker counts (default: 1,2,4,<cpus>)")
+    args = parser.parse_args()
+
+    messages = [f"OCSP|{0x1000 + i:X}|GOOD|20260214021222Z|20260214031222Z".encode()
+                for i in range(args.messages)]
+
+    print("\n⏱  ML-DSA-87 batch signing benchmark")
+    print("=" * 70)
+    print(f"[*] {len(messages)} messages, {cpus} CPUs\n")
+
+    with MLDSA87Signer() as signer:
+        start = time.perf_counter()
+        for message in messages:
+            signer.sign(message)
+        baseline = len(messages) / (time.perf_counter() - start)
+    print(f"  {'in-process':<12} {baseline:>10.1f} sign/s")
+
+    for workers in (int(n) for n in args.workers.split(",")):
+        start = time.perf_counter()
+        with SigningPool(open_signer, workers) as pool:
+            pool.sign_many(messages[:workers * 4])      # warm-up: workers load DLL and key
+            ready = time.perf_counter() - start
+            start = time.perf_counter()
+            pool.sign_many(messages)
+            rate = len(messages) / (time.perf_counter() - start)
+        print(f"  {workers:>2} workers   {rate:>10.1f} sign/s  {rate / baseline:>5.2f}x  "
+              f"(start-up {ready:.2f}s)")
+
+if __name__ == "__main__":
+    main()
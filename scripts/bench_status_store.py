@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and lookup speed of the certificate status store
+Generates synthetic index.txt files and compares CompactStatusStore with
+the old dict-of-dicts representation keyed by serial string.
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+from ocsp_responder_enhanced import CertificateDatabase, format_serial
+
+REASONS = ["keyCompromise", "affiliationChanged", "superseded", "cessationOfOperation"]
+
+# ============================================================================
+# SYNTHETIC index.txt
+# ============================================================================
+
+def write_synthetic_index(path: str, count: int, revoked_ratio: float, seed: int = 1):
+    """Write `count` index.txt lines with serials starting at 0x1000"""
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for i in range(count):
+            serial = format_serial(0x1000 + i)
+            subject = f"/C=US/O=PQCLab Security/CN=host-{i}.pqclab.example.com"
+            if rng.random() < revoked_ratio:
+                reason = REASONS[i % len(REASONS)]
+                f.write(f"R\t270211025132Z\t260214021222Z,{reason}\t{serial}\tunknown\t{subject}\n")
+            else:
+                f.write(f"V\t270211025132Z\t\t{serial}\tunknown\t{subject}\n")
+
+def load_legacy_dict(path: str) -> dict:
+    """The pre-store representation: {serial string: {three strings}}"""
+    certs = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            rev_date, _, reason = parts[2].partition(",")
+            certs[parts[3]] = {
+                'status': parts[0],
+                'revocation_reason': reason,
+                'revocation_date': rev_date,
+            }
+    return certs
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def measure_build(build):
+    """Return (result, seconds, bytes retained) for build()"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+def measure_lookups(lookup, keys):
+    start = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    elapsed = time.perf_counter() - start
+    return len(keys) / elapsed
+
+def run(count: int, args, workdir: str) -> None:
+    path = os.path.join(workdir, f"index-{count}.txt")
+    print(f"\n[*] {count:,} entries")
+    start = time.perf_counter()
+    write_synthetic_index(path, count, args.revoked_ratio)
+    print(f"    generated {os.path.getsize(path) / 1e6:,.1f} MB in "
+          f"{time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(2)
+    hits = [0x1000 + rng.randrange(count) for _ in range(args.lookups // 2)]
+    misses = [0x1000 + count + rng.randrange(count) for _ in range(args.lookups // 2)]
+    int_keys = hits + misses
+    rng.shuffle(int_keys)
+    str_keys = [format_serial(k) for k in int_keys]
+
+    db, load_s, retained = measure_build(lambda: CertificateDatabase(path))
+    store = db.store
+    print(f"    compact store: load {load_s:6.2f}s  columns {store.nbytes / 1e6:8.1f} MB "
+          f"({store.nbytes / count:5.1f} B/entry)  db total {retained / 1e6:8.1f} MB")
+    print(f"                   lookup {measure_lookups(store.lookup, int_keys):12,.0f}/s (int)  "
+          f"get_status {measure_lookups(db.get_status, str_keys):12,.0f}/s (hex string)")
+    del db, store
+
+    if count <= args.dict_max:
+        certs, load_s, retained = measure_build(lambda: load_legacy_dict(path))
+        print(f"    legacy dict:   load {load_s:6.2f}s  total   {retained / 1e6:8.1f} MB "
+              f"({retained / count:5.1f} B/entry)")
+        print(f"                   lookup {measure_lookups(certs.get, str_keys):12,.0f}/s (hex string)")
+        del certs
+    else:
+        print(f"    legacy dict:   skipped (above --dict-max {args.dict_max:,})")
+
+    if not args.keep:
+        os.remove(path)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000000,10000000",
+                        help="comma-separated entry counts (default: 1M,10M)")
+    parser.add_argument("--revoked-ratio", type=float, default=0.05,
+                        help="fraction of revoked entries (default: 0.05)")
+    parser.add_argument("--lookups", type=int, default=200000,
+                        help="lookups per run, half hits and half misses")
+    parser.add_argument("--dict-max", type=int, default=1000000,
+                        help="largest size to also load as the legacy dict")
+    parser.add_argument("--workdir", default=None,
+                        help="where to write synthetic index files (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated files")
+    args = parser.parse_args()
+
+    print("\n📊 Certificate status store benchmark")
+    print("=" * 70)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="pqc-index-")
+    for count in (int(s) for s in args.sizes.split(",")):
+        run(count, args, workdir)
+    if not args.workdir and not args.keep:
+        os.rmdir(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Pass Python buffers to C without copying them
+
+borrow(data) yields a pointer and length for any object supporting the
+buffer protocol - bytes, bytearray, memoryview, mmap, array. Declare the
+C parameter as c_void_p and pass the pointer:
+
+    with borrow(tbs_der) as (ptr, length):
+        lib.OQS_SIG_sign(sig, sig_buf, byref(sig_len), ptr, length, key_buf)
+
+  * bytes are passed as they are: ctypes hands C the object's own storage
+  * other buffers of COPY_BELOW bytes or more are pinned with
+    PyObject_GetBuffer until the block ends - no copy whatever the size,
+    read-only objects included (ctypes' from_buffer() only takes writable
+    ones). While pinned they cannot be resized or closed.
+  * smaller ones, and non-contiguous views, are copied once, which for a
+    few KB is cheaper than pinning
+
+Never the per-byte (c_uint8 * n)(*data) conversion.
+"""
+
+import ctypes
+from ctypes import c_char_p, c_int, c_ssize_t, c_void_p, POINTER, py_object
+from typing import Tuple
+
+PyBUF_SIMPLE = 0
+COPY_BELOW = 64 * 1024
+_EMPTY = (ctypes.c_uint8 * 1)()     # stands in for NULL from empty buffers
+
+class Py_buffer(ctypes.Structure):
+    """CPython's Py_buffer (Include/pybuffer.h)"""
+    _fields_ = [
+        ("buf", c_void_p),
+        ("obj", c_void_p),      # owned reference, dropped by PyBuffer_Release
+        ("len", c_ssize_t),
+        ("itemsize", c_ssize_t),
+        ("readonly", c_int),
+        ("ndim", c_int),
+        ("format", c_char_p),
+        ("shape", POINTER(c_ssize_t)),
+        ("strides", POINTER(c_ssize_t)),
+        ("suboffsets", POINTER(c_ssize_t)),
+        ("internal", c_void_p),
+    ]
+
+_get_buffer = ctypes.pythonapi.PyObject_GetBuffer
+_get_buffer.argtypes = [py_object, POINTER(Py_buffer), c_int]
+_get_buffer.restype = c_int
+
+_release_buffer = ctypes.pythonapi.PyBuffer_Release
+_release_buffer.argtypes = [POINTER(Py_buffer)]
+_release_buffer.restype = None
+
+class borrow:
+    """Context manager giving (pointer, length in bytes) of data's memory"""
+
+    __slots__ = ('_data', '_view')
+
+    def __init__(self, data):
+        self._data = data
+        self._view = None
+
+    def __enter__(self) -> Tuple[object, int]:
+        data = self._data
+        if type(data) is bytes:
+            return data, len(data)
+        if memoryview(data).nbytes < COPY_BELOW:
+            data = bytes(data)
+            return data, len(data)
+        view = Py_buffer()
+        try:
+            _get_buffer(data, ctypes.byref(view), PyBUF_SIMPLE)
+        except BufferError:
+            data = bytes(data)              # non-contiguous
+            return data, len(data)
+        self._view = view
+        return view.buf or ctypes.addressof(_EMPTY), view.len
+
+    def __exit__(self, *exc):
+        if self._view is not None:
+            _release_buffer(ctypes.byref(self._view))
+            self._view = None
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Batch ML-DSA-87 verification of certificate chains and CRLs
+
+Reads certificates and CRLs (PEM bundles such as ca-chain.crt, or DER),
+finds each one's issuer by name and checks its signature with
+OQS_SIG_verify. Signatures are checked in batches across worker processes
+(SigningPool, each worker holding one liboqs handle), and every result is
+memoized under (issuer key, TBS, signature) digests - in memory and, with
+--cache, in a JSON file - so revalidating a directory of certificates or
+re-fetching an unchanged CRL costs only hashing. The signature digest is
+part of the key: a new signature over the same TBS is verified afresh.
+
+A certificate passes when its signature verifies, it is within its
+validity period, it is not on a verified CRL from its issuer, and its
+issuer passes in turn up to a trust anchor. Every issuer on the way must
+be a CA (basicConstraints cA) whose keyUsage, if present, allows
+keyCertSign - or cRLSign for a CRL. Revocations are collected from the
+CRLs before the chains are walked, so an intermediate its parent's CRL
+revokes fails every certificate under it. Of an issuer's complete CRLs
+the newest per scope (issuingDistributionPoint) counts, and a delta CRL is
+applied only on top of the base it extends, its removeFromCRL entries
+lifting revocations. A CRL passes when its signature verifies against a
+passing issuer and nextUpdate is ahead.
+HashML-DSA-87 (SHA-512) signatures are checked through their external mu,
+which needs OpenSSL 3.5+; without it they are reported as unchecked.
+
+    python chain_verifier.py                                # the whole lab tree
+    python chain_verifier.py --cache verify-cache.json ../fipsqs/04_end_entity_certificates
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import argparse
+import functools
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ocsp_der import DERError, OID_MLDSA87, children, decode_oid, parse_extensions, read_tlv
+from signer_backends import BackendUnavailable, MuHasher, mldsa_tr, open_verifier
+from signing_pool import SigningPool
+
+REPO_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_ANCHOR = os.path.join(REPO_DIR, "fipsqs", "02_fips_quantum_ca_root", "root", "certs", "root_ca.crt")
+DEFAULT_PATHS = (os.path.join(REPO_DIR, "fipsqs"),)
+EXTENSIONS = (".crt", ".pem", ".der", ".crl")
+
+OID_COMMON_NAME = "2.5.4.3"
+OID_KEY_USAGE = "2.5.29.15"
+OID_BASIC_CONSTRAINTS = "2.5.29.19"
+OID_CRL_NUMBER = "2.5.29.20"
+OID_REASON_CODE = "2.5.29.21"
+OID_DELTA_CRL_INDICATOR = "2.5.29.27"
+OID_ISSUING_DISTRIBUTION_POINT = "2.5.29.28"
+REASON_REMOVE_FROM_CRL = 8
+KU_KEY_CERT_SIGN = 0x04     # keyUsage bit 5, in the first content byte
+KU_CRL_SIGN = 0x02          # keyUsage bit 6
+PEM_LABELS = (b"CERTIFICATE", b"X509 CRL")
+MAX_CHAIN = 8               # issuers followed before giving up
+POOL_MIN_BATCH = 16         # smaller batches are verified in this process
+
+# Signature OIDs verified, with HashML-DSA's pre-hash (None for pure ML-DSA)
+SIGNATURE_ALGORITHMS = {
+    OID_MLDSA87: None,
+    "2.16.840.1.101.3.4.3.34": "sha512",        # id-hash-ml-dsa-87-with-sha512
+}
+
+# Result.status
+STATUS_VALID = "valid"
+STATUS_INVALID = "invalid"
+STATUS_UNSUPPORTED = "unsupported"      # signature algorithm not in SIGNATURE_ALGORITHMS
+STATUS_UNCHECKED = "unchecked"          # no backend could check the signature
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+class Signed(NamedTuple):
+    """One certificate or CRL, with the parts verification needs"""
+    kind: str                   # "cert" or "crl"
+    path: str
+    der: bytes
+    tbs: bytes                  # TBSCertificate / TBSCertList as signed
+    sig_oid: str
+    signature: bytes
+    issuer: bytes               # Name DER
+    subject: bytes              # Name DER (b"" for CRLs)
+    key_oid: str                # subjectPublicKeyInfo algorithm ("" for CRLs)
+    public_key: bytes           # subjectPublicKey contents (b"" for CRLs)
+    serial: int                 # serialNumber (0 for CRLs)
+    not_before: datetime        # notBefore / thisUpdate
+    not_after: Optional[datetime]   # notAfter / nextUpdate
+    revoked: frozenset          # serials listed on a CRL, less removeFromCRL entries
+    removed: frozenset = frozenset()    # removeFromCRL serials on a delta CRL
+    crl_number: Optional[int] = None
+    delta_base: Optional[int] = None    # deltaCRLIndicator: BaseCRLNumber
+    scope: bytes = b""                  # issuingDistributionPoint extnValue
+    ca: bool = False                    # basicConstraints cA
+    key_usage: Optional[int] = None     # first keyUsage byte; None without the extension
+
+def _time(buf: bytes, field: Tuple[int, int, int, int]) -> datetime:
+    t, _, start, end = field
+    text = buf[start:end].decode("ascii")
+    if t == 0x17:       # UTCTime, YYMMDDHHMMSSZ
+        year = int(text[:2])
+        text = str(1900 + year if year >= 50 else 2000 + year) + text[2:]
+    elif t != 0x18:
+        raise DERError("expected a time")
+    return datetime.strptime(text, "%Y%m%d%H%M%SZ").replace(tzinfo=timezone.utc)
+
+def _oid_at(buf: bytes, field: Tuple[int, int, int, int]) -> str:
+    t, _, start, _ = field
+    o_tag, o_start, o_end = read_tlv(buf, start)
+    if t != 0x30 or o_tag != 0x06:
+        raise DERError("bad AlgorithmIdentifier")
+    return decode_oid(buf[o_start:o_end])
+
+def _integer(buf: bytes, field: Tuple[int, int, int, int]) -> int:
+    if field[0] != 0x02:
+        raise DERError("expected an INTEGER")
+    return int.from_bytes(buf[field[2]:field[3]], "big", signed=True)
+
+def _ext_integer(value: bytes) -> int:
+    t, start, end = read_tlv(value)
+    if t not in (0x02, 0x0a):      # INTEGER, or ENUMERATED for reasonCode
+        raise DERError("expected an INTEGER")
+    return int.from_bytes(value[start:end], "big", signed=True)
+
+def _is_ca(value: Optional[bytes]) -> bool:
+    """basicConstraints ::= SEQUENCE { cA BOOLEAN DEFAULT FALSE, pathLen }"""
+    if value is None:
+        return False
+    t, start, end = read_tlv(value)
+    if t != 0x30:
+        raise DERError("bad basicConstraints")
+    fields = children(value, start, end)
+    return bool(fields) and fields[0][0] == 0x01 and value[fields[0][2]:fields[0][3]] != b"\x00"
+
+def _key_usage(value: Optional[bytes]) -> Optional[int]:
+    """First byte of the keyUsage BIT STRING (digitalSignature is 0x80)"""
+    if value is None:
+        return None
+    t, start, end = read_tlv(value)
+    if t != 0x03:
+        raise DERError("bad keyUsage")
+    return value[start + 1] if end > start + 1 else 0
+
+def parse_signed(der: bytes, path: str = "") -> Signed:
+    """Parse a DER certificate or CRL; raises DERError on anything else"""
+    try:
+        t, start, end = read_tlv(der)
+        if t != 0x30 or end != len(der):
+            raise DERError("not a SEQUENCE")
+        (_, tbs_pos, tbs_start, tbs_end), alg, sig = children(der, start, end)[:3]
+        if sig[0] != 0x03 or der[sig[2]] != 0:
+            raise DERError("bad signature BIT STRING")
+        fields = children(der, tbs_start, tbs_end)
+        common = dict(path=path, der=der, tbs=der[tbs_pos:tbs_end], sig_oid=_oid_at(der, alg),
+                      signature=der[sig[2] + 1:sig[3]])
+        if fields[0][0] == 0xa0:
+            fields = fields[1:]     # [0] version: a certificate
+        elif fields[0][0] == 0x02 and fields[1][0] == 0x30 and fields[3][0] in (0x17, 0x18):
+            return _parse_crl(der, fields[1:], common)
+        if fields[0][0] == 0x30:    # CRL v1 has no version
+            return _parse_crl(der, fields, common)
+        # serialNumber, signature, issuer, validity, subject, subjectPublicKeyInfo
+        validity = children(der, fields[3][2], fields[3][3])
+        spki = children(der, fields[5][2], fields[5][3])
+        key = spki[1]
+        if key[0] != 0x03:
+            raise DERError("bad subjectPublicKey")
+        extensions = {}
+        for t, _, x_start, _ in fields[6:]:
+            if t == 0xa3:           # [3] extensions
+                t, x_start, x_end = read_tlv(der, x_start)
+                if t != 0x30:
+                    raise DERError("bad extensions")
+                extensions = parse_extensions(der, x_start, x_end)
+        return Signed(kind="cert", issuer=der[fields[2][1]:fields[2][3]],
+                      subject=der[fields[4][1]:fields[4][3]], key_oid=_oid_at(der, spki[0]),
+                      public_key=der[key[2] + 1:key[3]], serial=_integer(der, fields[0]),
+                      not_before=_time(der, validity[0]), not_after=_time(der, validity[1]),
+                      revoked=frozenset(), ca=_is_ca(extensions.get(OID_BASIC_CONSTRAINTS)),
+                      key_usage=_key_usage(extensions.get(OID_KEY_USAGE)), **common)
+    except (IndexError, ValueError) as e:
+        raise DERError(str(e)) from e
+
+def _parse_crl(der: bytes, fields: list, common: dict) -> Signed:
+    # signature, issuer, thisUpdate, [nextUpdate], [revokedCertificates], [0] extensions
+    rest = fields[3:]
+    next_update = None
+    if rest and rest[0][0] in (0x17, 0x18):
+        next_update = _time(der, rest[0])
+        rest = rest[1:]
+    revoked, removed = set(), set()
+    if rest and rest[0][0] == 0x30:
+        for _, _, e_start, e_end in children(der, rest[0][2], rest[0][3]):
+            # userCertificate, revocationDate, [crlEntryExtensions]
+            entry = children(der, e_start, e_end)
+            serial = _integer(der, entry[0])
+            reason = None
+            if len(entry) > 2:
+                reason = parse_extensions(der, entry[2][2], entry[2][3]).get(OID_REASON_CODE)
+            if reason is not None and _ext_integer(reason) == REASON_REMOVE_FROM_CRL:
+                removed.add(serial)
+            else:
+                revoked.add(serial)
+        rest = rest[1:]
+    extensions = {}
+    if rest and rest[0][0] == 0xa0:
+        t, x_start, x_end = read_tlv(der, rest[0][2])
+        if t != 0x30:
+            raise DERError("bad crlExtensions")
+        extensions = parse_extensions(der, x_start, x_end)
+    crl_number = extensions.get(OID_CRL_NUMBER)
+    delta_base = extensions.get(OID_DELTA_CRL_INDICATOR)
+    return Signed(kind="crl", issuer=der[fields[1][1]:fields[1][3]], subject=b"", key_oid="",
+                  public_key=b"", serial=0, not_before=_time(der, fields[2]),
+                  not_after=next_update, revoked=frozenset(revoked), removed=frozenset(removed),
+                  crl_number=None if crl_number is None else _ext_integer(crl_number),
+                  delta_base=None if delta_base is None else _ext_integer(delta_base),
+                  scope=extensions.get(OID_ISSUING_DISTRIBUTION_POINT, b""), **common)
+
+def pem_blocks(data: bytes) -> Iterable[Tuple[bytes, bytes]]:
+    """(label, DER) for each PEM block in a bundle"""
+    label, body = None, []
+    for line in data.splitlines():
+        line = line.strip()
+        if line.startswith(b"-----BEGIN "):
+            label, body = line[11:].rstrip(b"-"), []
+        elif line.startswith(b"-----END ") and label is not None:
+            yield label, base64.b64decode(b"".join(body))
+            label = None
+        elif label is not None:
+            body.append(line)
+
+def load_file(path: str) -> List[Signed]:
+    """Certificates and CRLs in a PEM bundle or DER file (other PEM blocks are skipped)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"-----BEGIN" not in data:
+        return [parse_signed(data, path)]
+    return [parse_signed(der, path) for label, der in pem_blocks(data) if label in PEM_LABELS]
+
+def walk(paths: Iterable[str]) -> Iterable[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def common_name(name_der: bytes) -> str:
+    """The CN of a Name, or its hex if there is none"""
+    try:
+        _, start, end = read_tlv(name_der)
+        for _, _, s_start, s_end in children(name_der, start, end):          # RDN SETs
+            for _, _, a_start, a_end in children(name_der, s_start, s_end):  # AttributeTypeAndValue
+                attr, value = children(name_der, a_start, a_end)
+                if decode_oid(name_der[attr[2]:attr[3]]) == OID_COMMON_NAME:
+                    return name_der[value[2]:value[3]].decode("utf-8", "replace")
+    except (DERError, ValueError):
+        pass
+    return name_der.hex()[:16]
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+class VerifyCache:
+    """Signature results keyed by (issuer key, TBS, signature) digests and pre-hash
+
+    Held in memory; with a path it is loaded at start and saved (tmp file
+    + rename) by save(), so later runs skip every signature seen before.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.results: Dict[str, bool] = {}
+        self.hits = self.misses = 0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.results = json.load(f)
+
+    @staticmethod
+    def key(public_key: bytes, tbs: bytes, signature: bytes, prehash: Optional[str] = None) -> str:
+        key = ":".join(hashlib.sha256(part).hexdigest()[:32] for part in (public_key, tbs, signature))
+        return f"{key}:{prehash}" if prehash else key
+
+    def get(self, key: str) -> Optional[bool]:
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: bool):
+        self.results[key] = result
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.results, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+# ============================================================================
+# BATCH VERIFICATION
+# ============================================================================
+
+class _JobVerifier:
+    """Maps (key index, TBS, signature, pre-hash) jobs to results
+
+    What SigningPool workers run; in-process batches use it as a context
+    manager so the handles are closed afterwards. Pure ML-DSA goes to the
+    `spec` verifier; HashML-DSA signs 1 || 0 || OID || SHA-512(TBS), which
+    the pure API cannot express, so its mu is verified through native
+    OpenSSL - opened on first use, and None (unchecked) without it.
+    """
+
+    def __init__(self, spec: Optional[str], keys: List[bytes]):
+        self.keys = keys
+        self.verifier = open_verifier(spec)
+        self.mu_verifier = None
+        self.mu_error = None
+
+    def __call__(self, job: Tuple[int, bytes, bytes, Optional[str]]) -> Optional[bool]:
+        index, tbs, signature, prehash = job
+        public_key = self.keys[index]
+        if prehash is None:
+            return self.verifier.verify(tbs, signature, public_key)
+        if self.mu_verifier is None and self.mu_error is None:
+            try:
+                self.mu_verifier = open_verifier("openssl")
+            except BackendUnavailable as e:
+                self.mu_error = e
+        if self.mu_verifier is None:
+            return None
+        mu = MuHasher(mldsa_tr(public_key), prehash).update(tbs).digest()
+        return self.mu_verifier.verify_mu(mu, signature, public_key)
+
+    def close(self):
+        self.verifier.close()
+        if self.mu_verifier is not None:
+            self.mu_verifier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _worker_verify(spec: Optional[str], keys: List[bytes]) -> _JobVerifier:
+    """SigningPool factory"""
+    return _JobVerifier(spec, keys)
+
+def verify_batch(jobs: List[Tuple[bytes, bytes, bytes, Optional[str]]], spec: Optional[str] = None,
+                 workers: Optional[int] = None) -> List[Optional[bool]]:
+    """Verify (public key, TBS, signature, pre-hash) jobs, across processes if worth it
+
+    None marks a HashML-DSA signature no backend here could check.
+    """
+    keys, index = [], {}
+    indexed = []
+    for public_key, tbs, signature, prehash in jobs:
+        if public_key not in index:
+            index[public_key] = len(keys)
+            keys.append(public_key)
+        indexed.append((index[public_key], tbs, signature, prehash))
+    factory = functools.partial(_worker_verify, spec, keys)
+    if len(jobs) < POOL_MIN_BATCH or workers == 1:
+        with factory() as verify:
+            return [verify(job) for job in indexed]
+    with SigningPool(factory, workers) as pool:
+        return pool.sign_many(indexed)
+
+class Result(NamedTuple):
+    item: Signed
+    ok: bool
+    reason: str
+    chain: List[str]            # issuer CNs up to the anchor
+    status: str                 # STATUS_* - why ok is False without parsing reason
+
+class ChainVerifier:
+    """Verify many certificates and CRLs against trust anchors in one batch"""
+
+    def __init__(self, anchors: List[Signed], spec: Optional[str] = None,
+                 workers: Optional[int] = None, cache: Optional[VerifyCache] = None,
+                 at: Optional[datetime] = None):
+        self.anchors = {a.der for a in anchors}
+        self.anchor_certs = anchors
+        self.spec = spec
+        self.workers = workers
+        self.cache = cache or VerifyCache()
+        self.at = at or datetime.now(timezone.utc)
+        self.verified = 0
+
+    def _issuers(self, item: Signed, by_subject: Dict[bytes, List[Signed]]) -> List[Signed]:
+        return [c for c in by_subject.get(item.issuer, ()) if c.key_oid == OID_MLDSA87]
+
+    def verify(self, items: List[Signed]) -> List[Result]:
+        unique = list({item.der: item for item in self.anchor_certs + items}.values())
+        by_subject: Dict[bytes, List[Signed]] = {}
+        for cert in unique:
+            if cert.kind == "cert":
+                by_subject.setdefault(cert.subject, []).append(cert)
+
+        # Every (item, candidate issuer) signature not already cached, in one batch
+        keys: Dict[Tuple[bytes, bytes], str] = {}
+        pending: Dict[str, Tuple[bytes, bytes, bytes, Optional[str]]] = {}
+        for item in unique:
+            if item.sig_oid not in SIGNATURE_ALGORITHMS:
+                continue
+            for issuer in self._issuers(item, by_subject):
+                prehash = SIGNATURE_ALGORITHMS[item.sig_oid]
+                key = VerifyCache.key(issuer.public_key, item.tbs, item.signature, prehash)
+                keys[item.der, issuer.der] = key
+                if key not in pending and self.cache.get(key) is None:
+                    pending[key] = (issuer.public_key, item.tbs, item.signature, prehash)
+        fresh: Dict[str, Optional[bool]] = {}
+        if pending:
+            for key, ok in zip(pending, verify_batch(list(pending.values()), self.spec, self.workers)):
+                fresh[key] = ok
+                if ok is not None:          # unchecked is retried next run
+                    self.cache.put(key, ok)
+            self.verified += len(pending)
+
+        signed_by = {pair: fresh[key] if key in fresh else self.cache.results[key]
+                     for pair, key in keys.items()}
+        status: Dict[bytes, Tuple[str, str, List[str]]] = {}
+        revoked: Dict[bytes, set] = {}
+
+        def check(item: Signed, depth: int = 0) -> Tuple[str, str, List[str]]:
+            if item.der in status:
+                return status[item.der]
+            if depth > MAX_CHAIN:
+                return STATUS_INVALID, "chain too long", []
+            status[item.der] = (STATUS_INVALID, "issuer loop", [])
+            if item.sig_oid not in SIGNATURE_ALGORITHMS:
+                result = (STATUS_UNSUPPORTED, f"unsupported signature algorithm {item.sig_oid}", [])
+            else:
+                result = (STATUS_INVALID, f"issuer {common_name(item.issuer)} not found", [])
+                for issuer in self._issuers(item, by_subject):
+                    problem = self._issuer_problem(item, issuer)
+                    if problem:
+                        result = (STATUS_INVALID,
+                                  f"{problem} (issuer {common_name(issuer.subject)})", [])
+                        continue
+                    ok = signed_by[item.der, issuer.der]
+                    if ok is None:
+                        result = (STATUS_UNCHECKED, "HashML-DSA-87 signature not checked "
+                                  "(needs OpenSSL 3.5+ ML-DSA)", [])
+                        continue
+                    if not ok:
+                        result = (STATUS_INVALID,
+                                  f"bad signature (issuer {common_name(issuer.subject)})", [])
+                        continue
+                    if issuer.der in self.anchors:
+                        result = (STATUS_VALID, "", [common_name(issuer.subject)])
+                    elif issuer.der == item.der:
+                        result = (STATUS_INVALID, "self-signed, not a trust anchor", [])
+                    else:
+                        state, reason, chain = check(issuer, depth + 1)
+                        name = common_name(issuer.subject)
+                        result = (state, reason and f"{name}: {reason}", [name] + chain)
+                    if result[0] == STATUS_VALID:
+                        break
+            if result[0] == STATUS_VALID:
+                result = self._check_time(item) or result
+            if (result[0] == STATUS_VALID and item.kind == "cert"
+                    and item.serial in revoked.get(item.issuer, ())):
+                result = (STATUS_INVALID, f"revoked (serial {item.serial:X})", result[2])
+            status[item.der] = result
+            return result
+
+        # Revocations first: the CRLs that pass with the revocations known so
+        # far, until that set stops changing (a revoked CA's CRL drops out)
+        for _ in range(MAX_CHAIN):
+            status.clear()
+            found: Dict[bytes, set] = {}
+            for issuer, serials in self._revocations(
+                    [item for item in unique if item.kind == "crl" and check(item)[0] == STATUS_VALID]):
+                found.setdefault(issuer, set()).update(serials)
+            if found == revoked:
+                break
+            revoked.clear()
+            revoked.update(found)
+        else:
+            status.clear()
+
+        results = []
+        for item in items:
+            state, reason, chain = check(item)
+            results.append(Result(item, state == STATUS_VALID, reason, chain, state))
+        return results
+
+    @staticmethod
+    def _issuer_problem(item: Signed, issuer: Signed) -> Optional[str]:
+        """Why `issuer` may not sign `item`, or None"""
+        if not issuer.ca:
+            return "issuer is not a CA"
+        usage, name = ((KU_CRL_SIGN, "cRLSign") if item.kind == "crl"
+                       else (KU_KEY_CERT_SIGN, "keyCertSign"))
+        if issuer.key_usage is not None and not issuer.key_usage & usage:
+            return f"issuer keyUsage lacks {name}"
+        return None
+
+    @staticmethod
+    def _revocations(crls: List[Signed]) -> Iterable[Tuple[bytes, set]]:
+        """(issuer, revoked serials) per CRL scope from verified CRLs
+
+        The newest complete CRL of each (issuer, scope) is the base; a delta
+        counts only when that base is the one it extends - numbered from its
+        BaseCRLNumber up to below its own number (RFC 5280 5.2.4) - and the
+        newest such delta wins, deltas being cumulative.
+        """
+        bases: Dict[Tuple[bytes, bytes], Signed] = {}
+        deltas: Dict[Tuple[bytes, bytes], List[Signed]] = {}
+        for crl in crls:
+            scope = crl.issuer, crl.scope
+            if crl.delta_base is not None:
+                deltas.setdefault(scope, []).append(crl)
+            elif scope not in bases or (crl.crl_number or -1) > (bases[scope].crl_number or -1):
+                bases[scope] = crl
+        for scope, base in bases.items():
+            serials = set(base.revoked)
+            applicable = [d for d in deltas.get(scope, ())
+                          if base.crl_number is not None and d.crl_number is not None
+                          and d.delta_base <= base.crl_number < d.crl_number]
+            if applicable:
+                delta = max(applicable, key=lambda d: d.crl_number)
+                serials.update(delta.revoked)
+                serials.difference_update(delta.removed)
+            yield scope[0], serials
+
+    def _check_time(self, item: Signed) -> Optional[Tuple[str, str, List[str]]]:
+        if item.not_before > self.at:
+            return STATUS_INVALID, f"not valid before {item.not_before:%Y-%m-%d %H:%M}", []
+        if item.not_after is not None and item.not_after < self.at:
+            what = "expired" if item.kind == "cert" else "stale (nextUpdate passed)"
+            return STATUS_INVALID, f"{what} {item.not_after:%Y-%m-%d %H:%M}", []
+        return None
+
+def verify_crl_file(crl_path: str, issuer_path: str, spec: Optional[str] = None) -> Result:
+    """Check one CRL against its issuer certificate, which is trusted as given"""
+    crl, = [item for item in load_file(crl_path) if item.kind == "crl"]
+    return ChainVerifier(load_file(issuer_path), spec, workers=1).verify([crl])[0]
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=list(DEFAULT_PATHS),
+                        help="certificate/CRL files or directories (default: the fipsqs tree)")
+    parser.add_argument("--anchor", action="append",
+                        help=f"trust anchor certificate, repeatable (default: {DEFAULT_ANCHOR})")
+    parser.add_argument("--backend", default=None,
+                        help="liboqs or liboqs:/path/to/liboqs.so (default: first found)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="verification processes (default: CPU count)")
+    parser.add_argument("--cache", default=None, help="JSON file persisting results between runs")
+    args = parser.parse_args()
+
+    anchors = [a for path in args.anchor or [DEFAULT_ANCHOR] for a in load_file(path)]
+    items = []
+    for path in walk(args.paths):
+        try:
+            items += load_file(path)
+        except (DERError, OSError) as e:
+            print(f"[!] Skipping {path}: {e}")
+
+    print(f"\n🔏 Verifying {len(items)} certificates/CRLs against "
+          f"{', '.join(common_name(a.subject) for a in anchors)}")
+    cache = VerifyCache(args.cache)
+    verifier = ChainVerifier(anchors, args.backend, args.workers, cache)
+    start = time.perf_counter()
+    try:
+        results = verifier.verify(items)
+    except BackendUnavailable as e:
+        print(f"[!] {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    cache.save()
+
+    for r in results:
+        name = common_name(r.item.subject if r.item.kind == "cert" else r.item.issuer)
+        where = r.item.path
+        if where.startswith(REPO_DIR + os.sep):
+            where = os.path.relpath(where, REPO_DIR)
+        if r.ok:
+            print(f"[✓] {where}: {r.item.kind} {name} <- {' <- '.join(r.chain)}")
+        else:
+            print(f"[✗] {where}: {r.item.kind} {name}: {r.reason}")
+
+    passed = sum(r.ok for r in results)
+    print(f"\n[*] {passed}/{len(results)} passed; {verifier.verified} signatures verified, "
+          f"{cache.hits} from cache, in {elapsed * 1000:.1f} ms")
+    sys.exit(0 if passed == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
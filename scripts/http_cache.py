@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+HTTP reply and conditional-request helpers
+
+Shared by the OCSP responder (ocsp_responder_enhanced.py) and the CRL
+publisher (generate_crl.py --mode publish) without either importing the
+other:
+
+  * http_reply     status line, headers and body for a raw socket reply
+  * not_modified   If-None-Match / If-Modified-Since evaluation, so both
+                   answer 304 to revalidating caches by the same rules
+"""
+
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+HTTP_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request"}
+
+def http_reply(code: int, headers: Dict[str, str], body: bytes = b"",
+               length: Optional[int] = None) -> bytes:
+    """Status line and headers, then body; pass `length` to send the body separately"""
+    lines = [f"HTTP/1.1 {code} {HTTP_REASONS[code]}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines += [f"Content-Length: {len(body) if length is None else length}", "Connection: close"]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+def not_modified(headers: Dict[str, str], etag: str, last_modified: datetime) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since (RFC 9110 13.2.2)
+
+    `headers` maps lower-cased request header names to values.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    since = headers.get("if-modified-since")
+    if since:
+        try:
+            return last_modified <= parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            return False
+    return False
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Bulk parser for OpenSSL CA index.txt - shared by the CRL generator and
+the OCSP responder
+
+index.txt is tab-separated:
+    status  expiry  revocation[,reason]  serial  filename  subject
+The revocation field is empty for valid certificates and the subject DN
+may contain spaces, so lines are split on tabs only.
+
+Times are decoded with a fixed-width UTCTime/GeneralizedTime decoder and
+memoised, since revocations tend to share timestamps. Results come back
+as columns (arrays) rather than one object per certificate.
+"""
+
+import mmap
+import zlib
+from array import array
+from itertools import repeat
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+# ============================================================================
+# CODES
+# ============================================================================
+
+STATUS_CODES = {b'V': 0, b'R': 1, b'E': 2}
+STATUS_VALID, STATUS_REVOKED, STATUS_EXPIRED = 0, 1, 2
+
+# RFC 5280 CRLReason values
+REASON_CODES = {
+    'unspecified': 0, 'keyCompromise': 1, 'cACompromise': 2,
+    'affiliationChanged': 3, 'superseded': 4, 'cessationOfOperation': 5,
+    'certificateHold': 6, 'removeFromCRL': 8, 'privilegeWithdrawn': 9,
+    'aACompromise': 10,
+}
+REASON_KEYWORDS = {code: name for name, code in REASON_CODES.items()}
+_REASON_BYTES = {name.encode(): code for name, code in REASON_CODES.items()}
+_STATUS_TABLE = bytes.maketrans(b'VRE', bytes([STATUS_VALID, STATUS_REVOKED, STATUS_EXPIRED]))
+
+CHUNK_BYTES = 8 << 20        # bytes read per batch from a file or mmap
+
+# ============================================================================
+# TIME DECODING
+# ============================================================================
+
+def _days_from_civil(y: int, m: int, d: int) -> int:
+    """Days since 1970-01-01 for a proleptic Gregorian date"""
+    y -= m <= 2
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + (-3 if m > 2 else 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+_time_memo = {}
+
+def decode_time(value: bytes) -> int:
+    """UTCTime (YYMMDDHHMMSSZ) or GeneralizedTime (YYYYMMDDHHMMSSZ) to epoch"""
+    epoch = _time_memo.get(value)
+    if epoch is not None:
+        return epoch
+    n = len(value)
+    if n == 13:
+        year = int(value[0:2])
+        year += 2000 if year < 50 else 1900     # RFC 5280 UTCTime window
+        i = 2
+    elif n == 15:
+        year = int(value[0:4])
+        i = 4
+    else:
+        raise ValueError(f"Unrecognised index time: {value!r}")
+    if value[-1:] != b'Z':
+        raise ValueError(f"Index time is not UTC: {value!r}")
+    epoch = (_days_from_civil(year, int(value[i:i + 2]), int(value[i + 2:i + 4])) * 86400
+             + int(value[i + 4:i + 6]) * 3600
+             + int(value[i + 6:i + 8]) * 60
+             + int(value[i + 8:i + 10]))
+    if len(_time_memo) > 65536:
+        _time_memo.clear()
+    _time_memo[value] = epoch
+    return epoch
+
+# ============================================================================
+# LINE PARSING
+# ============================================================================
+
+class IndexEntry(NamedTuple):
+    status: int
+    reason: int
+    revocation_time: int    # epoch seconds, 0 unless revoked
+    serial: int
+    expiry: int             # epoch seconds
+    subject: str
+
+def _revocation(field: bytes):
+    """Split 'YYMMDDHHMMSSZ[,reason]' into (epoch, reason code)"""
+    date, _, reason = field.partition(b',')
+    return decode_time(date), _REASON_BYTES.get(reason, 0)
+
+def parse_line(line: bytes) -> Optional[IndexEntry]:
+    """Parse one index.txt line; None for blank, comment or malformed lines"""
+    line = line.rstrip(b'\r\n')
+    if not line or line[0] == 0x23:    # '#'
+        return None
+    parts = line.split(b'\t', 5)
+    if len(parts) < 6:
+        return None
+    try:
+        serial = int(parts[3], 16)
+        status = STATUS_CODES.get(parts[0], STATUS_EXPIRED)
+        if status == STATUS_REVOKED and parts[2]:
+            rev_time, reason = _revocation(parts[2])
+        else:
+            rev_time, reason = 0, 0
+    except ValueError:
+        return None
+    try:
+        expiry = decode_time(parts[1])
+    except ValueError:
+        expiry = 0
+    return IndexEntry(status, reason, rev_time, serial, expiry,
+                      parts[5].decode('utf-8', 'replace'))
+
+def data_lines(buf) -> List[bytes]:
+    """Split a buffer into non-empty, non-comment lines"""
+    return [l for l in bytes(buf).split(b'\n') if l.strip() and l[0] != 0x23]
+
+def iter_index(path: str, use_mmap: bool = False) -> Iterator[IndexEntry]:
+    """Stream IndexEntry records from a file"""
+    for chunk in _chunks(path, use_mmap):
+        for line in chunk.split(b'\n'):
+            entry = parse_line(line)
+            if entry is not None:
+                yield entry
+
+def _chunks(path: str, use_mmap: bool) -> Iterator[bytes]:
+    """Yield the file CHUNK_BYTES at a time, cut at line boundaries"""
+    with open(path, 'rb') as f:
+        if use_mmap:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:      # empty file
+                return
+            with buf:
+                pos, size = 0, len(buf)
+                while pos < size:
+                    end = buf.find(b'\n', min(pos + CHUNK_BYTES, size - 1))
+                    end = size if end < 0 else end + 1
+                    yield buf[pos:end]
+                    pos = end
+        else:
+            tail = b''
+            while True:
+                block = f.read(CHUNK_BYTES)
+                if not block:
+                    if tail:
+                        yield tail
+                    return
+                cut = block.rfind(b'\n') + 1
+                if cut == 0:
+                    tail += block
+                    continue
+                yield tail + block[:cut]
+                tail = block[cut:]
+
+# ============================================================================
+# COLUMNAR PARSING
+# ============================================================================
+
+def serial_column(values=()):
+    """array('Q') of serials, or a list if any serial needs more than 64 bits"""
+    try:
+        return array('Q', values)
+    except OverflowError:
+        return list(values)
+
+class IndexColumns:
+    """Parsed index.txt as parallel columns, one row per data line"""
+
+    __slots__ = ('serials', 'status', 'reasons', 'rev_times', 'crcs')
+
+    def __init__(self, with_crcs: bool = False):
+        self.serials = serial_column()
+        self.status = array('B')
+        self.reasons = array('B')
+        self.rev_times = array('q')
+        self.crcs = array('I') if with_crcs else None
+
+    def __len__(self):
+        return len(self.status)
+
+    def _extend_serials(self, values):
+        try:
+            self.serials.extend(values)
+        except OverflowError:
+            self.serials = list(self.serials)
+            self.serials.extend(values)
+
+    def revoked_rows(self) -> Iterator[int]:
+        """Row numbers of revoked entries"""
+        status = self.status
+        return (i for i in range(len(status)) if status[i] == STATUS_REVOKED)
+
+def _parse_lines_slow(cols: IndexColumns, lines: List[bytes]):
+    """Per-line fallback that skips blank, comment and malformed lines"""
+    for line in lines:
+        entry = parse_line(line)
+        if entry is None:
+            continue
+        cols._extend_serials((entry.serial,))
+        cols.status.append(entry.status)
+        cols.reasons.append(entry.reason)
+        cols.rev_times.append(entry.revocation_time)
+        if cols.crcs is not None:
+            cols.crcs.append(zlib.crc32(line.rstrip(b'\r\n')))
+
+def _drop_comments(chunk: bytes) -> bytes:
+    """Remove '#' comment and blank lines, leaving the others byte for byte
+    
+    Comments are rare, so this is a few find() calls and one join rather
+    than a pass over every line.
+    """
+    buf = b'\n' + chunk
+    kept, pos = [], 0
+    while True:
+        start = buf.find(b'\n#', pos)
+        if start < 0:
+            break
+        kept.append(buf[pos:start])
+        end = buf.find(b'\n', start + 1)
+        pos = len(buf) if end < 0 else end
+    kept.append(buf[pos:])
+    buf = b''.join(kept)
+    while b'\n\n' in buf:
+        buf = buf.replace(b'\n\n', b'\n')
+    return buf.strip(b'\n')
+
+def _parse_chunk(cols: IndexColumns, chunk: bytes):
+    """Append a block of whole lines to the columns
+    
+    Well-formed blocks (six tab-separated fields per line) are parsed
+    column-wise: the block is split once into a flat field list and each
+    column is a stride slice of it, so the per-line work happens in C.
+    Comment and blank lines are cut out first; anything else irregular
+    drops to the per-line parser.
+    """
+    chunk = bytes(chunk).rstrip(b'\r\n')
+    if chunk[:1] == b'#' or b'\n#' in chunk or b'\n\n' in chunk or chunk[:1] == b'\n':
+        chunk = _drop_comments(chunk)
+    if not chunk:
+        return
+    lines_needed = cols.crcs is not None
+    if b'\r' in chunk:
+        _parse_lines_slow(cols, chunk.split(b'\n'))
+        return
+    
+    nlines = chunk.count(b'\n') + 1
+    flat = chunk.replace(b'\n', b'\t').split(b'\t')
+    statuses = b''.join(flat[0::6])
+    if len(flat) != 6 * nlines or len(statuses) != nlines or statuses.translate(None, b'VRE'):
+        _parse_lines_slow(cols, chunk.split(b'\n'))
+        return
+    
+    try:
+        serials = list(map(int, flat[3::6], repeat(16)))
+        rev_fields = flat[2::6]
+        rev_times = array('q', bytes(8 * nlines))
+        reasons = array('B', bytes(nlines))
+        i = statuses.find(b'R')
+        while i >= 0:
+            if rev_fields[i]:
+                rev_times[i], reasons[i] = _revocation(rev_fields[i])
+            i = statuses.find(b'R', i + 1)
+    except ValueError:
+        _parse_lines_slow(cols, chunk.split(b'\n'))
+        return
+    
+    cols._extend_serials(serials)
+    cols.status.frombytes(statuses.translate(_STATUS_TABLE))
+    cols.reasons.extend(reasons)
+    cols.rev_times.extend(rev_times)
+    if lines_needed:
+        cols.crcs.extend(map(zlib.crc32, chunk.split(b'\n')))
+
+def parse_buffer(buf: Union[bytes, bytearray, memoryview, mmap.mmap],
+                 with_crcs: bool = False) -> IndexColumns:
+    """Parse an in-memory index.txt image into columns"""
+    cols = IndexColumns(with_crcs)
+    _parse_chunk(cols, buf)
+    return cols
+
+def load_columns(path: str, use_mmap: bool = False, with_crcs: bool = False) -> IndexColumns:
+    """Parse index.txt into columns, reading it in bounded chunks"""
+    cols = IndexColumns(with_crcs)
+    for chunk in _chunks(path, use_mmap):
+        _parse_chunk(cols, chunk)
+    return cols
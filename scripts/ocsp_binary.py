@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Length-prefixed binary protocol for the OCSP responder
+
+Every frame is a 4-byte big-endian length followed by a payload. Frames
+are capped well below 16 MiB, so the first byte of a binary connection
+is always 0x00; that is how the responder tells it apart from the text
+("serial=...") and HTTP protocols on the same port.
+
+A connection stays open for any number of frames, and clients may
+pipeline: send many requests without waiting, then read the responses,
+which always come back in request order. The responder closes connections
+idle for BINARY_IDLE_TIMEOUT (30 s); BinaryOCSPClient then reconnects once
+and resends whatever was unanswered, which is safe since status queries
+are idempotent.
+
+Request payload:   OP_STATUS (1 byte) | serial (unsigned big-endian)
+Response payload:  tbs | signature length (2 bytes) | raw signature
+    tbs = status, reason, revocation time, thisUpdate, nextUpdate
+          (epoch seconds), serial length, serial
+The signature covers BINARY_CONTEXT + tbs. An error response is
+STATUS_ERROR followed by a UTF-8 message.
+"""
+
+import socket
+import struct
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME = 64 * 1024
+
+OP_STATUS = 0x01
+
+BINARY_CONTEXT = b"OCSP|BIN|1|"
+BINARY_TBS = struct.Struct(">BBqqqB")
+SIG_LEN = struct.Struct(">H")
+
+STATUS_GOOD, STATUS_REVOKED, STATUS_UNKNOWN, STATUS_ERROR = 0, 1, 2, 0xFF
+STATUS_BYTES = {'good': STATUS_GOOD, 'revoked': STATUS_REVOKED, 'unknown': STATUS_UNKNOWN}
+STATUS_NAMES = {code: name for name, code in STATUS_BYTES.items()}
+
+# ============================================================================
+# FRAMING
+# ============================================================================
+
+def frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def split_frames(buf: bytes) -> Tuple[List[bytes], bytes]:
+    """Split buf into complete frame payloads and the unconsumed remainder"""
+    payloads = []
+    pos = 0
+    while len(buf) - pos >= FRAME_HEADER.size:
+        (length,) = FRAME_HEADER.unpack_from(buf, pos)
+        if length > MAX_FRAME:
+            raise ValueError(f"frame of {length} bytes exceeds {MAX_FRAME}")
+        end = pos + FRAME_HEADER.size + length
+        if end > len(buf):
+            break
+        payloads.append(buf[pos + FRAME_HEADER.size:end])
+        pos = end
+    return payloads, buf[pos:]
+
+# ============================================================================
+# MESSAGES
+# ============================================================================
+
+def serial_bytes(serial: int) -> bytes:
+    return serial.to_bytes(max(1, (serial.bit_length() + 7) // 8), "big")
+
+def encode_request(serial: int) -> bytes:
+    return frame(bytes([OP_STATUS]) + serial_bytes(serial))
+
+def decode_request(payload: bytes) -> int:
+    """Serial named by a request payload; ValueError if malformed"""
+    if len(payload) < 2 or payload[0] != OP_STATUS:
+        raise ValueError("unsupported request")
+    return int.from_bytes(payload[1:], "big")
+
+def response_tbs(serial: int, status: str, reason: int, revocation_time: int,
+                 this_update: datetime, next_update: datetime) -> bytes:
+    """The to-be-signed part of a response"""
+    raw = serial_bytes(serial)
+    return BINARY_TBS.pack(STATUS_BYTES[status], reason, revocation_time,
+                           int(this_update.timestamp()), int(next_update.timestamp()),
+                           len(raw)) + raw
+
+def encode_response(tbs: bytes, signature: bytes) -> bytes:
+    return tbs + SIG_LEN.pack(len(signature)) + signature
+
+def encode_error(message: str) -> bytes:
+    return bytes([STATUS_ERROR]) + message.encode()
+
+def decode_response(payload: bytes) -> Dict:
+    """Fields of a response payload; 'signed' is the exact signed message"""
+    if payload[:1] == bytes([STATUS_ERROR]):
+        return {'status': 'error', 'error': payload[1:].decode(errors='replace')}
+    status, reason, rev_time, this_update, next_update, serial_len = \
+        BINARY_TBS.unpack_from(payload)
+    tbs_end = BINARY_TBS.size + serial_len
+    (sig_len,) = SIG_LEN.unpack_from(payload, tbs_end)
+    sig_start = tbs_end + SIG_LEN.size
+    return {
+        'serial': int.from_bytes(payload[BINARY_TBS.size:tbs_end], "big"),
+        'status': STATUS_NAMES.get(status, 'unknown'),
+        'reason': reason,
+        'revocation_time': (datetime.fromtimestamp(rev_time, timezone.utc)
+                            if status == STATUS_REVOKED else None),
+        'this_update': datetime.fromtimestamp(this_update, timezone.utc),
+        'next_update': datetime.fromtimestamp(next_update, timezone.utc),
+        'signature': payload[sig_start:sig_start + sig_len],
+        'signed': BINARY_CONTEXT + payload[:tbs_end],
+    }
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class BinaryOCSPClient:
+    """Persistent client; pipeline() keeps up to `window` requests in flight
+
+    A connection the server has closed (idle timeout, restart) is reopened
+    once per call and the unanswered requests are sent again.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 10.0, window: int = 64):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.window = window
+        self._ready = deque()
+        self._connect()
+
+    def _connect(self):
+        self.sock = socket.create_connection(self.address, timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buf = b""
+        self._ready.clear()
+
+    def _read_payload(self) -> bytes:
+        while not self._ready:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            payloads, self._buf = split_frames(self._buf + chunk)
+            self._ready.extend(payloads)
+        return self._ready.popleft()
+
+    def query(self, serial: int) -> Dict:
+        return self.pipeline([serial])[0]
+
+    def pipeline(self, serials: Iterable[int]) -> List[Dict]:
+        """Query many serials on this connection; results in input order"""
+        serials = list(serials)
+        results = []
+        try:
+            self._pipeline(serials, results)
+        except ConnectionError:
+            self.close()
+            self._connect()
+            self._pipeline(serials, results)
+        return results
+
+    def _pipeline(self, serials: List[int], results: List[Dict]):
+        """Send serials[len(results):], appending their responses to results"""
+        sent = min(len(results) + self.window, len(serials))
+        self.sock.sendall(b"".join(encode_request(s) for s in serials[len(results):sent]))
+        while len(results) < len(serials):
+            results.append(decode_response(self._read_payload()))
+            if sent < len(serials):
+                self.sock.sendall(encode_request(serials[sent]))
+                sent += 1
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
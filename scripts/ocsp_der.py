@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Minimal DER codec for RFC 6960 OCSP - used by the responder's HTTP front end
+
+Only the pieces an OCSP responder needs: reading OCSPRequests, reading
+the issuer certificate, and writing BasicOCSPResponses. Encoders follow
+the same tag()/seq() style as generate_crl.py.
+"""
+
+import base64
+import hashlib
+from datetime import datetime
+from urllib.parse import unquote
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ============================================================================
+# OIDS AND CODES
+# ============================================================================
+
+OID_OCSP_BASIC = "1.3.6.1.5.5.7.48.1.1"
+OID_OCSP_NONCE = "1.3.6.1.5.5.7.48.1.2"
+OID_MLDSA87    = "2.16.840.1.101.3.4.3.19"     # id-ml-dsa-87 (FIPS 204)
+
+# CertID hash algorithms a client may use for issuerNameHash/issuerKeyHash
+HASH_OIDS = {
+    "1.3.14.3.2.26": "sha1",
+    "2.16.840.1.101.3.4.2.1": "sha256",
+    "2.16.840.1.101.3.4.2.2": "sha384",
+    "2.16.840.1.101.3.4.2.3": "sha512",
+}
+
+# OCSPResponseStatus
+SUCCESSFUL, MALFORMED_REQUEST, INTERNAL_ERROR, TRY_LATER = 0, 1, 2, 3
+SIG_REQUIRED, UNAUTHORIZED = 5, 6
+
+class DERError(ValueError):
+    """Input is not the DER structure we expected"""
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+
+def der_len(n: int) -> bytes:
+    if n < 0x80:
+        return bytes([n])
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    return bytes([0x80 | len(body)]) + body
+
+def encode_oid_bytes(oid_str: str) -> bytes:
+    parts = [int(x) for x in oid_str.split(".")]
+    body = bytearray()
+    for p in [parts[0] * 40 + parts[1]] + parts[2:]:
+        chunk = [p & 0x7F]
+        p >>= 7
+        while p:
+            chunk.append(0x80 | (p & 0x7F))
+            p >>= 7
+        body.extend(reversed(chunk))
+    return bytes(body)
+
+def tag(t: int, content: bytes) -> bytes: return bytes([t]) + der_len(len(content)) + content
+def seq(c: bytes) -> bytes:               return tag(0x30, c)
+def oid(s: str) -> bytes:                 return tag(0x06, encode_oid_bytes(s))
+def octet_str(b: bytes) -> bytes:         return tag(0x04, b)
+def bit_str(b: bytes) -> bytes:           return tag(0x03, b"\x00" + b)
+def enumerated(n: int) -> bytes:          return tag(0x0a, bytes([n]))
+def explicit(n: int, c: bytes) -> bytes:  return tag(0xa0 | n, c)
+def gentime(dt: datetime) -> bytes:       return tag(0x18, dt.strftime("%Y%m%d%H%M%SZ").encode())
+
+# ============================================================================
+# DECODING
+# ============================================================================
+
+def read_tlv(buf: bytes, pos: int = 0) -> Tuple[int, int, int]:
+    """Return (tag, content start, content end) of the TLV at pos"""
+    if pos + 2 > len(buf):
+        raise DERError("truncated TLV")
+    t = buf[pos]
+    n = buf[pos + 1]
+    pos += 2
+    if n & 0x80:
+        size = n & 0x7F
+        if size == 0 or size > 4 or pos + size > len(buf):
+            raise DERError("bad length")
+        n = int.from_bytes(buf[pos:pos + size], "big")
+        pos += size
+    if pos + n > len(buf):
+        raise DERError("truncated content")
+    return t, pos, pos + n
+
+def children(buf: bytes, start: int, end: int) -> List[Tuple[int, int, int, int]]:
+    """List (tag, tlv start, content start, content end) inside [start, end)"""
+    items = []
+    pos = start
+    while pos < end:
+        t, c_start, c_end = read_tlv(buf, pos)
+        items.append((t, pos, c_start, c_end))
+        pos = c_end
+    return items
+
+def decode_oid(content: bytes) -> str:
+    values, n = [], 0
+    for b in content:
+        n = (n << 7) | (b & 0x7F)
+        if not b & 0x80:
+            values.append(n)
+            n = 0
+    if not values:
+        raise DERError("empty OID")
+    first = min(values[0] // 40, 2)
+    return ".".join(str(v) for v in [first, values[0] - 40 * first] + values[1:])
+
+# ============================================================================
+# ISSUER
+# ============================================================================
+
+class Issuer(NamedTuple):
+    name_der: bytes         # subject Name, as encoded in the certificate
+    key_bytes: bytes        # subjectPublicKey BIT STRING contents
+    cert_der: bytes
+
+    def cert_id_hashes(self, hash_name: str) -> Tuple[bytes, bytes]:
+        """(issuerNameHash, issuerKeyHash) for a CertID hash algorithm"""
+        return (hashlib.new(hash_name, self.name_der).digest(),
+                hashlib.new(hash_name, self.key_bytes).digest())
+
+def load_issuer(path: str) -> Issuer:
+    """Read the responder's issuing CA certificate (PEM or DER)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"-----BEGIN" in data:
+        lines = data.split(b"\n")
+        data = base64.b64decode(b"".join(l for l in lines if l and not l.startswith(b"-----")))
+    _, start, end = read_tlv(data)
+    _, tbs_start, tbs_end = read_tlv(data, start)
+    fields = children(data, tbs_start, tbs_end)
+    if fields and fields[0][0] == 0xa0:     # [0] version
+        fields = fields[1:]
+    # serialNumber, signature, issuer, validity, subject, subjectPublicKeyInfo
+    _, subj_pos, _, subj_end = fields[4]
+    _, _, spki_start, spki_end = fields[5]
+    spki = children(data, spki_start, spki_end)
+    _, _, key_start, key_end = spki[1]
+    return Issuer(data[subj_pos:subj_end], data[key_start + 1:key_end], data)
+
+# ============================================================================
+# REQUESTS
+# ============================================================================
+
+class CertID(NamedTuple):
+    der: bytes              # the CertID exactly as the client sent it
+    hash_name: Optional[str]
+    name_hash: bytes
+    key_hash: bytes
+    serial: int
+
+class OCSPRequest(NamedTuple):
+    cert_ids: List[CertID]
+    nonce: Optional[bytes]
+
+def _parse_cert_id(buf: bytes, pos: int, start: int, end: int) -> CertID:
+    alg, name_hash, key_hash, serial = children(buf, start, end)[:4]
+    alg_oid = children(buf, alg[2], alg[3])[0]
+    if alg_oid[0] != 0x06 or serial[0] != 0x02:
+        raise DERError("bad CertID")
+    return CertID(buf[pos:end], HASH_OIDS.get(decode_oid(buf[alg_oid[2]:alg_oid[3]])),
+                  buf[name_hash[2]:name_hash[3]], buf[key_hash[2]:key_hash[3]],
+                  int.from_bytes(buf[serial[2]:serial[3]], "big", signed=True))
+
+def parse_extensions(buf: bytes, start: int, end: int) -> Dict[str, bytes]:
+    """{extnID: extnValue contents} from an Extensions SEQUENCE"""
+    found = {}
+    for _, _, e_start, e_end in children(buf, start, end):
+        parts = children(buf, e_start, e_end)
+        found[decode_oid(buf[parts[0][2]:parts[0][3]])] = buf[parts[-1][2]:parts[-1][3]]
+    return found
+
+def parse_request(der: bytes) -> OCSPRequest:
+    """Decode an OCSPRequest; raises DERError on anything malformed"""
+    try:
+        t, start, end = read_tlv(der)
+        if t != 0x30 or end != len(der):
+            raise DERError("not a SEQUENCE")
+        t, tbs_start, tbs_end = read_tlv(der, start)
+        if t != 0x30:
+            raise DERError("bad TBSRequest")
+        cert_ids, nonce = [], None
+        for t, _, c_start, c_end in children(der, tbs_start, tbs_end):
+            if t == 0x30:       # requestList
+                for _, _, r_start, r_end in children(der, c_start, c_end):
+                    _, cid_pos, cid_start, cid_end = children(der, r_start, r_end)[0]
+                    cert_ids.append(_parse_cert_id(der, cid_pos, cid_start, cid_end))
+            elif t == 0xa2:     # requestExtensions
+                _, x_start, x_end = read_tlv(der, c_start)
+                nonce = parse_extensions(der, x_start, x_end).get(OID_OCSP_NONCE)
+        if not cert_ids:
+            raise DERError("empty requestList")
+        return OCSPRequest(cert_ids, nonce)
+    except (IndexError, ValueError) as e:
+        raise DERError(str(e)) from e
+
+def decode_get_path(path: str, prefix: str = "/") -> bytes:
+    """DER request from a GET path: url-encoded base64 (RFC 6960 A.1)"""
+    if not path.startswith(prefix):
+        raise DERError(f"not under {prefix}")
+    try:
+        return base64.b64decode(unquote(path[len(prefix):]), validate=True)
+    except ValueError as e:
+        raise DERError(f"bad base64: {e}") from e
+
+def cert_id(issuer: Issuer, serial: int, hash_name: str = "sha1") -> bytes:
+    """CertID DER naming `serial` under `issuer`"""
+    hash_oid = next(o for o, name in HASH_OIDS.items() if name == hash_name)
+    name_hash, key_hash = issuer.cert_id_hashes(hash_name)
+    return seq(seq(oid(hash_oid) + b"\x05\x00") + octet_str(name_hash) + octet_str(key_hash)
+               + tag(0x02, serial.to_bytes(serial.bit_length() // 8 + 1, "big")))
+
+def build_request(issuer: Issuer, serials: List[int], hash_name: str = "sha1") -> bytes:
+    """OCSPRequest for serials issued by `issuer` (no nonce) - for clients and tests"""
+    requests = b"".join(seq(cert_id(issuer, serial, hash_name)) for serial in serials)
+    return seq(seq(seq(requests)))
+
+# ============================================================================
+# RESPONSES
+# ============================================================================
+
+def cert_status(status: str, reason_code: Optional[int] = None,
+                revocation_time: Optional[datetime] = None) -> bytes:
+    """CertStatus CHOICE for 'good', 'revoked' or 'unknown'"""
+    if status == "good":
+        return b"\x80\x00"
+    if status == "revoked":
+        info = gentime(revocation_time)
+        if reason_code is not None:
+            info += explicit(0, enumerated(reason_code))
+        return tag(0xa1, info)
+    return b"\x82\x00"
+
+def single_response(cert_id_der: bytes, status_der: bytes,
+                    this_update: datetime, next_update: datetime) -> bytes:
+    return seq(cert_id_der + status_der + gentime(this_update) +
+               explicit(0, gentime(next_update)))
+
+def response_data(responder_name_der: bytes, produced_at: datetime,
+                  responses: List[bytes]) -> bytes:
+    """tbsResponseData with a byName ResponderID; this is what gets signed"""
+    return seq(explicit(1, responder_name_der) + gentime(produced_at) +
+               seq(b"".join(responses)))
+
+def ocsp_response(tbs_der: bytes, signature: bytes, sig_oid: str = OID_MLDSA87) -> bytes:
+    """Successful OCSPResponse wrapping a signed BasicOCSPResponse"""
+    basic = seq(tbs_der + seq(oid(sig_oid)) + bit_str(signature))
+    return seq(enumerated(SUCCESSFUL) +
+               explicit(0, seq(oid(OID_OCSP_BASIC) + octet_str(basic))))
+
+def error_response(status: int) -> bytes:
+    """Unsigned OCSPResponse carrying only a responseStatus"""
+    return seq(enumerated(status))
+
+CERT_STATUS_TAGS = {0x80: "good", 0xa1: "revoked", 0x82: "unknown"}
+
+def response_statuses(der: bytes) -> List[Tuple[int, str]]:
+    """(serial, certStatus) of each SingleResponse in a successful
+    OCSPResponse - for clients and tests; the signature is not checked"""
+    try:
+        _, start, end = read_tlv(der)
+        status, body = children(der, start, end)[:2]
+        if der[status[2]:status[3]] != bytes([SUCCESSFUL]):
+            raise DERError("not a successful OCSPResponse")
+        _, _, rb_start, rb_end = children(der, body[2], body[3])[0]    # responseBytes
+        _, _, basic_start, basic_end = children(der, rb_start, rb_end)[1]
+        _, basic_start, _ = read_tlv(der, basic_start)                 # BasicOCSPResponse
+        _, tbs_start, tbs_end = read_tlv(der, basic_start)
+        # version [0], responderID [1]/[2], producedAt, then the responses
+        responses = next(c for c in children(der, tbs_start, tbs_end) if c[0] == 0x30)
+        found = []
+        for _, _, r_start, r_end in children(der, responses[2], responses[3]):
+            cid, cert_status_tlv = children(der, r_start, r_end)[:2]
+            serial = _parse_cert_id(der, cid[1], cid[2], cid[3]).serial
+            found.append((serial, CERT_STATUS_TAGS.get(cert_status_tlv[0], "unknown")))
+        return found
+    except (IndexError, StopIteration, ValueError) as e:
+        raise DERError(str(e)) from e
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Async load generator for the OCSP responder - capacity sizing before rollout
+
+Opens many concurrent connections with asyncio and queries serials drawn
+from index.txt:
+  * status mix    fractions of good / revoked / unknown serials
+                  (unknown serials are ones the index does not contain)
+  * hit/miss mix  --hot-ratio of requests go to a small hot set of
+                  serials (cache hits once warm); the rest are drawn
+                  from the whole index (mostly cache misses)
+
+Two ways to drive load:
+  closed loop     --concurrency N workers, each sending its next request
+                  as soon as the previous answer arrives
+  open loop       --rate R requests/s on a fixed schedule; latency is
+                  measured from the scheduled send time, so a slow
+                  server cannot hide its queueing (coordinated omission)
+
+Reports throughput, p50/p95/p99/max latency and errors by kind.
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional
+
+import ocsp_der
+import ocsp_binary
+from index_parser import STATUS_VALID, STATUS_REVOKED, load_columns
+
+HOST = "127.0.0.1"
+PORT = 2560
+PROTOCOLS = ("text", "binary", "http")
+STATUSES = ("good", "revoked", "unknown")
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+
+class SerialPicker:
+    """Draws (serial, expected status) with a status mix and a hot set"""
+
+    def __init__(self, index_path: str, mix: Dict[str, float], hot_ratio: float = 0.0,
+                 hot_set: int = 100, seed: int = 1):
+        cols = load_columns(index_path)
+        pools = {"good": [], "revoked": []}
+        for serial, status in zip(cols.serials, cols.status):
+            if status == STATUS_VALID:
+                pools["good"].append(serial)
+            elif status == STATUS_REVOKED:
+                pools["revoked"].append(serial)
+        start = (max(cols.serials) + 1) if len(cols) else 1
+        pools["unknown"] = range(start + 0x100000, start + 0x100000 + max(len(cols), 1000))
+
+        self.rng = random.Random(seed)
+        self.statuses = [s for s in STATUSES if mix.get(s, 0) > 0 and len(pools[s])]
+        if not self.statuses:
+            raise ValueError("status mix selects no serials present in the index")
+        self.weights = [mix[s] for s in self.statuses]
+        self.pools = pools
+        self.hot_ratio = hot_ratio
+        self.hot = {s: [self.rng.choice(pools[s]) for _ in range(min(hot_set, len(pools[s])))]
+                    for s in self.statuses}
+
+    def pick(self):
+        status = self.rng.choices(self.statuses, self.weights)[0]
+        pool = self.hot[status] if self.rng.random() < self.hot_ratio else self.pools[status]
+        return pool[self.rng.randrange(len(pool))], status
+
+# ============================================================================
+# PROTOCOL CLIENTS
+# ============================================================================
+
+class CheckFailed(Exception):
+    """Reply arrived but was not what the protocol promises"""
+
+class Mismatch(Exception):
+    """Reply reported a different status than the index holds"""
+
+class TryLater(Exception):
+    """The responder shed the request (tryLater)"""
+
+async def _read_all(reader) -> bytes:
+    chunks = []
+    while chunk := await reader.read(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+async def query_text(host, port, serial, expected, issuer=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"serial={serial:X}".encode())
+        await writer.drain()
+        reply = await _read_all(reader)
+    finally:
+        writer.close()
+    if reply.startswith(b"ERROR: tryLater"):
+        raise TryLater()
+    if b"Status:" not in reply:
+        raise CheckFailed(reply[:60])
+    if f"Status:     {expected.upper()}".encode() not in reply:
+        raise Mismatch(expected)
+
+async def query_http(host, port, serial, expected, issuer=None):
+    body = ocsp_der.build_request(issuer, [serial])
+    head = (f"POST / HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/ocsp-request\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(head + body)
+        await writer.drain()
+        reply = await _read_all(reader)
+    finally:
+        writer.close()
+    if not reply.startswith(b"HTTP/1.1 200"):
+        raise CheckFailed(reply[:60])
+    # responseStatus sits right after the outer SEQUENCE header of the body
+    ocsp = reply.partition(b"\r\n\r\n")[2]
+    _, start, _ = ocsp_der.read_tlv(ocsp)
+    if ocsp[start:start + 3] == b"\x0a\x01\x03":
+        raise TryLater()
+    if ocsp[start:start + 3] != b"\x0a\x01\x00":
+        raise CheckFailed(f"OCSP responseStatus {ocsp[start + 2]}")
+    try:
+        statuses = ocsp_der.response_statuses(ocsp)
+    except ocsp_der.DERError as e:
+        raise CheckFailed(f"bad OCSP response: {e}") from e
+    if statuses != [(serial, expected)]:
+        raise Mismatch(expected)
+
+class BinaryConnection:
+    """One persistent binary-protocol connection, one request at a time"""
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    @classmethod
+    async def open(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def query(self, serial, expected):
+        self.writer.write(ocsp_binary.encode_request(serial))
+        await self.writer.drain()
+        header = await self.reader.readexactly(ocsp_binary.FRAME_HEADER.size)
+        (length,) = ocsp_binary.FRAME_HEADER.unpack(header)
+        result = ocsp_binary.decode_response(await self.reader.readexactly(length))
+        if result["status"] == "error":
+            raise TryLater() if result["error"] == "tryLater" else CheckFailed(result["error"])
+        if result["status"] != expected:
+            raise Mismatch(expected)
+
+    def close(self):
+        self.writer.close()
+
+# ============================================================================
+# DRIVERS
+# ============================================================================
+
+class LoadResult:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = Counter()
+        self.elapsed = 0.0
+
+    def record_error(self, exc: BaseException):
+        if isinstance(exc, asyncio.TimeoutError):
+            self.errors["timeout"] += 1
+        elif isinstance(exc, Mismatch):
+            self.errors["status-mismatch"] += 1
+        elif isinstance(exc, TryLater):
+            self.errors["try-later"] += 1
+        elif isinstance(exc, CheckFailed):
+            self.errors["bad-reply"] += 1
+        elif isinstance(exc, (ConnectionError, OSError, asyncio.IncompleteReadError)):
+            self.errors["connection"] += 1
+        else:
+            self.errors[type(exc).__name__] += 1
+
+    def summary(self) -> Dict:
+        ordered = sorted(self.latencies)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+        ok = len(ordered)
+        report = {
+            "requests": ok + sum(self.errors.values()),
+            "ok": ok,
+            "errors": dict(self.errors),
+            "seconds": round(self.elapsed, 3),
+            "throughput_per_s": round(ok / self.elapsed, 1) if self.elapsed else 0.0,
+        }
+        if ordered:
+            report.update({"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+                           "max_ms": round(ordered[-1] * 1000, 3)})
+        return report
+
+async def _one(protocol, host, port, issuer, conn, serial, expected, timeout):
+    if protocol == "binary":
+        await asyncio.wait_for(conn.query(serial, expected), timeout)
+    elif protocol == "http":
+        await asyncio.wait_for(query_http(host, port, serial, expected, issuer), timeout)
+    else:
+        await asyncio.wait_for(query_text(host, port, serial, expected), timeout)
+
+async def run_closed_loop(protocol, host, port, picker, concurrency, duration, timeout,
+                          issuer=None) -> LoadResult:
+    result = LoadResult()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        conn = None
+        while time.perf_counter() < deadline:
+            serial, expected = picker.pick()
+            start = time.perf_counter()
+            try:
+                if protocol == "binary" and conn is None:
+                    conn = await asyncio.wait_for(BinaryConnection.open(host, port), timeout)
+                await _one(protocol, host, port, issuer, conn, serial, expected, timeout)
+                result.latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                result.record_error(e)
+                if conn is not None and not isinstance(e, (Mismatch, TryLater)):
+                    conn.close()
+                    conn = None
+        if conn is not None:
+            conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+async def run_open_loop(protocol, host, port, picker, rate, duration, timeout,
+                        max_inflight, issuer=None) -> LoadResult:
+    result = LoadResult()
+    slots = asyncio.Semaphore(max_inflight)
+    idle: List[BinaryConnection] = []
+
+    async def request(scheduled, serial, expected):
+        conn = None
+        try:
+            async with slots:
+                if protocol == "binary":
+                    conn = idle.pop() if idle else \
+                        await asyncio.wait_for(BinaryConnection.open(host, port), timeout)
+                await _one(protocol, host, port, issuer, conn, serial, expected, timeout)
+            # From the scheduled send time, including any wait for a slot
+            result.latencies.append(time.perf_counter() - scheduled)
+            if conn is not None:
+                idle.append(conn)
+        except Exception as e:
+            result.record_error(e)
+            if conn is not None:
+                conn.close()
+
+    tasks = []
+    start = time.perf_counter()
+    total = int(rate * duration)
+    for i in range(total):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(scheduled, *picker.pick())))
+    await asyncio.gather(*tasks)
+    result.elapsed = time.perf_counter() - start
+    for conn in idle:
+        conn.close()
+    return result
+
+def run_load(index_path: str, protocol: str = "text", host: str = HOST, port: int = PORT,
+             concurrency: int = 50, rate: Optional[float] = None, duration: float = 10.0,
+             mix: Optional[Dict[str, float]] = None, hot_ratio: float = 0.0, hot_set: int = 100,
+             timeout: float = 5.0, max_inflight: int = 1000, ca_cert: Optional[str] = None,
+             seed: int = 1) -> Dict:
+    """Run one load test and return its summary (blocking)"""
+    if protocol not in PROTOCOLS:
+        raise ValueError(f"Unknown protocol: {protocol}")
+    issuer = ocsp_der.load_issuer(ca_cert) if protocol == "http" else None
+    picker = SerialPicker(index_path, mix or {"good": 0.8, "revoked": 0.15, "unknown": 0.05},
+                          hot_ratio, hot_set, seed)
+    if rate:
+        coro = run_open_loop(protocol, host, port, picker, rate, duration, timeout,
+                             max_inflight, issuer)
+    else:
+        coro = run_closed_loop(protocol, host, port, picker, concurrency, duration, timeout,
+                               issuer)
+    summary = asyncio.run(coro).summary()
+    summary.update({"protocol": protocol, "mode": f"open ({rate}/s)" if rate
+                    else f"closed ({concurrency} connections)"})
+    return summary
+
+def print_summary(summary: Dict):
+    print(f"\n📈 Load test: {summary['protocol']}, {summary['mode']}")
+    print("=" * 70)
+    print(f"  Requests:   {summary['requests']:,} ({summary['ok']:,} ok) "
+          f"in {summary['seconds']:.1f}s")
+    print(f"  Throughput: {summary['throughput_per_s']:,.1f} req/s")
+    if "p50_ms" in summary:
+        print(f"  Latency:    p50 {summary['p50_ms']:.2f} ms  p95 {summary['p95_ms']:.2f} ms  "
+              f"p99 {summary['p99_ms']:.2f} ms  max {summary['max_ms']:.2f} ms")
+    errors = ", ".join(f"{k}={v}" for k, v in sorted(summary["errors"].items())) or "none"
+    print(f"  Errors:     {errors}")
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        if name not in STATUSES:
+            raise argparse.ArgumentTypeError(f"unknown status {name!r}")
+        mix[name] = float(value)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog="\n".join(__doc__.strip().splitlines()[1:]))
+    parser.add_argument("--index", required=True, help="index.txt to draw serials from")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default="text")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--concurrency", type=int, default=50,
+                        help="closed loop: concurrent connections (default: 50)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="open loop: requests per second (overrides --concurrency)")
+    parser.add_argument("--max-inflight", type=int, default=1000,
+                        help="open loop: cap on outstanding requests (default: 1000)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds (default: 10)")
+    parser.add_argument("--mix", type=parse_mix, default="good=0.8,revoked=0.15,unknown=0.05",
+                        help="status mix (default: good=0.8,revoked=0.15,unknown=0.05)")
+    parser.add_argument("--hot-ratio", type=float, default=0.0,
+                        help="fraction of requests for the hot set (default: 0)")
+    parser.add_argument("--hot-set", type=int, default=100,
+                        help="hot serials per status (default: 100)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="per request (default: 5)")
+    parser.add_argument("--ca-cert", default=None, help="issuer certificate (http protocol)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    if args.protocol == "http" and not args.ca_cert:
+        parser.error("--ca-cert is required for the http protocol")
+    summary = run_load(args.index, args.protocol, args.host, args.port, args.concurrency,
+                       args.rate, args.duration, args.mix, args.hot_ratio, args.hot_set,
+                       args.timeout, args.max_inflight, args.ca_cert, args.seed)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+    sys.exit(1 if summary["errors"] else 0)
+
+if __name__ == "__main__":
+    main()
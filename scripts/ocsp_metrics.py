@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Low-overhead instrumentation for the OCSP responder
+
+  * Histogram    fixed latency buckets; observe() is a bisect and a few adds
+  * Metrics      per-stage histograms and labelled counters, rendered as
+                 Prometheus text or JSON
+  * MetricsServer  local HTTP endpoint: /metrics (Prometheus), /metrics.json
+  * setup_logging  request logging through a QueueHandler, so the serving
+                 threads never block on console I/O; can be switched off
+
+Stages are named after what they time ("accept_wait", "parse", "lookup",
+"sign", "send"), so a latency spike can be pinned on the signer, the
+status database or the network.
+"""
+
+import sys
+import json
+import queue
+import bisect
+import logging
+import threading
+import logging.handlers
+from contextlib import contextmanager
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in seconds: 1us .. 10s in 1-2.5-5 steps. Lookups and parsing
+# take microseconds, signing and network waits milliseconds.
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "ocsp"
+LOGGER_NAME = "ocsp"
+
+# ============================================================================
+# HISTOGRAMS AND COUNTERS
+# ============================================================================
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'max', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)     # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        i = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        with self._lock:
+            counts, total, largest = list(self.counts), self.count, self.max
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for bound, n in zip(self.bounds + (largest,), counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, largest)
+        return largest
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum_s': round(self.sum, 6),
+            'mean_ms': round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+class Metrics:
+    """Named stage histograms plus counters keyed by (name, label)"""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        hist = self.histograms.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(stage, Histogram(self.bounds))
+        return hist
+
+    def observe(self, stage: str, seconds: float):
+        self.histogram(stage).observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, perf_counter() - start)
+
+    def count(self, name: str, label: str = "", n: int = 1):
+        with self._lock:
+            self.counters[(name, label)] += n
+
+    def snapshot(self) -> Dict:
+        """JSON-ready view: stage latency summaries and counters"""
+        with self._lock:
+            counters = dict(self.counters)
+        grouped: Dict[str, Dict[str, int]] = {}
+        for (name, label), value in sorted(counters.items()):
+            grouped.setdefault(name, {})[label or "total"] = value
+        return {'stages': {stage: hist.snapshot()
+                           for stage, hist in sorted(self.histograms.items())},
+                'counters': grouped}
+
+    def prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        lines.append(f"# HELP {name} Time spent in each request stage")
+        lines.append(f"# TYPE {name} histogram")
+        for stage, hist in sorted(self.histograms.items()):
+            with hist._lock:
+                counts, total, sum_ = list(hist.counts), hist.count, hist.sum
+            cumulative = 0
+            for bound, n in zip(hist.bounds, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {total}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {sum_:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {total}')
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+        declared = set()
+        for (counter, label), value in counters:
+            metric = f"{METRIC_PREFIX}_{counter}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            labels = f'{{kind="{label}"}}' if label else ""
+            lines.append(f"{metric}{labels} {value}")
+
+        for gauge, value in sorted((gauges or {}).items()):
+            metric = f"{METRIC_PREFIX}_{gauge}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+# ============================================================================
+# ENDPOINT
+# ============================================================================
+
+class MetricsServer:
+    """Serve /metrics and /metrics.json from a daemon thread
+
+    `gauges` is called on every scrape for point-in-time values such as
+    cache size; it returns {name: number}.
+    """
+
+    def __init__(self, metrics: Metrics, host: str, port: int, gauges=None):
+        self.metrics = metrics
+        self.gauges = gauges or (lambda: {})
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    body = owner.metrics.prometheus(owner.gauges()).encode()
+                    ctype = "text/plain; version=0.0.4"
+                elif path == "/metrics.json":
+                    data = owner.metrics.snapshot()
+                    data['gauges'] = owner.gauges()
+                    body = json.dumps(data, indent=2).encode()
+                    ctype = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       name="ocsp-metrics", daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+def setup_logging(enabled: bool = True, stream=None) -> Optional[logging.handlers.QueueListener]:
+    """Route the responder's logger through a queue drained by one thread
+
+    Returns the running listener (stop() it on shutdown), or None when
+    logging is switched off - then log calls return after a level check.
+    """
+    log = logging.getLogger(LOGGER_NAME)
+    log.propagate = False
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+    if not enabled:
+        log.setLevel(logging.CRITICAL + 1)
+        return None
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(records, output)
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.setLevel(logging.INFO)
+    listener.start()
+    return listener
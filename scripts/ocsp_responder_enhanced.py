@@ -6,166 +6,980 @@ Module 7 PQC Lab - Simplified but Functional
 
 import os
 import sys
+import argparse
+import signal
+import select
+import selectors
 import socket
-import ctypes
-import base64
+import zlib
+import time
+import bisect
+import asyncio
+import queue
 import hashlib
-from datetime import datetime, timezone
-from ctypes import c_uint8, c_size_t, c_int, c_void_p, c_char_p, POINTER, byref
-from typing import Optional, Tuple, Dict
+import logging
+import functools
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Tuple, Dict, Callable, Iterator, List, Union
+
+from email.utils import format_datetime
+from signing_pool import SigningPool
+from signer_backends import (MLDSA87_SK_LEN, MLDSA87_PK_LEN, MLDSA87_SIG_LEN,
+                             compose, open_backend, select_backend)
+import ocsp_der
+import ocsp_binary
+import ocsp_loadgen
+from ocsp_der import DERError
+from http_cache import http_reply, not_modified
+from ocsp_metrics import LOGGER_NAME, Metrics, MetricsServer, setup_logging
+from shared_snapshot import ControlBlock, StatusSnapshot, publish_snapshot
+from response_store import ResponseStore, StoreEntry, WatchedStore, write_store
+from index_parser import (STATUS_VALID, STATUS_REVOKED, IndexColumns, parse_buffer,
+                          parse_line, serial_column)
 
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
-OQS_DLL = r"C:\oqs-build\oqs-provider\build\lib\oqsprovider.dll"
-MINGW_BIN = r"C:\Ruby33-x64\msys64\mingw64\bin"
 INDEX_TXT = r"C:\Users\user\Desktop\PQC\pqc-lab\lab-work\openssl-pqc-stepbystep-lab\fipsqs\03_fips_quantum_ca_intermediate\intermediate\index.txt"
+CA_CERT = r"C:\Users\user\Desktop\PQC\pqc-lab\lab-work\openssl-pqc-stepbystep-lab\fipsqs\03_fips_quantum_ca_intermediate\intermediate\certs\intermediate_ca.crt"
 CA_KEY = r"C:\Users\user\Desktop\PQC\pqc-lab\lab-work\openssl-pqc-stepbystep-lab\fipsqs\03_fips_quantum_ca_intermediate\intermediate\private\intermediate_ca.key"
+# ECDSA P-384/P-521 or RSA-3072/4096 key (PEM) to sign ML-DSA-87 +
+# classical composites with; None signs ML-DSA-87 alone. The two component
+# signatures are made concurrently (CompositeBackend in signer_backends.py).
+CLASSICAL_KEY = None
 HOST = "127.0.0.1"
 PORT = 2560
 
+# Signing backends timed at start-up; the fastest signs (signer_backends.py).
+# Add "standin" only for dry runs - it does not produce real signatures.
+SIGNING_BACKENDS = ("liboqs", "openssl")
+
+# Serving engine: "serial" (one client at a time), "thread" (worker pool)
+# or "asyncio" (event loop, signing offloaded to the worker pool).
+# ctypes drops the GIL around the backend's sign call, so workers sign in
+# parallel.
+SERVE_MODE = "thread"
+SERVE_MODES = ("serial", "thread", "asyncio")
+LISTEN_BACKLOG = 128
+WORKER_THREADS = os.cpu_count() or 4
+MAX_INFLIGHT = 64           # connections accepted but not yet answered; more are shed
+
+# Overload protection. A client has READ_TIMEOUT seconds to deliver its
+# request and WRITE_TIMEOUT to take the reply. At most MAX_SIGNING
+# signatures run at once and MAX_SIGN_QUEUE more requests wait for one,
+# each for up to MAX_SIGN_WAIT seconds; beyond that, and beyond
+# MAX_INFLIGHT connections, requests are answered tryLater at once, so
+# the admitted ones keep a bounded latency under a spike.
+READ_TIMEOUT = 5.0
+WRITE_TIMEOUT = 5.0
+MAX_SIGNING = WORKER_THREADS
+MAX_SIGN_QUEUE = 32
+MAX_SIGN_WAIT = 1.0
+SHED_WAIT = 0.5             # time a refused client gets to send the request tryLater answers
+MAX_SHED_PENDING = 256      # refused connections awaiting that; more are closed outright
+TRY_LATER_TEXT = b"ERROR: tryLater - responder busy, retry shortly"
+
+# Worker processes. Above 1 a supervisor (Linux, fork) loads the key and
+# index once, shares them through shared memory and forks workers that all
+# bind HOST:PORT with SO_REUSEPORT. Worker i serves metrics on
+# METRICS_PORT + 1 + i.
+PROCESSES = 1
+WORKER_READY_TIMEOUT = 30   # seconds to wait for a worker to start listening
+
+# Pre-signed response cache: one signature per (serial, status) per window
+RESPONSE_VALIDITY = 3600    # seconds from thisUpdate to nextUpdate
+CACHE_MAX_ENTRIES = 100000  # LRU bound; 0 disables the cache
+CACHE_REFRESH_MARGIN = 300  # re-sign entries this many seconds before nextUpdate
+CACHE_REFRESH_INTERVAL = 30 # how often the background refresher wakes up
+
+# RFC 6960 over HTTP, sniffed on the same port as the text protocol.
+# GET requests are HTTP_PATH followed by the url-encoded base64 request.
+# Nonces are not echoed (RFC 5019 profile), so every response is cacheable.
+HTTP_PATH = "/"
+HTTP_METHODS = (b"GET ", b"POST ")
+MAX_HTTP_REQUEST = 16 * 1024
+
+# Length-prefixed binary protocol (see ocsp_binary.py), recognised by a
+# leading 0x00 byte. Connections stay open for many pipelined queries. In
+# "thread" mode a connection with no frame for BINARY_PARK_AFTER seconds
+# gives back its worker and in-flight slot and waits in an IdleParker until
+# its next frame, so idle clients never fill max_inflight.
+BINARY_IDLE_TIMEOUT = 30    # seconds without a frame before closing
+BINARY_PARK_AFTER = 0.002   # "thread" mode: keeps a busy client on its worker, no longer
+MAX_PARKED = 1024           # idle binary connections held; more are closed
+BINARY_VARIANT = "binary"   # response-cache variant for binary replies
+
+# Requests naming several serials (RFC 6960 requestList, or "serial=a,b,c")
+# are answered with one signature over all statuses. Batches bypass the
+# per-serial response cache.
+MAX_BATCH_SERIALS = 64
+
+INDEX_POLL_INTERVAL = 2.0   # seconds between index.txt stat() checks
+
+PRESIGN_WORKERS = os.cpu_count() or 1   # processes used to pre-sign every serial
+
+# Offline response store (see response_store.py): --build-store signs the
+# text, binary and DER responses of every serial into one file, valid for
+# STORE_VALIDITY seconds; --serve-store answers from it without a signer
+# or index.txt, sending stored bytes with sendfile. Rebuild it well before
+# nextUpdate - the responder picks up the replaced file by itself.
+RESPONSE_STORE = r"C:\Users\user\Desktop\PQC\pqc-lab\lab-work\openssl-pqc-stepbystep-lab\fipsqs\07_ocsp_responder\ocsp_responses.store"
+STORE_VALIDITY = 24 * 3600
+STORE_BATCH = 1024          # serials signed per round trip to the pool
+SENDFILE = hasattr(os, "sendfile")  # else replies are written from the mapping
+
+# Instrumentation (see ocsp_metrics.py): per-stage latency histograms and
+# counters on http://HOST:METRICS_PORT/metrics (0 disables the endpoint).
+# Per-request log lines go through a background queue; LOG_REQUESTS = False
+# switches them off.
+METRICS_PORT = 9560
+LOG_REQUESTS = True
+
+log = logging.getLogger(LOGGER_NAME)
+
 # ============================================================================
 # ML-DSA-87 SIGNER
 # ============================================================================
 
 class MLDSA87Signer:
-    """Handles ML-DSA-87 signing using oqsprovider"""
-    
-    def __init__(self):
-        self.oqs = None
-        self.key_bytes = None
-        self._load_dlls()
-        self._extract_key()
-        self._setup_functions()
-        print("[✓] ML-DSA-87 Signer initialized")
-    
-    def _load_dlls(self):
-        """Load libcrypto and oqsprovider"""
-        os.environ["PATH"] = MINGW_BIN + os.pathsep + os.environ.get("PATH", "")
-        crypto_dll = os.path.join(MINGW_BIN, "libcrypto-3-x64.dll")
-        ctypes.CDLL(crypto_dll)
-        self.oqs = ctypes.CDLL(OQS_DLL)
-    
-    def _extract_key(self):
-        """Extract raw ML-DSA-87 private key from PEM"""
+    """ML-DSA-87 signing with CA_KEY on the fastest available backend
+    
+    By default every backend in SIGNING_BACKENDS is timed at start-up and
+    the fastest is kept (see signer_backends.py); pass a backend spec to
+    open one directly, optionally keeping the secret key in `key_buffer`.
+    With CLASSICAL_KEY set it signs ML-DSA-87 + classical composites.
+    Call close() when done.
+    """
+    
+    def __init__(self, backend: Optional[str] = None, key_buffer=None):
+        self._public_key = None
         with open(CA_KEY, 'rb') as f:
-            pem_data = f.read()
-        
-        lines = pem_data.split(b'\n')
-        der_b64 = b''.join([l for l in lines if l and not l.startswith(b'-----')])
-        der_data = base64.b64decode(der_b64)
-        
-        key_start = der_data.find(b'\x04\x82\x13\x20')
-        if key_start > 0:
-            self.key_bytes = der_data[key_start+4:key_start+4+4896]
-            print(f"[✓] Extracted {len(self.key_bytes)}-byte ML-DSA-87 key")
+            key_pem = f.read()
+        classical_pem = None
+        if CLASSICAL_KEY:
+            with open(CLASSICAL_KEY, 'rb') as f:
+                classical_pem = f.read()
+        if backend:
+            if classical_pem and backend.partition(":")[0] == "composite":
+                key_pem += classical_pem
+            self.backend = open_backend(backend, key_pem, key_buffer)
         else:
-            raise Exception("Could not find ML-DSA-87 key")
+            try:
+                self._public_key = ocsp_der.load_issuer(CA_CERT).key_bytes
+            except (OSError, DERError, IndexError):
+                pass    # no sign/verify round trip at selection time
+            self.backend = select_backend(key_pem, SIGNING_BACKENDS, self._public_key)
+            if classical_pem:
+                self.backend = compose(self.backend, classical_pem)
+        print(f"[✓] {self.algorithm} Signer initialized ({self.backend.name})")
     
-    def _setup_functions(self):
-        """Setup OQS API function signatures"""
-        self.OQS_SIG_new = self.oqs.OQS_SIG_new
-        self.OQS_SIG_new.restype = c_void_p
-        self.OQS_SIG_new.argtypes = [c_char_p]
-        
-        self.OQS_SIG_free = self.oqs.OQS_SIG_free
-        self.OQS_SIG_free.restype = None
-        self.OQS_SIG_free.argtypes = [c_void_p]
-        
-        self.OQS_SIG_sign = self.oqs.OQS_SIG_sign
-        self.OQS_SIG_sign.restype = c_int
-        self.OQS_SIG_sign.argtypes = [c_void_p, POINTER(c_uint8), POINTER(c_size_t),
-                                      POINTER(c_uint8), c_size_t, POINTER(c_uint8)]
+    @property
+    def spec(self) -> str:
+        """Backend spec that reopens this signer's backend in another process"""
+        return self.backend.spec
+    
+    @property
+    def algorithm(self) -> str:
+        return self.backend.algorithm
+    
+    @property
+    def algorithm_oid(self) -> str:
+        """signatureAlgorithm of what sign() returns"""
+        return self.backend.algorithm_oid
     
     def sign(self, message: bytes) -> bytes:
         """Sign a message with ML-DSA-87"""
-        method_name = b"ML-DSA-87"
-        sig_obj = self.OQS_SIG_new(method_name)
-        if not sig_obj:
-            raise Exception("Failed to create ML-DSA-87 signer")
-        
-        try:
-            msg_buf = (c_uint8 * len(message)).from_buffer_copy(message)
-            key_buf = (c_uint8 * len(self.key_bytes)).from_buffer_copy(self.key_bytes)
-            
-            sig_len = c_size_t(4627)
-            sig_buf = (c_uint8 * 4627)()
-            
-            result = self.OQS_SIG_sign(sig_obj, sig_buf, byref(sig_len),
-                                       msg_buf, len(message), key_buf)
-            
-            if result != 0:
-                raise Exception(f"Signing failed with code {result}")
-            
-            return bytes(sig_buf)[:sig_len.value]
-            
-        finally:
-            self.OQS_SIG_free(sig_obj)
+        return self.backend.sign(message)
+    
+    def verify(self, message: bytes, signature: bytes, public_key: Optional[bytes] = None) -> bool:
+        """Verify an ML-DSA-87 signature, by default against CA_CERT's key"""
+        if public_key is None:
+            if self._public_key is None:
+                self._public_key = ocsp_der.load_issuer(CA_CERT).key_bytes
+            public_key = self._public_key
+        if len(public_key) != MLDSA87_PK_LEN:
+            raise ValueError(f"Expected a {MLDSA87_PK_LEN}-byte ML-DSA-87 public key")
+        return self.backend.verify(message, signature, public_key)
+    
+    def close(self):
+        self.backend.close()
+    
+    def __enter__(self):
+        return self
     
-    def cleanup(self):
-        """Free resources"""
-        pass
+    def __exit__(self, *exc):
+        self.close()
+
+def open_signer(backend: Optional[str] = None) -> Callable[[bytes], bytes]:
+    """SigningPool factory: each worker process loads its own signer
+    
+    Pass the parent's MLDSA87Signer.spec (via functools.partial) so workers
+    skip the start-up timing and use the same backend.
+    """
+    return MLDSA87Signer(backend).sign
+
+# ============================================================================
+# STATUS STORE
+# ============================================================================
+
+REASON_NAMES = {
+    0: 'Unspecified', 1: 'Key Compromise', 2: 'CA Compromise',
+    3: 'Affiliation Changed', 4: 'Superseded', 5: 'Cessation of Operation',
+    6: 'Certificate Hold', 8: 'Remove from CRL', 9: 'Privilege Withdrawn',
+    10: 'AA Compromise',
+}
+
+def normalize_serial(serial: Union[str, int]) -> Optional[int]:
+    """Turn a hex serial string (as in index.txt) into an int"""
+    if isinstance(serial, int):
+        return serial
+    try:
+        return int(serial.strip(), 16)
+    except ValueError:
+        return None
+
+def format_serial(serial: int) -> str:
+    """Format a serial the way index.txt does (upper-case, even-length hex)"""
+    text = f"{serial:X}"
+    return text if len(text) % 2 == 0 else "0" + text
+
+class CompactStatusStore:
+    """Sorted columnar store of certificate status
+    
+    Three parallel columns sorted by serial: the serial itself (uint64, or
+    Python ints when a CA issues wider serials), a packed flag byte
+    ``status << 4 | reason`` and the revocation time in epoch seconds.
+    Lookups are a binary search. The store is never mutated; ``merged()``
+    returns an updated copy so it can be swapped in atomically.
+    """
+    
+    __slots__ = ('serials', 'flags', 'rev_times')
+    
+    def __init__(self, serials=None, flags=None, rev_times=None):
+        self.serials = serials if serials is not None else serial_column()
+        self.flags = flags if flags is not None else array('B')
+        self.rev_times = rev_times if rev_times is not None else array('q')
+    
+    @classmethod
+    def from_records(cls, records: Dict[int, Tuple[int, int]]) -> "CompactStatusStore":
+        """Build from {serial: (flag, rev_time)}"""
+        keys = sorted(records)
+        serials = serial_column(keys)
+        flags = array('B', (records[k][0] for k in keys))
+        rev_times = array('q', (records[k][1] for k in keys))
+        return cls(serials, flags, rev_times)
+    
+    @classmethod
+    def from_columns(cls, cols: IndexColumns) -> "CompactStatusStore":
+        """Build from parsed index columns (later lines win on duplicates)"""
+        serials = cols.serials
+        flags = array('B', [(s << 4) | r for s, r in zip(cols.status, cols.reasons)])
+        rev_times = cols.rev_times
+        if all(a < b for a, b in zip(serials, serials[1:])):
+            # openssl issues serials in order, so this is the usual case
+            return cls(serials[:], flags, rev_times[:])
+        latest = {serial: row for row, serial in enumerate(serials)}
+        order = sorted(latest)
+        rows = [latest[serial] for serial in order]
+        return cls(serial_column(order), array('B', [flags[i] for i in rows]),
+                   array('q', [rev_times[i] for i in rows]))
+    
+    @staticmethod
+    def pack(status: int, reason: int) -> int:
+        return (status << 4) | (reason & 0x0F)
+    
+    def __len__(self):
+        return len(self.serials)
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns"""
+        if isinstance(self.serials, (array, memoryview)):
+            serial_bytes = self.serials.itemsize * len(self.serials)
+        else:
+            serial_bytes = sum(sys.getsizeof(v) + 8 for v in self.serials)
+        return serial_bytes + len(self.flags) + 8 * len(self.rev_times)
+    
+    def _index(self, serial: int) -> int:
+        serials = self.serials
+        i = bisect.bisect_left(serials, serial)
+        if i < len(serials) and serials[i] == serial:
+            return i
+        return -1
+    
+    def lookup(self, serial: int) -> Optional[Tuple[int, int]]:
+        """Return (flag, rev_time) for a serial, or None"""
+        i = self._index(serial)
+        if i < 0:
+            return None
+        return self.flags[i], self.rev_times[i]
+    
+    def merged(self, updates: Dict[int, Optional[Tuple[int, int]]]) -> "CompactStatusStore":
+        """Return a new store with updates applied (None removes a serial)"""
+        serials, flags, rev_times = self.serials[:], self.flags[:], self.rev_times[:]
+        inserts, deletes = [], []
+        for serial, record in updates.items():
+            i = bisect.bisect_left(serials, serial)
+            found = i < len(serials) and serials[i] == serial
+            if found and record is not None:
+                flags[i], rev_times[i] = record
+            elif found:
+                deletes.append(i)
+            elif record is not None:
+                inserts.append((serial, record))
+        
+        for i in sorted(deletes, reverse=True):
+            del serials[i], flags[i], rev_times[i]
+        
+        if inserts:
+            inserts.sort()
+            if isinstance(serials, array) and inserts[-1][0] >= 1 << 64:
+                serials = list(serials)
+            new_serials = serials[:0]
+            new_flags, new_times = array('B'), array('q')
+            prev = 0
+            for serial, (flag, rev_time) in inserts:
+                i = bisect.bisect_left(serials, serial, prev)
+                new_serials += serials[prev:i]
+                new_flags += flags[prev:i]
+                new_times += rev_times[prev:i]
+                new_serials.append(serial)
+                new_flags.append(flag)
+                new_times.append(rev_time)
+                prev = i
+            new_serials += serials[prev:]
+            new_flags += flags[prev:]
+            new_times += rev_times[prev:]
+            serials, flags, rev_times = new_serials, new_flags, new_times
+        
+        return CompactStatusStore(serials, flags, rev_times)
 
 # ============================================================================
 # CERTIFICATE DATABASE
 # ============================================================================
 
 class CertificateDatabase:
-    """Parse and query index.txt for certificate status"""
+    """Parse and query index.txt for certificate status
+    
+    Status lives in a CompactStatusStore keyed by integer serial. The file
+    can be watched for changes. Appended lines are parsed from the last
+    read offset; when the file is rewritten (``openssl ca`` replaces it via
+    rename) only lines whose CRC differs from the previous version at the
+    same position are parsed. Updates produce a new store that is swapped
+    in with a single assignment, so lookups never block on a reload.
+    ``generation`` increases on every applied change.
+    """
     
     def __init__(self, index_path: str):
         self.index_path = index_path
-        self.certs = {}
+        self.store = CompactStatusStore()
+        self.generation = 0
+        self._listeners: List[Callable[[int], None]] = []
+        self._reload_lock = threading.Lock()
+        self._file_sig = None           # (inode, size, mtime_ns) last read
+        self._offset = 0                # bytes consumed by the last read
+        self._line_crcs = array('I')    # CRC32 of each data line, in file order
+        self._line_serials = serial_column()  # serial of each data line
+        self._watch_stop = threading.Event()
+        self._watch_thread = None
         self._load()
     
+    def __len__(self):
+        return len(self.store)
+    
+    @staticmethod
+    def _record(line: bytes) -> Optional[Tuple[int, Tuple[int, int]]]:
+        """Parse one index.txt line into (serial, (flag, rev_time))"""
+        entry = parse_line(line)
+        if entry is None:
+            return None
+        return entry.serial, (CompactStatusStore.pack(entry.status, entry.reason),
+                              entry.revocation_time)
+    
+    def _stat(self):
+        st = os.stat(self.index_path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    
+    def _read(self, offset: int = 0) -> Tuple[bytes, int]:
+        """Read complete lines from offset; return them and the new offset"""
+        with open(self.index_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1    # leave a half-written last line for later
+        return data[:end], offset + end
+    
     def _load(self):
         """Load index.txt and parse certificate entries"""
-        with open(self.index_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split()
-                if len(parts) >= 6:
-                    status = parts[0]
-                    revocation_field = parts[2] if len(parts) > 2 else ""
-                    
-                    if ',' in revocation_field:
-                        revocation_date, revocation_reason = revocation_field.split(',', 1)
-                    else:
-                        revocation_date = revocation_field
-                        revocation_reason = ""
-                    
-                    serial_raw = parts[3] if len(parts) > 3 else ""
-                    
-                    if serial_raw and serial_raw != "unknown":
-                        self.certs[serial_raw] = {
-                            'status': status,
-                            'revocation_reason': revocation_reason,
-                            'revocation_date': revocation_date
-                        }
-    
-    def get_status(self, serial_str: str) -> Tuple[str, Optional[str]]:
-        """Get certificate status"""
-        cert = self.certs.get(serial_str.strip())
+        with self._reload_lock:
+            self._file_sig = self._stat()
+            data, self._offset = self._read()
+            cols = parse_buffer(data, with_crcs=True)
+            self._line_crcs = cols.crcs
+            self._line_serials = cols.serials
+            self.store = CompactStatusStore.from_columns(cols)
+            self.generation += 1
+    
+    def add_listener(self, callback: Callable[[int], None]):
+        """Call callback(serial) whenever a serial's entry changes"""
+        self._listeners.append(callback)
+    
+    def reload(self, force: bool = False) -> List[int]:
+        """Apply changes made to index.txt since the last read
         
-        if not cert:
-            return ('unknown', None)
+        Returns the serials whose entry changed; listeners are notified for
+        each. Without ``force`` nothing is read if inode, size and mtime are
+        unchanged.
+        """
+        with self._reload_lock:
+            sig = self._stat()
+            if sig == self._file_sig and not force:
+                return []
+            
+            old_sig = self._file_sig
+            appended = (old_sig is not None and not force
+                        and sig[0] == old_sig[0] and sig[1] > old_sig[1])
+            updates: Dict[int, Optional[Tuple[int, int]]] = {}
+            
+            if appended:
+                data, self._offset = self._read(self._offset)
+                cols = parse_buffer(data, with_crcs=True)
+                self._line_crcs.extend(cols.crcs)
+                line_serials = self._line_serials
+                if isinstance(line_serials, array) and not isinstance(cols.serials, array):
+                    line_serials = list(line_serials)
+                line_serials.extend(cols.serials)
+                self._line_serials = line_serials
+                for row, serial in enumerate(cols.serials):
+                    updates[serial] = ((cols.status[row] << 4) | cols.reasons[row],
+                                       cols.rev_times[row])
+            else:
+                data, self._offset = self._read()
+                old_crcs, old_serials = self._line_crcs, self._line_serials
+                new_crcs, new_serials = array('I'), []
+                removed = set()
+                j = 0       # position among data lines, as in the parser's columns
+                for line in data.split(b'\n'):
+                    crc = zlib.crc32(line.rstrip(b'\r\n'))
+                    if j < len(old_crcs) and old_crcs[j] == crc:
+                        new_crcs.append(crc)
+                        new_serials.append(old_serials[j])
+                        j += 1
+                        continue
+                    record = self._record(line)
+                    if record is None:
+                        continue
+                    if j < len(old_serials):
+                        removed.add(old_serials[j])
+                    new_crcs.append(crc)
+                    new_serials.append(record[0])
+                    updates[record[0]] = record[1]
+                    j += 1
+                removed.update(old_serials[j:])
+                removed -= updates.keys()
+                if removed:
+                    # A serial whose old line changed may still appear elsewhere
+                    removed -= set(new_serials)
+                    for serial in removed:
+                        updates[serial] = None
+                self._line_crcs, self._line_serials = new_crcs, serial_column(new_serials)
+            
+            self._file_sig = sig
+            old = self.store
+            changed = [serial for serial, record in updates.items()
+                       if old.lookup(serial) != record]
+            if changed:
+                self.store = old.merged({serial: updates[serial] for serial in changed})
+                self.generation += 1        # the assignment above is the atomic swap
         
-        if cert['status'] == 'V':
+        for serial in changed:
+            for callback in self._listeners:
+                callback(serial)
+        return changed
+    
+    def _watch_loop(self, interval: float):
+        while not self._watch_stop.wait(interval):
+            try:
+                changed = self.reload()
+                if changed:
+                    print(f"[*] index.txt changed: {len(changed)} serial(s) updated "
+                          f"(generation {self.generation})")
+            except FileNotFoundError:
+                pass    # mid-rename; pick it up on the next poll
+            except Exception as e:
+                print(f"[!] index.txt reload error: {e}")
+    
+    def start_watching(self, interval: float = INDEX_POLL_INTERVAL):
+        """Poll index.txt in a background thread and apply changes"""
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, args=(interval,),
+                                              name="index-watch", daemon=True)
+        self._watch_thread.start()
+    
+    def stop_watching(self):
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join()
+            self._watch_thread = None
+    
+    def get_entry(self, serial: Union[str, int]) -> Optional[Tuple[int, int, int]]:
+        """Return (status code, reason code, revocation epoch) or None"""
+        serial_num = normalize_serial(serial)
+        if serial_num is None:
+            return None
+        record = self.store.lookup(serial_num)
+        if record is None:
+            return None
+        flag, rev_time = record
+        return flag >> 4, flag & 0x0F, rev_time
+    
+    @staticmethod
+    def _describe(status: int, reason: int) -> Tuple[str, Optional[str]]:
+        if status == STATUS_VALID:
             return ('good', None)
-        elif cert['status'] == 'R':
-            reason_map = {
-                'keyCompromise': 'Key Compromise',
-                'affiliationChanged': 'Affiliation Changed',
-                'superseded': 'Superseded',
-                'cessationOfOperation': 'Cessation of Operation'
-            }
-            return ('revoked', reason_map.get(cert['revocation_reason'], 'Unspecified'))
+        elif status == STATUS_REVOKED:
+            return ('revoked', REASON_NAMES.get(reason, 'Unspecified'))
         else:
             return ('unknown', None)
+    
+    def get_status(self, serial: Union[str, int]) -> Tuple[str, Optional[str]]:
+        """Get certificate status"""
+        entry = self.get_entry(serial)
+        
+        if not entry:
+            return ('unknown', None)
+        
+        status, reason, _ = entry
+        return self._describe(status, reason)
+    
+    def statuses(self):
+        """Yield (serial, status, reason) for every certificate in the store"""
+        store = self.store
+        for serial, flag in zip(store.serials, store.flags):
+            yield (serial,) + self._describe(flag >> 4, flag & 0x0F)
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class CachedResponse:
+    """A signed response together with its validity window"""
+    
+    __slots__ = ('serial', 'status', 'reason', 'variant', 'this_update', 'next_update',
+                 'body', 'signature')
+    
+    def __init__(self, serial, status, reason, variant, this_update, next_update,
+                 body, signature):
+        self.serial = serial
+        self.status = status
+        self.reason = reason
+        self.variant = variant
+        self.this_update = this_update
+        self.next_update = next_update
+        self.body = body
+        self.signature = signature
+
+class OCSPResponseCache:
+    """LRU cache of pre-signed responses keyed by (serial, status, reason, variant)
+    
+    `sign_fn(serial, status, reason, this_update, next_update, variant)`
+    produces (body, signature). The variant selects the encoding: None for
+    the text reply, or the client's CertID DER for an RFC 6960 response.
+    A background thread re-signs entries that are close to nextUpdate, so
+    popular serials never pay for a signature inline.
+    """
+    
+    def __init__(self, sign_fn: Callable, max_entries: int = CACHE_MAX_ENTRIES,
+                 validity: int = RESPONSE_VALIDITY,
+                 refresh_margin: int = CACHE_REFRESH_MARGIN,
+                 refresh_interval: int = CACHE_REFRESH_INTERVAL):
+        self.sign_fn = sign_fn
+        self.max_entries = max_entries
+        self.validity = timedelta(seconds=validity)
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.refresh_interval = refresh_interval
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._by_serial: Dict[Union[int, str], set] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_deferred': 0,
+                      'evictions': 0, 'invalidations': 0}
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _sign(self, serial, status, reason, variant) -> CachedResponse:
+        this_update = datetime.now(timezone.utc).replace(microsecond=0)
+        next_update = this_update + self.validity
+        body, signature = self.sign_fn(serial, status, reason, this_update, next_update,
+                                       variant)
+        return CachedResponse(serial, status, reason, variant, this_update, next_update,
+                              body, signature)
+    
+    def _store(self, key, entry: CachedResponse):
+        """Insert or replace an entry; caller holds the lock"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._by_serial.setdefault(entry.serial, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, old = self._entries.popitem(last=False)
+            self._forget_key(old.serial, old_key)
+            self.stats['evictions'] += 1
+    
+    def _forget_key(self, serial, key):
+        keys = self._by_serial.get(serial)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_serial[serial]
+    
+    def get(self, serial: Union[int, str], status: str, reason: Optional[str],
+            variant: Optional[bytes] = None) -> CachedResponse:
+        """Return a valid signed response, signing only on a miss"""
+        key = (serial, status, reason, variant)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.next_update:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            self.stats['misses'] += 1
+        
+        # Sign outside the lock so other serials keep being served
+        entry = self._sign(serial, status, reason, variant)
+        with self._lock:
+            self._store(key, entry)
+        return entry
+    
+    def prefill(self, keys: List[tuple], sign_batch: Callable) -> int:
+        """Sign many (serial, status, reason) keys in one batch and cache them
+        
+        `sign_batch(keys, this_update, next_update)` returns (body, signature)
+        pairs in key order. Keys beyond max_entries are left for on-demand
+        signing, as are keys that already hold a valid response. Only the
+        text variant is pre-signed.
+        """
+        now = datetime.now(timezone.utc)
+        keys = [(serial, status, reason, None) for serial, status, reason in keys]
+        with self._lock:
+            keys = [key for key in keys
+                    if key not in self._entries or self._entries[key].next_update <= now]
+        keys = keys[:self.max_entries]
+        if not keys:
+            return 0
+        this_update = now.replace(microsecond=0)
+        next_update = this_update + self.validity
+        signed = sign_batch([key[:3] for key in keys], this_update, next_update)
+        with self._lock:
+            for key, (body, signature) in zip(keys, signed):
+                self._store(key, CachedResponse(*key, this_update, next_update,
+                                                body, signature))
+        return len(keys)
+    
+    def invalidate(self, serial: Union[int, str]):
+        """Drop every cached response for a serial (e.g. after revocation)"""
+        with self._lock:
+            for key in self._by_serial.pop(serial, ()):
+                self._entries.pop(key, None)
+                self.stats['invalidations'] += 1
+    
+    def refresh_due(self) -> int:
+        """Re-sign entries whose nextUpdate is within the refresh margin
+        
+        An entry whose signature is shed (Overloaded) keeps its current
+        response and stays due, so the next pass retries it.
+        """
+        cutoff = datetime.now(timezone.utc) + self.refresh_margin
+        with self._lock:
+            due = [(key, entry) for key, entry in self._entries.items()
+                   if entry.next_update <= cutoff]
+        
+        refreshed = 0
+        for key, entry in due:
+            if self._stop.is_set():
+                break
+            try:
+                fresh = self._sign(entry.serial, entry.status, entry.reason, entry.variant)
+            except Overloaded:
+                self.stats['refresh_deferred'] += 1
+                continue
+            with self._lock:
+                # Skip entries evicted or invalidated while we were signing
+                if self._entries.get(key) is entry:
+                    self._entries[key] = fresh
+                    refreshed += 1
+        self.stats['refreshes'] += refreshed
+        return refreshed
+    
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh_due()
+            except Exception as e:
+                print(f"[!] Cache refresh error: {e}")
+    
+    def start(self):
+        """Start the background refresher thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop,
+                                        name="ocsp-cache-refresh", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+# ============================================================================
+# ADMISSION CONTROL
+# ============================================================================
+
+class Overloaded(Exception):
+    """The request was shed; the caller answers tryLater"""
+
+class SignatureGate:
+    """Bounds signing: `max_signing` at once, `max_queued` waiting
+    
+    Entering raises Overloaded at once when the wait queue is full, or
+    after `max_wait` seconds in it, instead of letting the backlog grow.
+    """
+    
+    def __init__(self, max_signing: int = MAX_SIGNING, max_queued: int = MAX_SIGN_QUEUE,
+                 max_wait: float = MAX_SIGN_WAIT):
+        self.max_signing = max_signing
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self._slots = threading.Semaphore(max_signing)
+        self._lock = threading.Lock()
+        self.signing = 0
+        self.queued = 0
+    
+    def __enter__(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.queued >= self.max_queued:
+                    raise Overloaded("sign-queue-full")
+                self.queued += 1
+            try:
+                admitted = self._slots.acquire(timeout=self.max_wait)
+            finally:
+                with self._lock:
+                    self.queued -= 1
+            if not admitted:
+                raise Overloaded("sign-wait-timeout")
+        with self._lock:
+            self.signing += 1
+        return self
+    
+    def __exit__(self, *exc):
+        with self._lock:
+            self.signing -= 1
+        self._slots.release()
+
+class ConnectionShedder:
+    """Answers refused connections from one background thread
+    
+    accept() usually returns before the client has sent its request, so a
+    refused connection waits here, never in the accept loop, until its
+    first bytes arrive (answered with `reply_fn(data)`) or `wait` seconds
+    pass (closed).
+    """
+    
+    def __init__(self, reply_fn: Callable[[bytes], bytes], wait: float = SHED_WAIT,
+                 max_pending: int = MAX_SHED_PENDING):
+        self.reply_fn = reply_fn
+        self.wait = wait
+        self.max_pending = max_pending
+        self._pending: List[Tuple[socket.socket, float]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def __len__(self):
+        return len(self._pending)
+    
+    def add(self, client_socket):
+        with self._lock:
+            if len(self._pending) < self.max_pending:
+                client_socket.setblocking(False)
+                self._pending.append((client_socket, time.monotonic() + self.wait))
+                return
+        client_socket.close()
+    
+    def _answer(self, client_socket):
+        try:
+            reply = self.reply_fn(client_socket.recv(1024))
+            if reply:
+                client_socket.send(reply)
+        except OSError:
+            pass
+    
+    def _loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                self._stop.wait(0.005)
+                continue
+            readable, _, _ = select.select([s for s, _ in pending], [], [], 0.005)
+            readable = set(readable)
+            now = time.monotonic()
+            finished = set()
+            for client_socket, deadline in pending:
+                if client_socket in readable:
+                    self._answer(client_socket)
+                elif now < deadline:
+                    continue
+                client_socket.close()
+                finished.add(client_socket)
+            with self._lock:
+                self._pending = [p for p in self._pending if p[0] not in finished]
+    
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ocsp-shed", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for client_socket, _ in pending:
+            client_socket.close()
+
+class IdleParker:
+    """Holds idle keep-alive connections off the worker pool
+    
+    A parked connection costs a file descriptor, not a worker or an
+    in-flight slot. One background thread watches them all; when one turns
+    readable it is offered to `resume_fn(socket, address, buf)`, which
+    returns False while no slot is free (the connection stays parked and is
+    offered again after the next retry() or a short wait). Connections idle
+    for `idle_timeout` seconds are closed.
+    """
+    
+    def __init__(self, resume_fn: Callable[[socket.socket, tuple, bytes], bool],
+                 idle_timeout: float = BINARY_IDLE_TIMEOUT, max_parked: int = MAX_PARKED):
+        self.resume_fn = resume_fn
+        self.idle_timeout = idle_timeout
+        self.max_parked = max_parked
+        self._incoming: List[Tuple[socket.socket, tuple, bytes]] = []
+        self._parked = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stop.set()
+        self._slot_freed = threading.Event()
+        self._thread = None
+        self._wake_r = self._wake_w = None   # add() interrupts the select() with a byte
+    
+    def __len__(self):
+        return self._parked + len(self._incoming)
+    
+    def add(self, client_socket, address, buf: bytes = b"") -> bool:
+        """Park a connection; False (the caller closes it) when full or stopped"""
+        with self._lock:
+            if self._stop.is_set() or len(self) >= self.max_parked:
+                return False
+            self._incoming.append((client_socket, address, buf))
+            try:
+                self._wake_w.send(b"\0")
+            except BlockingIOError:
+                pass                # a wake-up is already pending
+            return True
+    
+    def retry(self):
+        """A slot was freed: offer stalled connections again now"""
+        self._slot_freed.set()
+    
+    def _loop(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    incoming, self._incoming = self._incoming, []
+                    deadline = time.monotonic() + self.idle_timeout
+                    for client_socket, address, buf in incoming:
+                        selector.register(client_socket, selectors.EVENT_READ,
+                                          (address, buf, deadline))
+                    self._parked = len(selector.get_map()) - 1
+                ready = {key.fileobj for key, _ in selector.select(0.25)}
+                if self._wake_r in ready:
+                    try:
+                        self._wake_r.recv(4096)
+                    except BlockingIOError:
+                        pass
+                stalled = False
+                self._slot_freed.clear()
+                now = time.monotonic()
+                for key in list(selector.get_map().values()):
+                    if key.fileobj is self._wake_r:
+                        continue
+                    address, buf, deadline = key.data
+                    if key.fileobj in ready:
+                        selector.unregister(key.fileobj)
+                        if not self.resume_fn(key.fileobj, address, buf):
+                            selector.register(key.fileobj, selectors.EVENT_READ, key.data)
+                            stalled = True
+                    elif now >= deadline:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                if stalled:
+                    self._slot_freed.wait(0.005)    # readable, but every slot is taken
+        finally:
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            selector.close()
+    
+    def start(self):
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ocsp-park", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            incoming, self._incoming = self._incoming, []
+        if self._thread:
+            self._wake_w.send(b"\0")
+            self._thread.join()
+            self._thread = None
+            self._wake_w.close()    # the loop closed _wake_r with the parked sockets
+        for client_socket, _, _ in incoming:
+            client_socket.close()
+        self._parked = 0
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+def http_request_length(data: bytes) -> Optional[int]:
+    """Total length of the HTTP request starting data, or None until the
+    headers are complete"""
+    head_end = data.find(b"\r\n\r\n")
+    if head_end < 0:
+        return None
+    length = 0
+    for line in data[:head_end].split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length" and value.strip().isdigit():
+            length = int(value)
+    return head_end + 4 + length
 
 # ============================================================================
 # OCSP RESPONDER
@@ -174,109 +988,1274 @@ class CertificateDatabase:
 class OCSPResponder:
     """OCSP responder with ML-DSA-87 signing"""
     
-    def __init__(self, db: CertificateDatabase, signer: MLDSA87Signer):
+    def __init__(self, db: CertificateDatabase, signer: MLDSA87Signer,
+                 mode: str = SERVE_MODE, backlog: int = LISTEN_BACKLOG,
+                 workers: int = WORKER_THREADS, max_inflight: int = MAX_INFLIGHT,
+                 cache_size: int = CACHE_MAX_ENTRIES, metrics_port: int = METRICS_PORT,
+                 log_requests: bool = LOG_REQUESTS, max_signing: int = MAX_SIGNING,
+                 max_sign_queue: int = MAX_SIGN_QUEUE):
+        if mode not in SERVE_MODES:
+            raise ValueError(f"Unknown serving mode: {mode}")
         self.db = db
         self.signer = signer
+        self.algorithm = getattr(signer, 'algorithm', "ML-DSA-87")
+        self.signature_oid = getattr(signer, 'algorithm_oid', ocsp_der.OID_MLDSA87)
+        self.mode = mode
+        self.backlog = backlog
+        self.workers = workers
+        self.max_inflight = max_inflight
         self.running = False
         self.socket = None
+        self.reuse_port = False         # share HOST:PORT with sibling processes
+        self.on_listening: Optional[Callable[[], None]] = None   # replaces the banner
+        self._executor = None
+        self._inflight = threading.BoundedSemaphore(max_inflight)
+        self._inflight_async = None
+        self.connections = 0            # accepted, not yet answered
+        self._connections_lock = threading.Lock()
+        self.gate = SignatureGate(max_signing, max_sign_queue)
+        self._shedder = ConnectionShedder(self.try_later)
+        self._parker = IdleParker(self._resume_binary)
+        self.metrics = Metrics()
+        self.metrics_port = metrics_port
+        self.log_requests = log_requests
+        self._metrics_server = None
+        self._log_listener = None
+        self.cache = None
+        if cache_size > 0:
+            self.cache = OCSPResponseCache(self._sign_variant, max_entries=cache_size)
+            db.add_listener(self.cache.invalidate)
+        self.issuer = None
+        if signer is not None:      # a PresignedResponder signs nothing
+            try:
+                self.issuer = ocsp_der.load_issuer(CA_CERT)
+            except (OSError, DERError, IndexError) as e:
+                print(f"[!] HTTP OCSP answers internalError, CA certificate unusable: {e}")
     
-    def build_response(self, serial: str, status: str, reason: Optional[str]) -> Tuple[str, bytes]:
-        """Build response message and sign it"""
+    def _sign(self, message: bytes) -> bytes:
+        start = time.perf_counter()
+        with self.gate:
+            admitted = time.perf_counter()
+            self.metrics.observe("sign_wait", admitted - start)
+            signature = self.signer.sign(message)
+        self.metrics.observe("sign", time.perf_counter() - admitted)
+        return signature
+    
+    def _lookup(self, serial: Union[str, int]) -> Tuple[str, Optional[str]]:
+        start = time.perf_counter()
+        status, reason = self.db.get_status(serial)
+        self.metrics.observe("lookup", time.perf_counter() - start)
+        self.metrics.count("status", status)
+        return status, reason
+    
+    def _queued(self, queued: Optional[float]):
+        """Record the wait between accepting a request and starting on it"""
+        if queued is not None:
+            self.metrics.observe("accept_wait", time.perf_counter() - queued)
+    
+    def build_response(self, serial: Union[int, str], status: str, reason: Optional[str]) -> Tuple[str, bytes]:
+        """Return a signed response, from the cache when one is still valid"""
+        if self.cache is not None:
+            entry = self.cache.get(serial, status, reason)
+            return entry.body, entry.signature
         
-        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%SZ')
+        this_update = datetime.now(timezone.utc).replace(microsecond=0)
+        next_update = this_update + timedelta(seconds=RESPONSE_VALIDITY)
+        return self.sign_response(serial, status, reason, this_update, next_update)
+    
+    @staticmethod
+    def _response_message(serial: Union[int, str], status: str, reason: Optional[str],
+                          this_update: datetime, next_update: datetime):
+        """Return (serial text, message to sign, status text, this, next)"""
+        if isinstance(serial, int):
+            serial = format_serial(serial)
+        this_str = this_update.strftime('%Y%m%d%H%M%SZ')
+        next_str = next_update.strftime('%Y%m%d%H%M%SZ')
         
         if status == 'good':
-            msg = f"OCSP|{serial}|GOOD|{timestamp}"
+            msg = f"OCSP|{serial}|GOOD|{this_str}|{next_str}"
             status_text = "GOOD"
         elif status == 'revoked':
-            msg = f"OCSP|{serial}|REVOKED|{reason}|{timestamp}"
+            msg = f"OCSP|{serial}|REVOKED|{reason}|{this_str}|{next_str}"
             status_text = f"REVOKED ({reason})"
         else:
-            msg = f"OCSP|{serial}|UNKNOWN|{timestamp}"
+            msg = f"OCSP|{serial}|UNKNOWN|{this_str}|{next_str}"
             status_text = "UNKNOWN"
-        
-        signature = self.signer.sign(msg.encode())
-        
-        response = f"""╔═══════════════════════════════════════════════════════════╗
+        return serial, msg.encode(), status_text, this_str, next_str
+    
+    def _render(self, rows: List[Tuple[str, str]], this_str: str, next_str: str,
+                signature: bytes) -> str:
+        """Box-drawn reply for one or more (serial, status text) rows"""
+        statuses = "\n".join(f"║  Serial:     {serial}\n║  Status:     {status_text}"
+                             for serial, status_text in rows)
+        return f"""╔═══════════════════════════════════════════════════════════╗
 ║  OCSP Response - ML-DSA-87 Quantum-Safe Signature        ║
 ╠═══════════════════════════════════════════════════════════╣
-║  Serial:     {serial}
-║  Status:     {status_text}
-║  Timestamp:  {timestamp}
-║  Signed:     ML-DSA-87 (4627 bytes)
+{statuses}
+║  This Update: {this_str}
+║  Next Update: {next_str}
+║  Signed:     {self.algorithm} ({len(signature)} bytes)
 ║  Signature:  {signature.hex()[:64]}...
 ║  Hash:       {hashlib.sha256(signature).hexdigest()[:32]}...
 ╚═══════════════════════════════════════════════════════════╝"""
+    
+    def sign_response(self, serial: Union[int, str], status: str, reason: Optional[str],
+                      this_update: datetime, next_update: datetime) -> Tuple[str, bytes]:
+        """Build response message and sign it"""
+        serial, msg, status_text, this_str, next_str = self._response_message(
+            serial, status, reason, this_update, next_update)
+        signature = self._sign(msg)
+        return self._render([(serial, status_text)], this_str, next_str, signature), signature
+    
+    def sign_batch_response(self, keys: List[tuple], this_update: datetime,
+                            next_update: datetime) -> Tuple[str, bytes]:
+        """One text reply for several (serial, status, reason) keys, signed once
+        
+        The signed message is the per-serial messages joined by newlines.
+        """
+        parts = [self._response_message(serial, status, reason, this_update, next_update)
+                 for serial, status, reason in keys]
+        signature = self._sign(b"\n".join(msg for _, msg, _, _, _ in parts))
+        _, _, _, this_str, next_str = parts[0]
+        rows = [(serial, status_text) for serial, _, status_text, _, _ in parts]
+        return self._render(rows, this_str, next_str, signature), signature
+    
+    def sign_der_response(self, cert_id_der: bytes, serial: int, status: str,
+                          this_update: datetime, next_update: datetime) -> Tuple[bytes, bytes]:
+        """Build and sign an RFC 6960 OCSPResponse for one CertID"""
+        return self.sign_der_batch([(cert_id_der, serial, status)], this_update, next_update)
+    
+    def sign_der_batch(self, items: List[Tuple[bytes, int, str]], this_update: datetime,
+                       next_update: datetime) -> Tuple[bytes, bytes]:
+        """One OCSPResponse for several (CertID DER, serial, status), signed once"""
+        tbs = self._der_tbs(items, this_update, next_update)
+        signature = self._sign(tbs)
+        return ocsp_der.ocsp_response(tbs, signature, self.signature_oid), signature
+    
+    def _der_tbs(self, items: List[Tuple[bytes, int, str]], this_update: datetime,
+                 next_update: datetime) -> bytes:
+        """ResponseData covering (CertID DER, serial, status) items"""
+        singles = []
+        for cert_id_der, serial, status in items:
+            reason_code, rev_time = None, None
+            entry = self.db.get_entry(serial) if status == 'revoked' else None
+            if status == 'revoked' and entry is None:
+                status = 'unknown'      # dropped by an index reload since the lookup
+            elif entry is not None:
+                _, reason, epoch = entry
+                reason_code = reason or None    # omit "unspecified" (RFC 5280 5.3.1)
+                rev_time = datetime.fromtimestamp(epoch, timezone.utc)
+            singles.append(ocsp_der.single_response(
+                cert_id_der, ocsp_der.cert_status(status, reason_code, rev_time),
+                this_update, next_update))
+        return ocsp_der.response_data(self.issuer.name_der, this_update, singles)
+    
+    def sign_binary_response(self, serial: int, status: str, this_update: datetime,
+                             next_update: datetime) -> Tuple[bytes, bytes]:
+        """Build and sign a binary-protocol response payload"""
+        tbs = self._binary_tbs(serial, status, this_update, next_update)
+        signature = self._sign(ocsp_binary.BINARY_CONTEXT + tbs)
+        return ocsp_binary.encode_response(tbs, signature), signature
+    
+    def _binary_tbs(self, serial: int, status: str, this_update: datetime,
+                    next_update: datetime) -> bytes:
+        reason_code, rev_time = 0, 0
+        entry = self.db.get_entry(serial) if status == 'revoked' else None
+        if status == 'revoked' and entry is None:
+            status = 'unknown'          # dropped by an index reload since the lookup
+        elif entry is not None:
+            _, reason_code, rev_time = entry
+        return ocsp_binary.response_tbs(serial, status, reason_code, rev_time,
+                                        this_update, next_update)
+    
+    def _sign_variant(self, serial, status, reason, this_update, next_update, variant):
+        """Cache sign_fn: text reply for variant None, binary payload for
+        BINARY_VARIANT, else DER for that CertID"""
+        if variant is None:
+            return self.sign_response(serial, status, reason, this_update, next_update)
+        if variant == BINARY_VARIANT:
+            return self.sign_binary_response(serial, status, this_update, next_update)
+        return self.sign_der_response(variant, serial, status, this_update, next_update)
+    
+    def sign_responses(self, keys: List[tuple], this_update: datetime,
+                       next_update: datetime, pool: SigningPool) -> List[Tuple[str, bytes]]:
+        """Sign a batch of (serial, status, reason) responses on a SigningPool"""
+        parts = [self._response_message(serial, status, reason, this_update, next_update)
+                 for serial, status, reason in keys]
+        signatures = pool.sign_many([msg for _, msg, _, _, _ in parts])
+        return [(self._render([(serial, status_text)], this_str, next_str, signature), signature)
+                for (serial, _, status_text, this_str, next_str), signature
+                in zip(parts, signatures)]
+    
+    def presign(self, workers: int = PRESIGN_WORKERS) -> int:
+        """Fill the cache with a signed response for every known serial"""
+        if self.cache is None:
+            return 0
+        keys = list(self.db.statuses())
+        print(f"[*] Pre-signing {min(len(keys), self.cache.max_entries)} responses "
+              f"on {workers} worker processes...")
+        factory = functools.partial(open_signer, getattr(self.signer, 'spec', None))
+        with SigningPool(factory, workers) as pool:
+            count = self.cache.prefill(
+                keys, lambda batch, this, nxt: self.sign_responses(batch, this, nxt, pool))
+        print(f"[✓] Pre-signed {count} responses")
+        return count
+    
+    def build_store(self, path: str = RESPONSE_STORE, workers: int = PRESIGN_WORKERS,
+                    validity: int = STORE_VALIDITY) -> int:
+        """Sign the text, binary and DER responses of every serial into a
+        response store for PresignedResponder; returns the serial count"""
+        if self.issuer is None:
+            raise ValueError("DER responses need the CA certificate")
+        keys = list(self.db.statuses())
+        this_update = datetime.now(timezone.utc).replace(microsecond=0)
+        next_update = this_update + timedelta(seconds=validity)
+        print(f"[*] Signing {3 * len(keys)} responses for {len(keys)} serials "
+              f"on {workers} worker processes...")
+        start = time.perf_counter()
+        factory = functools.partial(open_signer, getattr(self.signer, 'spec', None))
+        with SigningPool(factory, workers) as pool:
+            size = write_store(path, self._store_entries(keys, this_update, next_update, pool),
+                               len(keys), this_update, next_update,
+                               *self.issuer.cert_id_hashes("sha1"))
+        print(f"[✓] Wrote {path}: {size / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s, "
+              f"valid until {next_update:%Y-%m-%d %H:%M}Z")
+        return len(keys)
+    
+    def _store_entries(self, keys: List[tuple], this_update: datetime, next_update: datetime,
+                       pool: SigningPool) -> Iterator[StoreEntry]:
+        """Sign STORE_BATCH serials at a time, three messages each"""
+        for i in range(0, len(keys), STORE_BATCH):
+            parts, messages = [], []
+            for serial, status, reason in keys[i:i + STORE_BATCH]:
+                text = self._response_message(serial, status, reason, this_update, next_update)
+                binary_tbs = self._binary_tbs(serial, status, this_update, next_update)
+                der_tbs = self._der_tbs([(ocsp_der.cert_id(self.issuer, serial), serial, status)],
+                                        this_update, next_update)
+                parts.append((serial, text, binary_tbs, der_tbs))
+                messages += [text[1], ocsp_binary.BINARY_CONTEXT + binary_tbs, der_tbs]
+            signatures = pool.sign_many(messages)
+            for j, (serial, text, binary_tbs, der_tbs) in enumerate(parts):
+                text_sig, binary_sig, der_sig = signatures[3 * j:3 * j + 3]
+                serial_text, _, status_text, this_str, next_str = text
+                yield StoreEntry(
+                    serial,
+                    self._render([(serial_text, status_text)], this_str, next_str,
+                                 text_sig).encode(),
+                    ocsp_binary.frame(ocsp_binary.encode_response(binary_tbs, binary_sig)),
+                    ocsp_der.ocsp_response(der_tbs, der_sig, self.signature_oid))
+    
+    def process_request(self, data: bytes, address) -> bytes:
+        """Parse one request, look up the serial and return the signed reply"""
+        start = time.perf_counter()
+        request_text = data.decode('utf-8').strip()
+        
+        if request_text.startswith('serial='):
+            serial = request_text.split('=')[1]
+        else:
+            serial = "1005"
+        
+        if ',' in serial:
+            self.metrics.count("requests", "text-batch")
+            return self._process_batch([s for s in serial.split(',') if s.strip()])
+        
+        # Key everything on the integer serial so "1000" and "01000" match
+        serial_num = normalize_serial(serial)
+        if serial_num is not None:
+            serial = serial_num
+        self.metrics.observe("parse", time.perf_counter() - start)
+        self.metrics.count("requests", "text")
+        
+        status, reason = self._lookup(serial)
+        log.info("[+] %s:%s  %s  Status: %s", address[0], address[1],
+                 serial if isinstance(serial, str) else format_serial(serial), status.upper())
+        
+        response, signature = self.build_response(serial, status, reason)
+        
+        return response.encode()
+    
+    def _process_batch(self, serials: List[str]) -> bytes:
+        """Answer "serial=a,b,c" with one signed reply"""
+        if len(serials) > MAX_BATCH_SERIALS:
+            log.warning("[!] %d serials requested; the limit is %d", len(serials), MAX_BATCH_SERIALS)
+            self.metrics.count("errors", "batch-too-large")
+            return f"ERROR: at most {MAX_BATCH_SERIALS} serials per request".encode()
+        
+        keys = []
+        for serial in serials:
+            serial_num = normalize_serial(serial)
+            key = serial_num if serial_num is not None else serial.strip()
+            keys.append((key,) + self._lookup(key))
+        log.info("[*] Batch of %d serials", len(keys))
         
-        return response, signature
+        this_update = datetime.now(timezone.utc).replace(microsecond=0)
+        next_update = this_update + timedelta(seconds=RESPONSE_VALIDITY)
+        response, _ = self.sign_batch_response(keys, this_update, next_update)
+        return response.encode()
+    
+    def _cert_id_status(self, cert_id) -> Tuple[str, Optional[str]]:
+        """Status for a CertID, or unknown if it names a different issuer"""
+        if (cert_id.hash_name and self.issuer.cert_id_hashes(cert_id.hash_name)
+                == (cert_id.name_hash, cert_id.key_hash)):
+            return self._lookup(cert_id.serial)
+        self.metrics.count("status", "unknown")
+        return 'unknown', None
+    
+    def answer_der(self, request_der: bytes) -> Tuple[bytes, Optional[datetime], Optional[datetime]]:
+        """Answer a DER OCSPRequest: (OCSPResponse DER, thisUpdate, nextUpdate)
+        
+        The times are None for unsigned error responses.
+        """
+        if self.issuer is None:
+            self.metrics.count("errors", "no-issuer")
+            return ocsp_der.error_response(ocsp_der.INTERNAL_ERROR), None, None
+        start = time.perf_counter()
+        try:
+            request = ocsp_der.parse_request(request_der)
+        except DERError as e:
+            log.warning("[!] Malformed OCSP request: %s", e)
+            self.metrics.count("errors", "malformed")
+            return ocsp_der.error_response(ocsp_der.MALFORMED_REQUEST), None, None
+        self.metrics.observe("parse", time.perf_counter() - start)
+        if len(request.cert_ids) > MAX_BATCH_SERIALS:
+            log.warning("[!] %d certificates requested; the limit is %d",
+                        len(request.cert_ids), MAX_BATCH_SERIALS)
+            self.metrics.count("errors", "batch-too-large")
+            return ocsp_der.error_response(ocsp_der.MALFORMED_REQUEST), None, None
+        if len(request.cert_ids) > 1:
+            return self._answer_der_batch(request.cert_ids)
+        
+        cert_id = request.cert_ids[0]
+        status, reason = self._cert_id_status(cert_id)
+        log.info("[*] Serial: %s  Status: %s", format_serial(cert_id.serial), status.upper())
+        
+        if self.cache is not None:
+            entry = self.cache.get(cert_id.serial, status, reason, cert_id.der)
+            return entry.body, entry.this_update, entry.next_update
+        this_update = datetime.now(timezone.utc).replace(microsecond=0)
+        next_update = this_update + timedelta(seconds=RESPONSE_VALIDITY)
+        response_der, _ = self.sign_der_response(cert_id.der, cert_id.serial, status,
+                                                 this_update, next_update)
+        return response_der, this_update, next_update
+    
+    def _answer_der_batch(self, cert_ids) -> Tuple[bytes, datetime, datetime]:
+        """All CertIDs of one request in a single ResponseData, signed once"""
+        items = [(cert_id.der, cert_id.serial, self._cert_id_status(cert_id)[0])
+                 for cert_id in cert_ids]
+        log.info("[*] Batch of %d serials", len(items))
+        this_update = datetime.now(timezone.utc).replace(microsecond=0)
+        next_update = this_update + timedelta(seconds=RESPONSE_VALIDITY)
+        response_der, _ = self.sign_der_batch(items, this_update, next_update)
+        return response_der, this_update, next_update
+    
+    def _http_request(self, data: bytes, address) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """(request DER, lower-cased headers) of a POST or base64 GET, or
+        None if the request line is malformed"""
+        head, _, body = data.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        log.info("[+] HTTP request from %s:%s: %s", address[0], address[1], lines[0][:80])
+        self.metrics.count("requests", "http")
+        request_line = lines[0].split(" ")
+        if len(request_line) != 3:
+            return None
+        method, target, _ = request_line
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        if method == "POST":
+            return body, headers
+        try:
+            return ocsp_der.decode_get_path(target, HTTP_PATH), headers
+        except DERError:
+            return b"", headers
+    
+    @staticmethod
+    def _cacheable(this_update: datetime, next_update: datetime, etag: str) -> Dict[str, str]:
+        """RFC 5019 section 6: let HTTP caches keep the response until nextUpdate"""
+        max_age = max(0, int((next_update - datetime.now(timezone.utc)).total_seconds()))
+        return {
+            "Content-Type": "application/ocsp-response",
+            "Last-Modified": format_datetime(this_update, usegmt=True),
+            "Expires": format_datetime(next_update, usegmt=True),
+            "ETag": etag,
+            "Cache-Control": f"max-age={max_age}, public, no-transform, must-revalidate",
+        }
     
-    def handle_client(self, client_socket, address):
+    def process_http(self, data: bytes, address) -> bytes:
+        """Answer an RFC 6960 request sent by POST or by base64 GET"""
+        parsed = self._http_request(data, address)
+        if parsed is None:
+            return http_reply(400, {})
+        request_der, headers = parsed
+        
+        response_der, this_update, next_update = self.answer_der(request_der)
+        if this_update is None:
+            return http_reply(200, {"Content-Type": "application/ocsp-response",
+                                    "Cache-Control": "no-store"}, response_der)
+        
+        etag = f'"{hashlib.sha1(response_der).hexdigest()}"'
+        reply_headers = self._cacheable(this_update, next_update, etag)
+        if not_modified(headers, etag, this_update):
+            return http_reply(304, reply_headers)
+        return http_reply(200, reply_headers, response_der)
+    
+    def process_frame(self, payload: bytes, address, queued: Optional[float] = None) -> bytes:
+        """Answer one binary-protocol request payload"""
+        self._queued(queued)
+        self.metrics.count("requests", "binary")
+        try:
+            start = time.perf_counter()
+            serial = ocsp_binary.decode_request(payload)
+            self.metrics.observe("parse", time.perf_counter() - start)
+            status, reason = self._lookup(serial)
+            log.info("[*] Binary query %s from %s: %s", format_serial(serial), address[0],
+                     status.upper())
+            if self.cache is not None:
+                return self.cache.get(serial, status, reason, BINARY_VARIANT).body
+            this_update = datetime.now(timezone.utc).replace(microsecond=0)
+            next_update = this_update + timedelta(seconds=RESPONSE_VALIDITY)
+            body, _ = self.sign_binary_response(serial, status, this_update, next_update)
+            return body
+        except Overloaded as e:
+            self.metrics.count("shed", str(e))
+            return ocsp_binary.encode_error("tryLater")
+        except Exception as e:
+            log.warning("[!] Binary request error: %s", e)
+            self.metrics.count("errors", type(e).__name__)
+            return ocsp_binary.encode_error(str(e))
+    
+    def _serve_binary(self, client_socket, address, buf: bytes,
+                      resumed: bool = False) -> bool:
+        """Answer frames on one connection, in order, until EOF or idle
+        
+        Returns True when the idle connection was parked rather than
+        finished; the parker owns the socket then.
+        """
+        if not resumed:
+            log.info("[+] Binary connection from %s:%s", address[0], address[1])
+        idle = BINARY_PARK_AFTER if self.mode == "thread" else BINARY_IDLE_TIMEOUT
+        client_socket.settimeout(idle)
+        served = 0
+        try:
+            while True:
+                payloads, buf = ocsp_binary.split_frames(buf)
+                if payloads:
+                    # Pipelined requests read together are answered in one write
+                    reply = b"".join(ocsp_binary.frame(self.process_frame(p, address))
+                                     for p in payloads)
+                    start = time.perf_counter()
+                    client_socket.settimeout(WRITE_TIMEOUT)
+                    client_socket.sendall(reply)
+                    client_socket.settimeout(idle)
+                    self.metrics.observe("send", time.perf_counter() - start)
+                    served += len(payloads)
+                chunk = client_socket.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+        except (socket.timeout, BlockingIOError):
+            if self.mode == "thread" and self._parker.add(client_socket, address, buf):
+                return True
+        log.info("[✓] Binary connection closed after %d responses%s", served,
+                 " since it was parked" if resumed else "")
+        return False
+    
+    def _resume_binary(self, client_socket, address, buf: bytes) -> bool:
+        """IdleParker callback: a parked connection has data; give it a worker"""
+        if not self._inflight.acquire(blocking=False):
+            return False
+        with self._connections_lock:
+            self.connections += 1
+        future = self._executor.submit(self._continue_binary, client_socket, address, buf)
+        future.add_done_callback(self._release_slot)
+        return True
+    
+    def _continue_binary(self, client_socket, address, buf: bytes):
+        try:
+            if self._serve_binary(client_socket, address, buf, resumed=True):
+                return
+        except Exception as e:
+            log.warning("[!] Error: %s", e)
+            self.metrics.count("errors", type(e).__name__)
+        client_socket.close()
+    
+    async def _stream_binary(self, reader, writer, buf: bytes, address):
+        """asyncio binary connection: frames are signed concurrently on the
+        worker pool and written back in request order"""
+        log.info("[+] Binary connection from %s:%s", address[0], address[1])
+        loop = asyncio.get_running_loop()
+        pending: asyncio.Queue = asyncio.Queue()
+        
+        async def write_replies():
+            while (future := await pending.get()) is not None:
+                reply = ocsp_binary.frame(await future)
+                start = time.perf_counter()
+                writer.write(reply)
+                if pending.empty():
+                    await asyncio.wait_for(writer.drain(), WRITE_TIMEOUT)
+                self.metrics.observe("send", time.perf_counter() - start)
+        
+        writer_task = asyncio.create_task(write_replies())
+        served = 0
+        try:
+            while True:
+                payloads, buf = ocsp_binary.split_frames(buf)
+                for payload in payloads:
+                    queued = time.perf_counter()
+                    await self._inflight_async.acquire()
+                    future = loop.run_in_executor(self._executor, self.process_frame,
+                                                  payload, address, queued)
+                    future.add_done_callback(lambda _: self._inflight_async.release())
+                    await pending.put(future)
+                    served += 1
+                try:
+                    chunk = await asyncio.wait_for(reader.read(65536), BINARY_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not chunk:
+                    break
+                buf += chunk
+        finally:
+            await pending.put(None)
+            await writer_task
+        log.info("[✓] Binary connection closed after %d responses", served)
+    
+    def process(self, data: bytes, address, queued: Optional[float] = None) -> bytes:
+        """Dispatch a complete request to the HTTP or the text protocol"""
+        self._queued(queued)
+        try:
+            if data.startswith(HTTP_METHODS):
+                return self.process_http(data, address)
+            return self.process_request(data, address)
+        except Overloaded as e:
+            self.metrics.count("shed", str(e))
+            return self.try_later(data)
+    
+    @staticmethod
+    def try_later(data: bytes) -> bytes:
+        """tryLater in the protocol of the request that starts with `data`"""
+        if data[:1] == b"\x00":
+            return ocsp_binary.frame(ocsp_binary.encode_error("tryLater"))
+        if data.startswith(HTTP_METHODS):
+            return http_reply(200, {"Content-Type": "application/ocsp-response",
+                                    "Cache-Control": "no-store", "Retry-After": "1"},
+                              ocsp_der.error_response(ocsp_der.TRY_LATER))
+        return TRY_LATER_TEXT if data else b""
+    
+    @staticmethod
+    def _recv_until(client_socket, deadline: float) -> bytes:
+        """recv() that gives up, with socket.timeout, at `deadline`"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("read deadline passed")
+        client_socket.settimeout(remaining)
+        return client_socket.recv(4096)
+    
+    def _recv_http(self, client_socket, data: bytes,
+                   deadline: Optional[float] = None) -> bytes:
+        """Keep reading until the whole HTTP request (headers and body) is in"""
+        if deadline is None:
+            deadline = time.monotonic() + READ_TIMEOUT
+        while True:
+            needed = http_request_length(data)
+            if needed is not None and len(data) >= needed:
+                return data
+            if len(data) > MAX_HTTP_REQUEST:
+                raise ValueError("HTTP request too large")
+            chunk = self._recv_until(client_socket, deadline)
+            if not chunk:
+                raise ValueError("connection closed mid-request")
+            data += chunk
+    
+    def handle_client(self, client_socket, address, accepted: Optional[float] = None):
         """Handle a single client connection"""
+        self._queued(accepted)
         try:
+            deadline = time.monotonic() + READ_TIMEOUT
+            client_socket.settimeout(READ_TIMEOUT)
             data = client_socket.recv(1024)
             if not data:  # ✅ FIXED LINE
                 return
+            if data[:1] == b"\x00":
+                if self._serve_binary(client_socket, address, data):
+                    client_socket = None    # parked, see IdleParker
+                return
+            if data.startswith(HTTP_METHODS):
+                data = self._recv_http(client_socket, data, deadline)
             
-            print(f"\n[+] Request from {address[0]}:{address[1]}")
+            response = self.process(data, address)
+            start = time.perf_counter()
+            client_socket.settimeout(WRITE_TIMEOUT)
+            client_socket.sendall(response)
+            self.metrics.observe("send", time.perf_counter() - start)
             
-            request_text = data.decode('utf-8').strip()
-            print(f"[*] Request: {request_text}")
+        except socket.timeout:
+            log.warning("[!] Client %s:%s timed out", address[0], address[1])
+            self.metrics.count("errors", "timeout")
+        except Exception as e:
+            log.warning("[!] Error: %s", e)
+            self.metrics.count("errors", type(e).__name__)
+        finally:
+            if client_socket is not None:
+                client_socket.close()
+    
+    def _release_slot(self, _future=None):
+        with self._connections_lock:
+            self.connections -= 1
+        self._inflight.release()
+        self._parker.retry()
+    
+    def _serve_sockets(self):
+        """Blocking accept loop for the "serial" and "thread" modes"""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.socket.bind((HOST, PORT))
+        self.socket.listen(self.backlog)
+        self.running = True
+        self._listening()
+        
+        while self.running:
+            try:
+                if self.mode == "serial":
+                    client, addr = self.socket.accept()
+                    self.handle_client(client, addr, time.perf_counter())
+                    continue
+                
+                # Once MAX_INFLIGHT connections are queued or being served,
+                # new ones are answered tryLater instead of joining the queue.
+                client, addr = self.socket.accept()
+                if not self._inflight.acquire(blocking=False):
+                    self.metrics.count("shed", "connections-full")
+                    self._shedder.add(client)
+                    continue
+                with self._connections_lock:
+                    self.connections += 1
+                future = self._executor.submit(self.handle_client, client, addr,
+                                               time.perf_counter())
+                future.add_done_callback(self._release_slot)
+            except KeyboardInterrupt:
+                print("\n[!] Shutting down...")
+                self.running = False
+                break
+    
+    async def _handle_stream(self, reader, writer):
+        """asyncio connection handler; signing runs on the worker pool"""
+        address = writer.get_extra_info('peername') or ("?", 0)
+        accepted = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(reader.read(1024), READ_TIMEOUT)
+            if not data:
+                return
+            if data[:1] == b"\x00":
+                await self._stream_binary(reader, writer, data, address)
+                return
+            if data.startswith(HTTP_METHODS):
+                data = await asyncio.wait_for(self._read_http(reader, data),
+                                              READ_TIMEOUT - (time.perf_counter() - accepted))
             
-            if request_text.startswith('serial='):
-                serial = request_text.split('=')[1]
+            if self._inflight_async.locked():
+                self.metrics.count("shed", "connections-full")
+                response = self.try_later(data)
             else:
-                serial = "1005"
-            
-            print(f"[*] Serial: {serial}")
+                async with self._inflight_async:
+                    self.connections += 1
+                    try:
+                        loop = asyncio.get_running_loop()
+                        response = await loop.run_in_executor(
+                            self._executor, self.process, data, address, accepted)
+                    finally:
+                        self.connections -= 1
             
-            status, reason = self.db.get_status(serial)
-            print(f"[*] Status: {status.upper()}")
-            
-            response, signature = self.build_response(serial, status, reason)
-            print(f"[✓] Signed with ML-DSA-87 ({len(signature)} bytes)")
-            
-            client_socket.send(response.encode())
-            print(f"[✓] Response sent")
+            start = time.perf_counter()
+            writer.write(response)
+            await asyncio.wait_for(writer.drain(), WRITE_TIMEOUT)
+            self.metrics.observe("send", time.perf_counter() - start)
             
+        except asyncio.TimeoutError:
+            log.warning("[!] Client %s:%s timed out", address[0], address[1])
+            self.metrics.count("errors", "timeout")
         except Exception as e:
-            print(f"[!] Error: {e}")
+            log.warning("[!] Error: %s", e)
+            self.metrics.count("errors", type(e).__name__)
         finally:
-            client_socket.close()
+            writer.close()
+    
+    @staticmethod
+    async def _read_http(reader, data: bytes) -> bytes:
+        """asyncio counterpart of _recv_http"""
+        while True:
+            needed = http_request_length(data)
+            if needed is not None and len(data) >= needed:
+                return data
+            if len(data) > MAX_HTTP_REQUEST:
+                raise ValueError("HTTP request too large")
+            chunk = await reader.read(4096)
+            if not chunk:
+                raise ValueError("connection closed mid-request")
+            data += chunk
+    
+    async def _serve_asyncio(self):
+        """Event-loop server for the "asyncio" mode"""
+        self._inflight_async = asyncio.Semaphore(self.max_inflight)
+        server = await asyncio.start_server(
+            self._handle_stream, HOST, PORT,
+            backlog=self.backlog, reuse_address=True, reuse_port=self.reuse_port or None)
+        self.running = True
+        self._listening()
+        async with server:
+            await server.serve_forever()
+    
+    def _listening(self):
+        if self.on_listening is not None:
+            self.on_listening()
+        else:
+            self._print_banner()
+    
+    def _print_banner(self):
+        print(f"\n{'='*70}")
+        print(f"🚀 OCSP Responder - ML-DSA-87 Quantum-Safe")
+        print(f"{'='*70}")
+        print(f"📡 Listening: {HOST}:{PORT} (text, and RFC 6960 over HTTP at {HTTP_PATH})")
+        print(f"⚙️  Mode: {self.mode} (backlog {self.backlog}, "
+              f"{self.workers} workers, {self.max_inflight} in flight)")
+        if self.signer is not None:
+            print(f"🚦 Admission: {self.gate.max_signing} signing + {self.gate.max_queued} "
+                  f"queued (max wait {self.gate.max_wait}s); overflow answered tryLater")
+        print(f"⏱  Timeouts: read {READ_TIMEOUT}s, write {WRITE_TIMEOUT}s")
+        print(f"📋 Certificates: {len(self.db)}")
+        print(f"🔐 {self._signing_summary()}")
+        if self.cache is not None:
+            print(f"🗄  Cache: {self.cache.max_entries} responses, "
+                  f"{RESPONSE_VALIDITY}s validity")
+        if self._metrics_server is not None:
+            host, port = self._metrics_server.address
+            print(f"📊 Metrics: http://{host}:{port}/metrics (and /metrics.json)")
+        if not self.log_requests:
+            print("🔇 Per-request logging off")
+        print(f"{'='*70}\n")
+    
+    def _signing_summary(self) -> str:
+        if self.signature_oid == ocsp_der.OID_MLDSA87:
+            return f"Signing: ML-DSA-87 ({MLDSA87_SIG_LEN}-byte signatures)"
+        return f"Signing: {self.algorithm} composite, components signed concurrently"
+    
+    def gauges(self) -> Dict[str, float]:
+        """Point-in-time values reported next to the histograms"""
+        values = {'certificates': len(self.db), 'connections_inflight': self.connections,
+                  'signing_inflight': self.gate.signing, 'signing_queued': self.gate.queued,
+                  'shed_pending': len(self._shedder), 'binary_parked': len(self._parker)}
+        if self.cache is not None:
+            values['cache_entries'] = len(self.cache)
+            values.update({f"cache_{k}": v for k, v in self.cache.stats.items()})
+        return values
+    
+    def print_metrics(self):
+        print(f"\n📊 Stage latency (ms)")
+        print(f"  {'stage':<12} {'count':>9} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9}")
+        snapshot = self.metrics.snapshot()
+        for stage, s in snapshot['stages'].items():
+            print(f"  {stage:<12} {s['count']:>9} {s['mean_ms']:>9.3f} {s['p50_ms']:>9.3f} "
+                  f"{s['p99_ms']:>9.3f} {s['max_ms']:>9.3f}")
+        for name, counts in snapshot['counters'].items():
+            print(f"  {name}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
     
     def start(self):
         """Start the OCSP responder server"""
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._log_listener = setup_logging(self.log_requests)
+        if self.metrics_port:
+            try:
+                self._metrics_server = MetricsServer(self.metrics, HOST, self.metrics_port,
+                                                     self.gauges)
+                self._metrics_server.start()
+            except OSError as e:
+                print(f"[!] Metrics endpoint disabled: {e}")
+                self._metrics_server = None
+        if self.cache is not None:
+            self.cache.start()
+        self.db.start_watching()
+        if self.mode != "serial":
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="ocsp")
+        if self.mode == "thread":
+            self._shedder.start()
+            self._parker.start()
         
         try:
-            self.socket.bind((HOST, PORT))
-            self.socket.listen(5)
-            self.running = True
-            
-            print(f"\n{'='*70}")
-            print(f"🚀 OCSP Responder - ML-DSA-87 Quantum-Safe")
-            print(f"{'='*70}")
-            print(f"📡 Listening: {HOST}:{PORT}")
-            print(f"📋 Certificates: {len(self.db.certs)}")
-            print(f"🔐 Signing: ML-DSA-87 (4627-byte signatures)")
-            print(f"{'='*70}\n")
-            
-            while self.running:
-                try:
-                    client, addr = self.socket.accept()
-                    self.handle_client(client, addr)
-                except KeyboardInterrupt:
-                    print("\n[!] Shutting down...")
-                    self.running = False
-                    break
-                    
+            if self.mode == "asyncio":
+                asyncio.run(self._serve_asyncio())
+            else:
+                self._serve_sockets()
+        except KeyboardInterrupt:
+            print("\n[!] Shutting down...")
         except Exception as e:
             print(f"[!] Server error: {e}")
         finally:
+            self.running = False
             if self.socket:
                 self.socket.close()
+            self._shedder.stop()
+            self._parker.stop()
+            if self._executor:
+                self._executor.shutdown(wait=True)
+            self.db.stop_watching()
+            if self.cache is not None:
+                self.cache.stop()
+                print(f"[*] Cache stats: {self.cache.stats}")
+            if self._metrics_server is not None:
+                self._metrics_server.stop()
+            if self._log_listener is not None:
+                self._log_listener.stop()
+            self.print_metrics()
             print("[✓] Server stopped")
 
+# ============================================================================
+# PRE-SIGNED RESPONDER
+# ============================================================================
+
+class PresignedResponder(OCSPResponder):
+    """Serves a response store built by OCSPResponder.build_store
+    
+    Starts by mapping one file: no signer, no index.txt. A request is a
+    bisect in the mapped serial column, then the stored bytes go out with
+    sendfile. Anything the store cannot answer - serials it lacks, batches,
+    CertIDs not hashed with SHA-1 - gets an unsigned error, since there is
+    nothing to sign with.
+    """
+    
+    def __init__(self, store_path: str = RESPONSE_STORE, mode: str = SERVE_MODE, **kwargs):
+        super().__init__(WatchedStore(store_path), None, mode=mode, cache_size=0, **kwargs)
+        store = self.db.current
+        if store.expired:
+            print(f"[!] {store_path} expired at {store.next_update:%Y-%m-%d %H:%M}Z; "
+                  f"rebuild it with --build-store")
+    
+    def _signing_summary(self) -> str:
+        store = self.db.current
+        return (f"Pre-signed: {self.db.path} (valid until "
+                f"{store.next_update:%Y-%m-%d %H:%M}Z, {'sendfile' if SENDFILE else 'mmap'})")
+    
+    def gauges(self) -> Dict[str, float]:
+        values = super().gauges()
+        values['store_seconds_left'] = int(
+            (self.db.current.next_update - datetime.now(timezone.utc)).total_seconds())
+        return values
+    
+    def _miss(self, what: str):
+        self.metrics.count("errors", "not-in-store")
+        log.warning("[!] No pre-signed response for %s", what)
+    
+    def _text_parts(self, store: ResponseStore, data: bytes, address) -> list:
+        request_text = data.decode('utf-8', 'replace').strip()
+        serial = request_text.split('=')[1] if request_text.startswith('serial=') else "1005"
+        self.metrics.count("requests", "text")
+        if ',' in serial:
+            self._miss("a batch")
+            return [b"ERROR: batches are not pre-signed"]
+        start = time.perf_counter()
+        serial_num = normalize_serial(serial)
+        span = store.text(serial_num) if serial_num is not None else None
+        self.metrics.observe("lookup", time.perf_counter() - start)
+        if span is None:
+            self._miss(serial)
+            return [f"ERROR: no pre-signed response for serial {serial.strip()}".encode()]
+        log.info("[+] %s:%s  %s  (pre-signed)", address[0], address[1], format_serial(serial_num))
+        return [span]
+    
+    def _http_parts(self, store: ResponseStore, data: bytes, address) -> list:
+        parsed = self._http_request(data, address)
+        if parsed is None:
+            return [http_reply(400, {})]
+        request_der, headers = parsed
+        try:
+            request = ocsp_der.parse_request(request_der)
+        except DERError as e:
+            log.warning("[!] Malformed OCSP request: %s", e)
+            self.metrics.count("errors", "malformed")
+            return [http_reply(200, {"Content-Type": "application/ocsp-response",
+                                     "Cache-Control": "no-store"},
+                               ocsp_der.error_response(ocsp_der.MALFORMED_REQUEST))]
+        start = time.perf_counter()
+        cert_id, span = request.cert_ids[0], None
+        if (len(request.cert_ids) == 1 and cert_id.hash_name == "sha1"
+                and (cert_id.name_hash, cert_id.key_hash) == (store.name_hash, store.key_hash)):
+            span = store.der(cert_id.serial)
+        self.metrics.observe("lookup", time.perf_counter() - start)
+        if span is None:
+            self._miss(f"{len(request.cert_ids)} CertID(s), first {format_serial(cert_id.serial)}")
+            return [http_reply(200, {"Content-Type": "application/ocsp-response",
+                                     "Cache-Control": "no-store"},
+                               ocsp_der.error_response(ocsp_der.UNAUTHORIZED))]
+        
+        etag = f'"{int(store.this_update.timestamp()):x}-{cert_id.serial:x}"'
+        reply_headers = self._cacheable(store.this_update, store.next_update, etag)
+        if not_modified(headers, etag, store.this_update):
+            return [http_reply(304, reply_headers)]
+        return [http_reply(200, reply_headers, length=span[1]), span]
+    
+    def _binary_parts(self, store: ResponseStore, payload: bytes) -> list:
+        self.metrics.count("requests", "binary")
+        try:
+            serial = ocsp_binary.decode_request(payload)
+        except ValueError as e:
+            self.metrics.count("errors", "ValueError")
+            return [ocsp_binary.frame(ocsp_binary.encode_error(str(e)))]
+        start = time.perf_counter()
+        span = store.binary(serial)
+        self.metrics.observe("lookup", time.perf_counter() - start)
+        if span is None:
+            self._miss(format_serial(serial))
+            return [ocsp_binary.frame(ocsp_binary.encode_error("no pre-signed response"))]
+        return [span]
+    
+    def _send(self, client_socket, store: ResponseStore, parts: list):
+        """Write bytes as they are and (offset, length) spans from the store file"""
+        start = time.perf_counter()
+        for part in parts:
+            if type(part) is not tuple:
+                client_socket.sendall(part)
+            elif SENDFILE:
+                client_socket.sendfile(store.file, *part)
+            else:
+                client_socket.sendall(store.read(part))
+        self.metrics.observe("send", time.perf_counter() - start)
+    
+    async def _send_async(self, writer, store: ResponseStore, parts: list):
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        for part in parts:
+            if type(part) is not tuple:
+                writer.write(part)
+            elif SENDFILE:
+                await loop.sendfile(writer.transport, store.file, *part)
+            else:
+                writer.write(store.read(part))
+        await writer.drain()
+        self.metrics.observe("send", time.perf_counter() - start)
+    
+    def handle_client(self, client_socket, address, accepted: Optional[float] = None):
+        self._queued(accepted)
+        try:
+            deadline = time.monotonic() + READ_TIMEOUT
+            client_socket.settimeout(READ_TIMEOUT)
+            data = client_socket.recv(1024)
+            if not data:
+                return
+            if data[:1] == b"\x00":
+                if self._serve_binary(client_socket, address, data):
+                    client_socket = None    # parked, see IdleParker
+                return
+            store = self.db.current
+            if data.startswith(HTTP_METHODS):
+                data = self._recv_http(client_socket, data, deadline)
+                parts = self._http_parts(store, data, address)
+            else:
+                parts = self._text_parts(store, data, address)
+            client_socket.settimeout(WRITE_TIMEOUT)
+            self._send(client_socket, store, parts)
+        except socket.timeout:
+            log.warning("[!] Client %s:%s timed out", address[0], address[1])
+            self.metrics.count("errors", "timeout")
+        except Exception as e:
+            log.warning("[!] Error: %s", e)
+            self.metrics.count("errors", type(e).__name__)
+        finally:
+            if client_socket is not None:
+                client_socket.close()
+    
+    def _serve_binary(self, client_socket, address, buf: bytes,
+                      resumed: bool = False) -> bool:
+        if not resumed:
+            log.info("[+] Binary connection from %s:%s", address[0], address[1])
+        idle = BINARY_PARK_AFTER if self.mode == "thread" else BINARY_IDLE_TIMEOUT
+        client_socket.settimeout(idle)
+        served = 0
+        try:
+            while True:
+                payloads, buf = ocsp_binary.split_frames(buf)
+                if payloads:
+                    store = self.db.current
+                    client_socket.settimeout(WRITE_TIMEOUT)
+                    self._send(client_socket, store,
+                               [part for p in payloads for part in self._binary_parts(store, p)])
+                    client_socket.settimeout(idle)
+                    served += len(payloads)
+                chunk = client_socket.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+        except (socket.timeout, BlockingIOError):
+            if self.mode == "thread" and self._parker.add(client_socket, address, buf):
+                return True
+        log.info("[✓] Binary connection closed after %d responses%s", served,
+                 " since it was parked" if resumed else "")
+        return False
+    
+    async def _handle_stream(self, reader, writer):
+        """Lookups are too cheap to hand to the worker pool: answer inline"""
+        address = writer.get_extra_info('peername') or ("?", 0)
+        accepted = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(reader.read(1024), READ_TIMEOUT)
+            if not data:
+                return
+            if data[:1] == b"\x00":
+                buf = data
+                while True:
+                    payloads, buf = ocsp_binary.split_frames(buf)
+                    if payloads:
+                        store = self.db.current
+                        await asyncio.wait_for(self._send_async(writer, store, [
+                            part for p in payloads for part in self._binary_parts(store, p)]),
+                            WRITE_TIMEOUT)
+                    try:
+                        chunk = await asyncio.wait_for(reader.read(65536), BINARY_IDLE_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        break
+                    if not chunk:
+                        break
+                    buf += chunk
+                return
+            store = self.db.current
+            if data.startswith(HTTP_METHODS):
+                data = await asyncio.wait_for(self._read_http(reader, data),
+                                              READ_TIMEOUT - (time.perf_counter() - accepted))
+                parts = self._http_parts(store, data, address)
+            else:
+                parts = self._text_parts(store, data, address)
+            await asyncio.wait_for(self._send_async(writer, store, parts), WRITE_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning("[!] Client %s:%s timed out", address[0], address[1])
+            self.metrics.count("errors", "timeout")
+        except Exception as e:
+            log.warning("[!] Error: %s", e)
+            self.metrics.count("errors", type(e).__name__)
+        finally:
+            writer.close()
+
+# ============================================================================
+# MULTI-PROCESS SUPERVISOR
+# ============================================================================
+
+class SharedStatusDatabase(CertificateDatabase):
+    """CertificateDatabase view of a supervisor's shared-memory snapshots
+    
+    Lookups bisect the published columns in place. reload() attaches the
+    generation named by the control block and notifies listeners of the
+    serials it changed; index.txt itself is only read by the supervisor.
+    """
+    
+    def __init__(self, control_name: str):
+        self.index_path = control_name
+        self.store = CompactStatusStore()
+        self.generation = 0
+        self._listeners: List[Callable[[int], None]] = []
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watch_thread = None
+        self._control = ControlBlock(control_name)
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._retired: List[StatusSnapshot] = []
+        self.reload()
+    
+    def reload(self, force: bool = False) -> List[int]:
+        """Switch to the newest published generation"""
+        with self._reload_lock:
+            generation, name = self._control.read()
+            if generation == self.generation and not force:
+                return []
+            snapshot = StatusSnapshot.attach(name)
+            old = self.store
+            store = CompactStatusStore(snapshot.serials, snapshot.flags, snapshot.rev_times)
+            if snapshot.previous == self.generation or not self.generation:
+                changed = list(snapshot.changed)
+            else:
+                # Missed a generation: compare the two stores
+                serials = set(old.serials).union(store.serials)
+                changed = [s for s in serials if old.lookup(s) != store.lookup(s)]
+            self.store = store
+            self.generation = snapshot.generation
+            # A lookup that started before the swap may still hold the old
+            # views, so unmap retired snapshots one reload later
+            self._retired = [s for s in self._retired if not s.release()]
+            if self._snapshot is not None:
+                self._retired.append(self._snapshot)
+            self._snapshot = snapshot
+        
+        for serial in changed:
+            for callback in self._listeners:
+                callback(serial)
+        return changed
+    
+    def close(self):
+        self.stop_watching()
+        self.store = CompactStatusStore()
+        for snapshot in self._retired + [self._snapshot]:
+            if snapshot is not None:
+                snapshot.release()
+        self._control.close()
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """Resident, proportional and private memory of a process in KiB (Linux)"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {'rss': fields.get('Rss', 0), 'pss': fields.get('Pss', 0),
+            'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)}
+
+class ResponderSupervisor:
+    """Load the key and index once and fork responder workers that share them
+    
+    The signer is opened before forking, so workers inherit the loaded
+    library instead of loading their own; with liboqs the secret key lives
+    in one shared memory block. The supervisor alone watches index.txt and
+    publishes each new generation of the status store as a shared snapshot
+    (see shared_snapshot.py) that workers attach to without copying. Every
+    worker binds HOST:PORT with SO_REUSEPORT and the kernel spreads incoming
+    connections across them. Dead workers are restarted.
+    """
+    
+    def __init__(self, db: CertificateDatabase, backend: str, processes: int = PROCESSES,
+                 mode: str = SERVE_MODE, threads: int = WORKER_THREADS,
+                 cache_size: int = CACHE_MAX_ENTRIES, metrics_port: int = METRICS_PORT):
+        if not hasattr(socket, "SO_REUSEPORT") or \
+                "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("worker processes need fork() and SO_REUSEPORT (Linux)")
+        if mode not in SERVE_MODES:
+            raise ValueError(f"Unknown serving mode: {mode}")
+        self.db = db
+        self.backend = backend
+        self.processes = processes
+        self.mode = mode
+        self.threads = threads
+        self.cache_size = cache_size
+        self.metrics_port = metrics_port
+        self.signer = None
+        self.control = None
+        self._key_shm = None
+        self._snapshot = None
+        self._published = 0             # generation of self._snapshot
+        self._ctx = multiprocessing.get_context("fork")
+        self._ready = self._ctx.Queue()
+        self._workers: List[multiprocessing.Process] = []
+    
+    def _open_signer(self):
+        if self.backend.partition(":")[0] != "liboqs":
+            self.signer = MLDSA87Signer(self.backend)   # the library holds the key
+            return
+        self._key_shm = shared_memory.SharedMemory(create=True, size=MLDSA87_SK_LEN)
+        self.signer = MLDSA87Signer(self.backend, key_buffer=self._key_shm.buf)
+    
+    def _publish(self, changed: List[int] = ()):
+        """Share the current store as a new generation, then drop the previous one"""
+        store, generation = self.db.store, self.db.generation
+        previous = self._snapshot
+        self._snapshot = publish_snapshot(store.serials, store.flags, store.rev_times,
+                                          generation, self._published, changed)
+        self._published = generation
+        self.control.write(generation, self._snapshot.name)
+        if previous is not None:
+            previous.close()
+            previous.unlink()       # workers that attached keep their mapping
+    
+    def _worker_main(self, index: int, forked: float):
+        db = SharedStatusDatabase(self.control.name)
+        responder = OCSPResponder(db, self.signer, mode=self.mode, workers=self.threads,
+                                  cache_size=self.cache_size,
+                                  metrics_port=self.metrics_port + 1 + index
+                                  if self.metrics_port else 0)
+        responder.reuse_port = True
+        responder.on_listening = lambda: self._ready.put(
+            (index, os.getpid(), time.perf_counter() - forked))
+        try:
+            responder.start()
+        finally:
+            db.close()
+    
+    def _spawn(self, index: int) -> multiprocessing.Process:
+        proc = self._ctx.Process(target=self._worker_main, args=(index, time.perf_counter()),
+                                 name=f"ocsp-worker-{index}", daemon=True)
+        proc.start()
+        return proc
+    
+    def _wait_ready(self, count: int):
+        """Report start-up time and memory of `count` workers as they listen"""
+        for _ in range(count):
+            try:
+                index, pid, elapsed = self._ready.get(timeout=WORKER_READY_TIMEOUT)
+            except queue.Empty:
+                print(f"[!] A worker did not start within {WORKER_READY_TIMEOUT}s")
+                return
+            try:
+                mem = process_memory(pid)
+                usage = (f"rss {mem['rss'] / 1024:.1f} MiB, pss {mem['pss'] / 1024:.1f} MiB, "
+                         f"private {mem['private'] / 1024:.1f} MiB")
+            except OSError:
+                usage = "memory n/a"
+            print(f"[✓] Worker {index} (pid {pid}) listening after "
+                  f"{elapsed * 1000:.1f} ms; {usage}")
+    
+    def start(self):
+        """Share state, fork the workers and supervise until Ctrl+C"""
+        print(f"[*] Starting {self.processes} worker processes ({self.mode} mode)")
+        self._open_signer()
+        self.control = ControlBlock()
+        self._publish()
+        print(f"[*] Shared {len(self.db)} statuses ({self._snapshot.size / 1024:.1f} KiB); "
+              f"signing with {self.signer.spec}")
+        
+        try:
+            self._workers = [self._spawn(i) for i in range(self.processes)]
+            self._wait_ready(self.processes)
+            print(f"\n📡 {self.processes} workers on {HOST}:{PORT} (SO_REUSEPORT)\n")
+            while True:
+                time.sleep(INDEX_POLL_INTERVAL)
+                try:
+                    changed = self.db.reload()
+                except FileNotFoundError:
+                    changed = []    # mid-rename; pick it up on the next poll
+                if changed:
+                    self._publish(changed)
+                    print(f"[*] index.txt changed: {len(changed)} serial(s) updated "
+                          f"(generation {self.db.generation})")
+                for i, proc in enumerate(self._workers):
+                    if not proc.is_alive():
+                        print(f"[!] Worker {i} exited ({proc.exitcode}); restarting")
+                        self._workers[i] = self._spawn(i)
+                        self._wait_ready(1)
+        except KeyboardInterrupt:
+            print("\n[!] Shutting down workers...")
+        finally:
+            self.stop()
+    
+    def stop(self):
+        for proc in self._workers:
+            if proc.is_alive():
+                os.kill(proc.pid, signal.SIGINT)    # workers stop as on Ctrl+C
+        for proc in self._workers:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        if self.signer is not None:
+            self.signer.close()
+        if self._key_shm is not None:
+            self._key_shm.buf[:MLDSA87_SK_LEN] = bytes(MLDSA87_SK_LEN)
+            self._key_shm.close()
+            self._key_shm.unlink()
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot.unlink()
+        if self.control is not None:
+            self.control.close(unlink=True)
+        print("[✓] Supervisor stopped")
+
 # ============================================================================
 # TEST CLIENT
 # ============================================================================
@@ -293,7 +2272,10 @@ def test_client(serial="1005"):
         print(f"[*] Sending: {request}")
         sock.send(request.encode())
         
-        response = sock.recv(4096)
+        # Batch replies ("serial=a,b,c") can exceed one recv()
+        response = b""
+        while chunk := sock.recv(4096):
+            response += chunk
         print(f"[✓] Response received ({len(response)} bytes)")
         print("\n" + response.decode())
         
@@ -302,14 +2284,58 @@ def test_client(serial="1005"):
     except Exception as e:
         print(f"[!] Client error: {e}")
 
+def test_binary_client(serials: List[str], repeat: int = 1):
+    """Query serials over one persistent, pipelined binary connection"""
+    print(f"\n🔍 Binary protocol: {len(serials)} serials x {repeat}")
+    try:
+        query = [normalize_serial(s) for s in serials] * repeat
+        if None in query:
+            raise ValueError("serials must be hex")
+        with ocsp_binary.BinaryOCSPClient(HOST, PORT) as client:
+            start = time.perf_counter()
+            results = client.pipeline(query)
+            elapsed = time.perf_counter() - start
+        for result in results[:len(serials)]:
+            if result['status'] == 'error':
+                print(f"  ERROR: {result['error']}")
+                continue
+            reason = f" ({REASON_NAMES.get(result['reason'], 'Unspecified')})" \
+                if result['status'] == 'revoked' else ""
+            print(f"  {format_serial(result['serial'])}: {result['status'].upper()}{reason}  "
+                  f"signature {len(result['signature'])} bytes")
+        print(f"[✓] {len(results)} responses in {elapsed:.3f}s on one connection")
+    except Exception as e:
+        print(f"[!] Client error: {e}")
+
 # ============================================================================
 # MAIN
 # ============================================================================
 
 def main():
+    parser = argparse.ArgumentParser(description="ML-DSA-87 OCSP responder "
+                                     "(interactive menu when run without options)")
+    parser.add_argument("--build-store", nargs="?", const=RESPONSE_STORE, metavar="PATH",
+                        help="sign every serial's responses into a response store and exit")
+    parser.add_argument("--serve-store", nargs="?", const=RESPONSE_STORE, metavar="PATH",
+                        help="serve a response store: no signer, no index.txt")
+    parser.add_argument("--mode", choices=SERVE_MODES, default=SERVE_MODE,
+                        help=f"serving mode with --serve-store (default: {SERVE_MODE})")
+    parser.add_argument("--workers", type=int, default=PRESIGN_WORKERS,
+                        help="signing processes with --build-store (default: CPU count)")
+    args = parser.parse_args()
+    
     print("\n🔐 PQC Lab - Module 7: ML-DSA-87 OCSP Responder")
     print("=" * 70)
     
+    if args.serve_store:
+        try:
+            responder = PresignedResponder(args.serve_store, mode=args.mode)
+        except (OSError, ValueError) as e:
+            print(f"[✗] Cannot map the response store: {e}")
+            return
+        responder.start()
+        return
+    
     print("[*] Initializing ML-DSA-87 signer...")
     try:
         signer = MLDSA87Signer()
@@ -319,7 +2345,15 @@ def main():
     
     print("[*] Loading certificate database...")
     db = CertificateDatabase(INDEX_TXT)
-    print(f"[✓] Loaded {len(db.certs)} certificates")
+    print(f"[✓] Loaded {len(db)} certificates")
+    
+    if args.build_store:
+        try:
+            OCSPResponder(db, signer, cache_size=0, metrics_port=0).build_store(
+                args.build_store, args.workers)
+        finally:
+            signer.close()
+        return
     
     print("\n🧪 Pre-Testing:")
     for s in ["1000", "1001", "1002", "1003", "1004"]:
@@ -329,18 +2363,47 @@ def main():
     print("\n🔧 Options:")
     print("  1. Start OCSP responder")
     print("  2. Test client")
-    print("  3. Exit")
+    print("  3. Binary client (persistent, pipelined)")
+    print("  4. Load generator")
+    print("  5. Exit")
     
-    choice = input("\nEnter choice (1-3): ").strip()
+    choice = input("\nEnter choice (1-5): ").strip()
     
-    if choice == "1":
-        responder = OCSPResponder(db, signer)
-        responder.start()
-    elif choice == "2":
-        serial = input("Enter serial (default: 1004): ").strip() or "1004"
-        test_client(serial)
-    else:
-        print("Goodbye!")
+    try:
+        if choice == "1":
+            mode = input(f"Serving mode ({'/'.join(SERVE_MODES)}) "
+                         f"[default: {SERVE_MODE}]: ").strip() or SERVE_MODE
+            processes = input(f"Worker processes [default: {PROCESSES}]: ").strip()
+            processes = int(processes) if processes else PROCESSES
+            if processes > 1:
+                ResponderSupervisor(db, signer.spec, processes, mode).start()
+                return
+            responder = OCSPResponder(db, signer, mode=mode)
+            if input("Pre-sign every serial before serving? (y/N): ").strip().lower() == "y":
+                responder.presign()
+            responder.start()
+        elif choice == "2":
+            serial = input("Enter serial, or serials separated by commas "
+                           "(default: 1004): ").strip() or "1004"
+            test_client(serial)
+        elif choice == "3":
+            serials = input("Serials separated by commas (default: 1000,1004,1005): ").strip()
+            repeat = input("Times to repeat the list (default: 100): ").strip()
+            test_binary_client((serials or "1000,1004,1005").split(","),
+                               int(repeat) if repeat else 100)
+        elif choice == "4":
+            protocol = input(f"Protocol ({'/'.join(ocsp_loadgen.PROTOCOLS)}) "
+                             f"[default: text]: ").strip() or "text"
+            concurrency = input("Concurrent connections (default: 50): ").strip()
+            duration = input("Duration in seconds (default: 10): ").strip()
+            summary = ocsp_loadgen.run_load(INDEX_TXT, protocol, HOST, PORT,
+                                            concurrency=int(concurrency or 50),
+                                            duration=float(duration or 10), ca_cert=CA_CERT)
+            ocsp_loadgen.print_summary(summary)
+        else:
+            print("Goodbye!")
+    finally:
+        signer.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
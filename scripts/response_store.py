@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Pre-signed OCSP responses in one memory-mapped file
+
+A batch job signs every serial's responses ahead of time and writes them
+with write_store(); the responder maps the file with ResponseStore and
+answers by looking up the serial and handing the byte range to
+socket.sendfile(), so no request signs, parses index.txt or copies the
+response through Python.
+
+File layout (little-endian, 8-byte aligned columns):
+    header   magic, count, thisUpdate, nextUpdate, data start,
+             SHA-1 issuerNameHash and issuerKeyHash (the CertID they answer)
+    serials  uint64[count]            sorted
+    entries  ENTRY[count]             offset, text, binary and DER lengths
+    data     per serial: text reply | framed binary reply | DER OCSPResponse
+
+The file is written beside its final name and renamed into place, so a
+responder watching the path only ever maps complete stores.
+"""
+
+import os
+import mmap
+import bisect
+import struct
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+STORE_MAGIC = b"OCSPSTR1"
+STORE_HEADER = struct.Struct("<8sQqqQ20s20s")
+ENTRY = struct.Struct("<QIII4x")    # offset, text length, binary length, DER length
+
+class StoreEntry(NamedTuple):
+    serial: int
+    text: bytes             # rendered text-protocol reply
+    binary: bytes           # binary-protocol reply, framed
+    der: bytes              # OCSPResponse for the SHA-1 CertID
+
+def _aligned(n: int) -> int:
+    return (n + 7) & ~7
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+def write_store(path: str, entries: Iterable[StoreEntry], count: int,
+                this_update: datetime, next_update: datetime,
+                name_hash: bytes, key_hash: bytes) -> int:
+    """Stream `count` entries, in ascending serial order, into a new store
+
+    Returns the file size. Nothing replaces `path` unless every entry was
+    written.
+    """
+    index_start = _aligned(STORE_HEADER.size)
+    data_start = index_start + 8 * count + ENTRY.size * count
+    serials, rows = bytearray(8 * count), bytearray(ENTRY.size * count)
+    tmp = path + ".tmp"
+    written = 0
+    try:
+        with open(tmp, "wb") as f:
+            f.seek(data_start)
+            offset, previous = data_start, -1
+            for entry in entries:
+                if written == count:
+                    raise ValueError(f"more than {count} entries")
+                if not previous < entry.serial < 1 << 64:
+                    raise ValueError(f"serial {entry.serial:X} out of order or too large")
+                struct.pack_into("<Q", serials, 8 * written, entry.serial)
+                ENTRY.pack_into(rows, ENTRY.size * written, offset,
+                                len(entry.text), len(entry.binary), len(entry.der))
+                f.write(entry.text)
+                f.write(entry.binary)
+                f.write(entry.der)
+                offset += len(entry.text) + len(entry.binary) + len(entry.der)
+                previous = entry.serial
+                written += 1
+            if written != count:
+                raise ValueError(f"expected {count} entries, got {written}")
+            f.seek(0)
+            f.write(STORE_HEADER.pack(STORE_MAGIC, count, int(this_update.timestamp()),
+                                      int(next_update.timestamp()), data_start,
+                                      name_hash, key_hash).ljust(index_start, b"\0"))
+            f.write(serials)
+            f.write(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return offset
+
+# ============================================================================
+# READING
+# ============================================================================
+
+class ResponseStore:
+    """One mapped store; spans are (file offset, length) for sendfile"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.stat = os.fstat(self.file.fileno())
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.file.close()
+            raise
+        magic, count, this_update, next_update, _, self.name_hash, self.key_hash = \
+            STORE_HEADER.unpack_from(self.map)
+        if magic != STORE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an OCSP response store")
+        self.count = count
+        self.this_update = datetime.fromtimestamp(this_update, timezone.utc)
+        self.next_update = datetime.fromtimestamp(next_update, timezone.utc)
+        index_start = _aligned(STORE_HEADER.size)
+        self.serials = memoryview(self.map)[index_start:index_start + 8 * count].cast('Q')
+        self._entries_start = index_start + 8 * count
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def expired(self) -> bool:
+        return datetime.now(timezone.utc) >= self.next_update
+
+    def _entry(self, serial: int) -> Optional[Tuple[int, int, int, int]]:
+        i = bisect.bisect_left(self.serials, serial)
+        if i == self.count or self.serials[i] != serial:
+            return None
+        return ENTRY.unpack_from(self.map, self._entries_start + ENTRY.size * i)
+
+    def text(self, serial: int) -> Optional[Tuple[int, int]]:
+        entry = self._entry(serial)
+        return entry and (entry[0], entry[1])
+
+    def binary(self, serial: int) -> Optional[Tuple[int, int]]:
+        entry = self._entry(serial)
+        return entry and (entry[0] + entry[1], entry[2])
+
+    def der(self, serial: int) -> Optional[Tuple[int, int]]:
+        entry = self._entry(serial)
+        return entry and (entry[0] + entry[1] + entry[2], entry[3])
+
+    def read(self, span: Tuple[int, int]) -> memoryview:
+        """The bytes of a span, straight from the mapping"""
+        offset, length = span
+        return memoryview(self.map)[offset:offset + length]
+
+    def close(self):
+        if getattr(self, 'serials', None) is not None:
+            self.serials.release()
+        self.map.close()
+        self.file.close()
+
+class WatchedStore:
+    """The current ResponseStore at a path, remapped when the file is replaced
+
+    Stands in for the responder's CertificateDatabase. Requests take
+    `current` once and use it throughout, so a swap never splits one
+    reply across two stores; the old mapping is unmapped once the last
+    of them lets go.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.current = ResponseStore(path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self.current)
+
+    def reload(self) -> bool:
+        """Map the file again if it was replaced; True if it was"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        old = self.current.stat
+        if (st.st_ino, st.st_mtime_ns, st.st_size) == (old.st_ino, old.st_mtime_ns, old.st_size):
+            return False
+        self.current = ResponseStore(self.path)
+        return True
+
+    def _watch_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                if self.reload():
+                    print(f"[*] Response store reloaded: {len(self.current)} serials, "
+                          f"nextUpdate {self.current.next_update:%Y-%m-%d %H:%M}Z")
+            except (OSError, ValueError) as e:
+                print(f"[!] Response store reload failed: {e}")
+
+    def start_watching(self, interval: float = 2.0):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch_loop, args=(interval,),
+                                            daemon=True, name="store-watch")
+            self._thread.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Read-only status snapshots in shared memory, for multi-process responders
+
+A supervisor publishes the status store columns (serials, flags,
+revocation times) into one multiprocessing.shared_memory block per
+generation; workers attach by name and read the columns through
+memoryviews, so N workers hold one copy of the data between them.
+
+Snapshot block (little-endian, 8-byte aligned columns):
+    header   magic, generation, previous generation, rows, changed rows
+    serials  uint64[rows]   sorted
+    times    int64[rows]    revocation epoch (0 if not revoked)
+    changed  uint64[changed] serials that differ from the previous generation
+    flags    uint8[rows]    status << 4 | reason
+
+A small control block names the current snapshot. It is written under a
+sequence counter (odd while a write is in progress), so readers never see
+a generation paired with the wrong name.
+"""
+
+import struct
+from array import array
+from multiprocessing import shared_memory
+from typing import Iterable, Optional, Tuple
+
+SNAPSHOT_MAGIC = b"OCSPSNP1"
+SNAPSHOT_HEADER = struct.Struct("<8sQQQQ")
+CONTROL = struct.Struct("<QQ64s")      # sequence, generation, snapshot name
+
+# ============================================================================
+# SNAPSHOTS
+# ============================================================================
+
+def publish_snapshot(serials, flags, rev_times, generation: int, previous: int = 0,
+                     changed: Iterable[int] = ()) -> shared_memory.SharedMemory:
+    """Copy the columns into a new shared memory block (caller unlinks it)"""
+    if not isinstance(serials, array) or serials.typecode != 'Q':
+        raise ValueError("only 64-bit serial columns can be shared")
+    changed = array('Q', changed)
+    rows = len(serials)
+    size = SNAPSHOT_HEADER.size + 16 * rows + 8 * len(changed) + rows
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    buf = shm.buf
+    SNAPSHOT_HEADER.pack_into(buf, 0, SNAPSHOT_MAGIC, generation, previous, rows, len(changed))
+    pos = SNAPSHOT_HEADER.size
+    for column in (serials, array('q', rev_times), changed, array('B', flags)):
+        raw = memoryview(column).cast('B')
+        buf[pos:pos + len(raw)] = raw
+        pos += len(raw)
+    return shm
+
+class StatusSnapshot:
+    """One attached generation; the columns are views into shared memory"""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        magic, self.generation, self.previous, rows, changed = \
+            SNAPSHOT_HEADER.unpack_from(shm.buf)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{shm.name} is not a status snapshot")
+        pos = SNAPSHOT_HEADER.size
+        self.serials = shm.buf[pos:pos + 8 * rows].cast('Q')
+        pos += 8 * rows
+        self.rev_times = shm.buf[pos:pos + 8 * rows].cast('q')
+        pos += 8 * rows
+        self.changed = shm.buf[pos:pos + 8 * changed].cast('Q')
+        pos += 8 * changed
+        self.flags = shm.buf[pos:pos + rows]
+
+    @classmethod
+    def attach(cls, name: str) -> "StatusSnapshot":
+        return cls(shared_memory.SharedMemory(name=name))
+
+    def release(self) -> bool:
+        """Drop the views and unmap; False while something still uses them"""
+        try:
+            for view in (self.serials, self.rev_times, self.changed, self.flags):
+                view.release()
+            self.shm.close()
+            return True
+        except BufferError:
+            return False
+
+# ============================================================================
+# CONTROL BLOCK
+# ============================================================================
+
+class ControlBlock:
+    """Names the current snapshot generation; one writer, many readers"""
+
+    def __init__(self, name: Optional[str] = None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=CONTROL.size)
+            CONTROL.pack_into(self.shm.buf, 0, 0, 0, b"")
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, generation: int, snapshot_name: str):
+        seq = struct.unpack_from("<Q", self.shm.buf)[0]
+        struct.pack_into("<Q", self.shm.buf, 0, seq + 1)
+        CONTROL.pack_into(self.shm.buf, 0, seq + 1, generation, snapshot_name.encode())
+        struct.pack_into("<Q", self.shm.buf, 0, seq + 2)
+
+    def read(self) -> Tuple[int, str]:
+        """(generation, snapshot name) as last written in full"""
+        while True:
+            before, generation, name = CONTROL.unpack_from(self.shm.buf)
+            after = struct.unpack_from("<Q", self.shm.buf)[0]
+            if before == after and not before & 1:
+                return generation, name.rstrip(b"\0").decode()
+
+    def close(self, unlink: bool = False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
@@ -0,0 +1,1084 @@
+#!/usr/bin/env python3
+"""
+ML-DSA-87 signing backends behind one interface
+
+  liboqs    liboqs shared library: OQS_SIG_new("ML-DSA-87") + OQS_SIG_sign.
+            Every library found is a separate candidate: LIBOQS_PATH
+            (os.pathsep-separated), ctypes.util.find_library("oqs"), and on
+            Windows the oqsprovider DLLs, which export the same OQS_ API
+  openssl   OpenSSL 3 EVP one-shot DigestSign with the PEM key; needs ML-DSA
+            in libcrypto (3.5+) or the oqsprovider module
+  standin   deterministic fake from standin_signer.py, for tests only
+  classical ECDSA or RSA-PSS (SHA-512) through OpenSSL 3 EVP - a component
+            of "composite", not an ML-DSA-87 signer
+  composite ML-DSA-87 + classical composite signature, both components
+            signed concurrently (see CompositeBackend)
+
+Every backend has sign(), verify(), close() and a `spec` string
+("liboqs:/usr/lib/liboqs.so.7") that reopens the same backend elsewhere,
+e.g. in SigningPool worker processes.
+
+sign_mu() signs a FIPS 204 external mu - the 64-byte message
+representative MuHasher computes incrementally - so a message of any size
+(or HashML-DSA's pre-hash) never has to reach the library. Only the
+OpenSSL backend (3.5+, "mu" signature parameter) can; liboqs' OQS_SIG API
+signs whole messages only. sign_with_context() adds a FIPS 204 context
+string (liboqs 0.12+ OQS_SIG_sign_with_ctx_str, OpenSSL "context-string"),
+which composite signatures need for the ML-DSA-87 half.
+
+select_backend() opens every available candidate, checks that it signs
+(and, given the public key, that its signatures verify), times a few
+signatures and keeps the fastest - so an AVX2 liboqs build on
+LIBOQS_PATH wins over a portable one without any configuration.
+"""
+
+import os
+import ctypes
+import ctypes.util
+import base64
+import hashlib
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import c_uint8, c_size_t, c_int, c_ulong, c_void_p, c_char_p, POINTER, byref
+from typing import Iterable, List, Optional, Tuple
+
+from buffer_bridge import borrow
+from ocsp_der import oid
+from standin_signer import StandInSigner
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# ML-DSA-87 parameters (FIPS 204)
+MLDSA87_SK_LEN = 4896
+MLDSA87_PK_LEN = 2592
+MLDSA87_SIG_LEN = 4627
+MLDSA_TR_LEN = 64           # tr = SHAKE256(pk, 64), also bytes 64..127 of sk
+MLDSA_MU_LEN = 64
+MLDSA87_OID = "2.16.840.1.101.3.4.3.19"     # id-ml-dsa-87
+
+# HashML-DSA pre-hash functions: DER-encoded OID, as it enters M'
+PREHASH_OIDS = {
+    "sha512": bytes.fromhex("0609608648016503040203"),
+}
+
+LIBOQS_ENV = "LIBOQS_PATH"
+OPENSSL_ENV = "OPENSSL_LIBCRYPTO"
+
+# Windows lab machines: oqsprovider builds (liboqs statically linked) and
+# the MinGW runtime, including the libcrypto they depend on
+MINGW_BIN = r"C:\Ruby33-x64\msys64\mingw64\bin"
+WINDOWS_OQS_DLLS = (
+    r"C:\oqs-build\oqs-provider\build\lib\oqsprovider.dll",
+    r"C:\Ruby33-x64\msys64\mingw64\lib\ossl-modules\oqsprovider.dll",
+)
+WINDOWS_LIBCRYPTO = os.path.join(MINGW_BIN, "libcrypto-3-x64.dll")
+
+# Names OpenSSL gives an ML-DSA-87 key: 3.5+ natively, then oqsprovider
+OPENSSL_KEY_TYPES = ("ML-DSA-87", "mldsa87")
+# Verify-only keys come from the built-in provider: oqsprovider ignores "mu"
+NATIVE_PROPQ = b"provider=default"
+
+# Classical half of a composite signature: key types OpenSSL may report
+# and the digest both ECDSA and RSA-PSS sign with
+CLASSICAL_KEY_TYPES = ("EC", "RSA")
+CLASSICAL_DIGEST = "SHA512"
+
+# ML-DSA-87 composites, by classical algorithm: OIDs from
+# draft-ietf-lamps-pq-composite-sigs (provisional - check them against the
+# draft revision your verifiers implement). Both components sign
+#   M' = COMPOSITE_PREFIX || Domain || len(ctx) || ctx || SHA-512(M)
+# where Domain is the DER composite OID, and ML-DSA-87 also takes Domain as
+# its FIPS 204 context string.
+COMPOSITE_PREFIX = b"CompositeAlgorithmSignatures2025"
+COMPOSITE_OIDS = {
+    "ECDSA-P384": "1.3.6.1.5.5.7.6.49",     # id-MLDSA87-ECDSA-P384-SHA512
+    "RSA3072-PSS": "1.3.6.1.5.5.7.6.52",    # id-MLDSA87-RSA3072-PSS-SHA512
+    "RSA4096-PSS": "1.3.6.1.5.5.7.6.53",    # id-MLDSA87-RSA4096-PSS-SHA512
+    "ECDSA-P521": "1.3.6.1.5.5.7.6.54",     # id-MLDSA87-ECDSA-P521-SHA512
+}
+COMPOSITE_THREADS = os.cpu_count() or 4     # helper threads signing classical halves
+
+DEFAULT_BACKENDS = ("liboqs", "openssl")    # standin is never picked implicitly
+SELECT_ROUNDS = 20                          # timed signatures per candidate
+SELECT_MESSAGE = b"OCSP|1004|REVOKED|Superseded|20260214021222Z|20260214031222Z"
+
+class BackendUnavailable(Exception):
+    """This backend cannot be used on this machine or with this key"""
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def pem_to_der(data: bytes) -> bytes:
+    if b"-----BEGIN" not in data:
+        return data
+    lines = data.split(b"\n")
+    return base64.b64decode(b"".join(l for l in lines if l and not l.startswith(b"-----")))
+
+def pem_blocks(data: bytes) -> List[bytes]:
+    """Every -----BEGIN ...----- / -----END ...----- block in data"""
+    blocks, start = [], data.find(b"-----BEGIN")
+    while start != -1:
+        end = data.find(b"-----END", start)
+        if end == -1:
+            break
+        end = data.find(b"-----", end + 8) + 5
+        blocks.append(data[start:end] + b"\n")
+        start = data.find(b"-----BEGIN", end)
+    return blocks
+
+def split_composite_key(key_pem: bytes) -> Tuple[bytes, bytes]:
+    """(ML-DSA-87 PEM, classical PEM) from a file holding both private keys"""
+    mldsa, classical = [], []
+    for block in pem_blocks(key_pem):
+        try:
+            extract_mldsa87_key(block)
+            mldsa.append(block)
+        except ValueError:
+            classical.append(block)
+    if len(mldsa) != 1 or len(classical) != 1:
+        raise ValueError(f"A composite key needs one ML-DSA-87 and one classical private key, "
+                         f"found {len(mldsa)} and {len(classical)}")
+    return mldsa[0], classical[0]
+
+def extract_mldsa87_key(key_data: bytes) -> bytes:
+    """Raw 4896-byte ML-DSA-87 secret key from an oqsprovider PKCS#8 key (PEM or DER)
+
+    The key is either one OCTET STRING (04 82 13 20 <4896 bytes>), or a
+    32-byte seed followed by the 4864-byte expanded key.
+    """
+    der = pem_to_der(key_data)
+    idx = der.find(b"\x04\x82\x13\x20")
+    if idx != -1 and len(der) >= idx + 4 + MLDSA87_SK_LEN:
+        return der[idx + 4:idx + 4 + MLDSA87_SK_LEN]
+
+    idx = der.find(b"\x04\x82\x13\x00")
+    if idx != -1:
+        window = der[max(0, idx - 40):idx]
+        seed_pos = window.rfind(b"\x04\x20")
+        if seed_pos != -1:
+            seed_at = max(0, idx - 40) + seed_pos
+            key = der[seed_at + 2:seed_at + 34] + der[idx + 4:idx + 4 + 4864]
+            if len(key) == MLDSA87_SK_LEN:
+                return key
+    raise ValueError(f"Could not find {MLDSA87_SK_LEN}-byte ML-DSA-87 secret key "
+                     f"in {len(der)}-byte key")
+
+def mldsa_tr(public_key: bytes) -> bytes:
+    return hashlib.shake_256(public_key).digest(MLDSA_TR_LEN)
+
+class MuHasher:
+    """Incremental FIPS 204 mu = SHAKE256(tr || M', 64) for external-mu signing
+
+    Feed the message through update() as it is produced; digest() is the
+    mu that sign_mu() takes. Pure ML-DSA hashes M' = 0 || |ctx| || ctx || M;
+    with prehash="sha512" it is HashML-DSA's 1 || |ctx| || ctx || OID ||
+    SHA-512(M), and the signature verifies as HashML-DSA-87 instead.
+    """
+
+    def __init__(self, tr: bytes, prehash: Optional[str] = None, context: bytes = b""):
+        if len(tr) != MLDSA_TR_LEN:
+            raise ValueError(f"Expected a {MLDSA_TR_LEN}-byte tr")
+        if len(context) > 255:
+            raise ValueError("context strings are at most 255 bytes")
+        self._xof = hashlib.shake_256(tr)
+        self._prehash = None
+        if prehash is None:
+            self._xof.update(bytes([0, len(context)]) + context)
+        else:
+            if prehash not in PREHASH_OIDS:
+                raise ValueError(f"Unsupported HashML-DSA pre-hash: {prehash}")
+            self._xof.update(bytes([1, len(context)]) + context + PREHASH_OIDS[prehash])
+            self._prehash = hashlib.new(prehash)
+
+    def update(self, data) -> "MuHasher":
+        (self._prehash or self._xof).update(data)
+        return self
+
+    def digest(self) -> bytes:
+        xof = self._xof.copy()
+        if self._prehash is not None:
+            xof.update(self._prehash.digest())
+        return xof.digest(MLDSA_MU_LEN)
+
+# ============================================================================
+# LIBRARY DISCOVERY
+# ============================================================================
+
+_windows_ready = False
+
+def _prepare_windows():
+    """oqsprovider DLLs need the MinGW runtime on PATH and libcrypto loaded"""
+    global _windows_ready
+    if os.name != "nt" or _windows_ready:
+        return
+    _windows_ready = True
+    os.environ["PATH"] = MINGW_BIN + os.pathsep + os.environ.get("PATH", "")
+    if os.path.exists(WINDOWS_LIBCRYPTO):
+        ctypes.CDLL(WINDOWS_LIBCRYPTO)
+
+def _unique(paths: Iterable[Optional[str]]) -> List[str]:
+    seen = []
+    for path in paths:
+        if path and path not in seen:
+            seen.append(path)
+    return seen
+
+def liboqs_libraries() -> List[str]:
+    """Candidate liboqs libraries, most specific first"""
+    configured = os.environ.get(LIBOQS_ENV, "").split(os.pathsep)
+    windows = [p for p in WINDOWS_OQS_DLLS if os.name == "nt" and os.path.exists(p)]
+    return _unique(configured + [ctypes.util.find_library("oqs")] + windows)
+
+def libcrypto_libraries() -> List[str]:
+    windows = [WINDOWS_LIBCRYPTO] if os.name == "nt" and os.path.exists(WINDOWS_LIBCRYPTO) else []
+    return _unique([os.environ.get(OPENSSL_ENV)] + windows + [ctypes.util.find_library("crypto")])
+
+def _load(library: str) -> ctypes.CDLL:
+    _prepare_windows()
+    try:
+        return ctypes.CDLL(library)
+    except OSError as e:
+        raise BackendUnavailable(f"cannot load {library}: {e}") from e
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class SignerBackend:
+    """sign()/verify()/close() over one implementation of ML-DSA-87"""
+
+    name = "?"
+    algorithm = "ML-DSA-87"
+    algorithm_oid = MLDSA87_OID     # AlgorithmIdentifier for what sign() returns
+
+    def __init__(self, library: Optional[str] = None):
+        self.library = library
+
+    @property
+    def spec(self) -> str:
+        return f"{self.name}:{self.library}" if self.library else self.name
+
+    def sign(self, message: bytes) -> bytes:
+        raise NotImplementedError
+
+    def verify(self, message: bytes, signature: bytes, public_key: Optional[bytes] = None) -> bool:
+        raise NotImplementedError
+
+    def sign_mu(self, mu: bytes) -> bytes:
+        """Sign a 64-byte external mu (see MuHasher)"""
+        raise BackendUnavailable(f"{self.name} cannot sign an external mu")
+
+    def verify_mu(self, mu: bytes, signature: bytes, public_key: bytes) -> bool:
+        """Verify a signature by its 64-byte external mu (see MuHasher)"""
+        raise BackendUnavailable(f"{self.name} cannot verify an external mu")
+
+    context_strings = False     # whether sign_with_context() works
+
+    def sign_with_context(self, message, context: bytes) -> bytes:
+        """Sign with a FIPS 204 context string of at most 255 bytes"""
+        raise BackendUnavailable(f"{self.name} cannot sign with a context string")
+
+    def verify_with_context(self, message, signature: bytes, context: bytes,
+                            public_key: Optional[bytes] = None) -> bool:
+        raise BackendUnavailable(f"{self.name} cannot verify with a context string")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _context(context) -> bytes:
+    context = bytes(context)
+    if len(context) > 255:
+        raise ValueError("context strings are at most 255 bytes")
+    return context
+
+class LibOQSBackend(SignerBackend):
+    """liboqs through ctypes
+
+    The secret key is copied once into a pinned ctypes buffer, and each
+    thread that signs gets its own long-lived OQS_SIG handle and output
+    buffers, so sign() does no per-call setup. `key_buffer` (writable,
+    e.g. shared memory) holds the key instead of a private copy; it is
+    left for its owner to wipe. With no secret key it only verifies.
+    """
+
+    name = "liboqs"
+
+    def __init__(self, secret_key: Optional[bytes], library: str, key_buffer=None):
+        super().__init__(library)
+        if secret_key is not None and len(secret_key) != MLDSA87_SK_LEN:
+            raise ValueError(f"Expected a {MLDSA87_SK_LEN}-byte ML-DSA-87 secret key")
+        self.oqs = _load(library)
+        try:
+            self._setup_functions()
+        except AttributeError as e:
+            raise BackendUnavailable(f"{library} is not liboqs: {e}") from e
+        probe = self.OQS_SIG_new(b"ML-DSA-87")
+        if not probe:
+            raise BackendUnavailable(f"{library} was built without ML-DSA-87")
+        self.OQS_SIG_free(probe)
+        self.key_bytes = secret_key
+        self._owns_key = key_buffer is None
+        if secret_key is None:
+            self._key_buf = None
+        elif key_buffer is None:
+            self._key_buf = (c_uint8 * len(secret_key)).from_buffer_copy(secret_key)
+        else:
+            self._key_buf = (c_uint8 * len(secret_key)).from_buffer(key_buffer)
+            ctypes.memmove(self._key_buf, secret_key, len(secret_key))
+        self._local = threading.local()
+        self._handles = []
+        self._handles_lock = threading.Lock()
+        self._closed = False
+
+    def _setup_functions(self):
+        """Setup OQS API function signatures"""
+        self.OQS_SIG_new = self.oqs.OQS_SIG_new
+        self.OQS_SIG_new.restype = c_void_p
+        self.OQS_SIG_new.argtypes = [c_char_p]
+
+        self.OQS_SIG_free = self.oqs.OQS_SIG_free
+        self.OQS_SIG_free.restype = None
+        self.OQS_SIG_free.argtypes = [c_void_p]
+
+        self.OQS_SIG_sign = self.oqs.OQS_SIG_sign
+        self.OQS_SIG_sign.restype = c_int
+        self.OQS_SIG_sign.argtypes = [c_void_p, POINTER(c_uint8), POINTER(c_size_t),
+                                      c_void_p, c_size_t, POINTER(c_uint8)]
+
+        self.OQS_SIG_verify = self.oqs.OQS_SIG_verify
+        self.OQS_SIG_verify.restype = c_int
+        self.OQS_SIG_verify.argtypes = [c_void_p, c_void_p, c_size_t,
+                                        c_void_p, c_size_t, c_char_p]
+
+        # Context strings arrived in liboqs 0.12
+        self.OQS_SIG_sign_with_ctx_str = getattr(self.oqs, "OQS_SIG_sign_with_ctx_str", None)
+        self.OQS_SIG_verify_with_ctx_str = getattr(self.oqs, "OQS_SIG_verify_with_ctx_str", None)
+        if self.OQS_SIG_sign_with_ctx_str and self.OQS_SIG_verify_with_ctx_str:
+            self.OQS_SIG_sign_with_ctx_str.restype = c_int
+            self.OQS_SIG_sign_with_ctx_str.argtypes = [
+                c_void_p, POINTER(c_uint8), POINTER(c_size_t), c_void_p, c_size_t,
+                c_char_p, c_size_t, POINTER(c_uint8)]
+            self.OQS_SIG_verify_with_ctx_str.restype = c_int
+            self.OQS_SIG_verify_with_ctx_str.argtypes = [
+                c_void_p, c_void_p, c_size_t, c_void_p, c_size_t, c_char_p, c_size_t, c_char_p]
+        else:
+            self.OQS_SIG_sign_with_ctx_str = self.OQS_SIG_verify_with_ctx_str = None
+
+    def _thread_context(self):
+        """Return this thread's (OQS_SIG handle, signature buffer, length)
+
+        Checked on every call: after close() a thread's cached handle is freed.
+        """
+        if self._closed:
+            raise Exception("Signer is closed")
+        ctx = getattr(self._local, 'ctx', None)
+        if ctx is None:
+            sig_obj = self.OQS_SIG_new(b"ML-DSA-87")
+            if not sig_obj:
+                raise Exception("Failed to create ML-DSA-87 signer")
+            with self._handles_lock:
+                self._handles.append(sig_obj)
+            ctx = (sig_obj, (c_uint8 * MLDSA87_SIG_LEN)(), c_size_t())
+            self._local.ctx = ctx
+        return ctx
+
+    def sign(self, message) -> bytes:
+        """Sign any bytes-like message (bytes, bytearray, memoryview, mmap) in place"""
+        return self._sign(message, None)
+
+    def sign_with_context(self, message, context: bytes) -> bytes:
+        self._require_context()
+        return self._sign(message, _context(context))
+
+    @property
+    def context_strings(self) -> bool:
+        return self.OQS_SIG_sign_with_ctx_str is not None
+
+    def _require_context(self):
+        if not self.context_strings:
+            raise BackendUnavailable(f"{self.library} has no OQS_SIG_sign_with_ctx_str "
+                                     f"(context strings need liboqs 0.12+)")
+
+    def _sign(self, message, context: Optional[bytes]) -> bytes:
+        sig_obj, sig_buf, sig_len = self._thread_context()
+        if self._key_buf is None:
+            raise BackendUnavailable("liboqs backend was opened without a secret key")
+        sig_len.value = MLDSA87_SIG_LEN
+
+        with borrow(message) as (msg_ptr, msg_len):
+            if context is None:
+                result = self.OQS_SIG_sign(sig_obj, sig_buf, byref(sig_len),
+                                           msg_ptr, msg_len, self._key_buf)
+            else:
+                result = self.OQS_SIG_sign_with_ctx_str(sig_obj, sig_buf, byref(sig_len),
+                                                        msg_ptr, msg_len, context,
+                                                        len(context), self._key_buf)
+
+        if result != 0:
+            raise Exception(f"Signing failed with code {result}")
+
+        return ctypes.string_at(sig_buf, sig_len.value)
+
+    def verify(self, message: bytes, signature: bytes, public_key: Optional[bytes] = None) -> bool:
+        return self._verify(message, signature, None, public_key)
+
+    def verify_with_context(self, message, signature: bytes, context: bytes,
+                            public_key: Optional[bytes] = None) -> bool:
+        self._require_context()
+        return self._verify(message, signature, _context(context), public_key)
+
+    def _verify(self, message, signature: bytes, context: Optional[bytes],
+                public_key: Optional[bytes]) -> bool:
+        if public_key is None:
+            raise ValueError("liboqs cannot verify without the public key")
+        if len(public_key) != MLDSA87_PK_LEN:
+            raise ValueError(f"Expected a {MLDSA87_PK_LEN}-byte ML-DSA-87 public key")
+        sig_obj, _, _ = self._thread_context()
+        with borrow(message) as (msg_ptr, msg_len), borrow(signature) as (sig_ptr, sig_len):
+            if context is None:
+                return self.OQS_SIG_verify(sig_obj, msg_ptr, msg_len,
+                                           sig_ptr, sig_len, bytes(public_key)) == 0
+            return self.OQS_SIG_verify_with_ctx_str(sig_obj, msg_ptr, msg_len, sig_ptr, sig_len,
+                                                    context, len(context),
+                                                    bytes(public_key)) == 0
+
+    def close(self):
+        """Free every per-thread OQS_SIG handle and wipe the key buffer"""
+        if self._closed:
+            return
+        self._closed = True
+        with self._handles_lock:
+            handles, self._handles = self._handles, []
+        for sig_obj in handles:
+            self.OQS_SIG_free(sig_obj)
+        if self._owns_key and self._key_buf is not None:
+            ctypes.memset(self._key_buf, 0, len(self._key_buf))
+        self._key_buf = None        # also releases the export so the owner can unmap it
+
+class OSSL_PARAM(ctypes.Structure):
+    _fields_ = [("key", c_char_p), ("data_type", ctypes.c_uint), ("data", c_void_p),
+                ("data_size", c_size_t), ("return_size", c_size_t)]
+
+OSSL_PARAM_INTEGER = 1
+OSSL_PARAM_UTF8_STRING = 4
+OSSL_PARAM_OCTET_STRING = 5
+OSSL_PARAM_UNMODIFIED = c_size_t(-1).value
+MU_PROBE_MESSAGE = b"external mu probe"
+
+class OpenSSLBackend(SignerBackend):
+    """OpenSSL 3 EVP_DigestSign with the key loaded from its PEM
+
+    ML-DSA signs the message itself (no digest), which EVP exposes as a
+    one-shot DigestSign with a NULL digest. Each thread keeps its own
+    EVP_MD_CTX. sign_mu() and verify_mu() set the "mu" signature parameter
+    (OpenSSL 3.5+). With no key it only verifies, with the default
+    provider's native ML-DSA-87 - the one that honours "mu".
+    """
+
+    name = "openssl"
+
+    def __init__(self, key_pem: Optional[bytes], library: str, key_types=OPENSSL_KEY_TYPES):
+        super().__init__(library)
+        self.crypto = _load(library)
+        try:
+            self._setup_functions()
+        except AttributeError as e:
+            raise BackendUnavailable(f"{library} is not OpenSSL 3: {e}") from e
+        # Loading any provider explicitly turns off the implicit default one
+        self.OSSL_PROVIDER_load(None, b"default")
+        self.OSSL_PROVIDER_load(None, b"oqsprovider")      # optional before 3.5
+        self._digest = None             # signature parameters, set by ClassicalBackend
+        self._sign_params = None
+        self._propq = None
+        self._mu_flag = c_int(1)
+        self._mu_params = (OSSL_PARAM * 2)(
+            OSSL_PARAM(b"mu", OSSL_PARAM_INTEGER, ctypes.addressof(self._mu_flag),
+                       ctypes.sizeof(c_int), OSSL_PARAM_UNMODIFIED))
+        self._mu_supported = None
+        self._local = threading.local()
+        self._contexts = []
+        self._lock = threading.Lock()
+        self._public_keys = {}
+        self._closed = False
+        if key_pem is None:
+            self._open_verify_only(key_types[0])
+        else:
+            self._open_key(key_pem, key_types)
+
+    def _open_key(self, key_pem: bytes, key_types):
+        bio = self.BIO_new_mem_buf(key_pem, len(key_pem))
+        self.pkey = self.PEM_read_bio_PrivateKey(bio, None, None, None)
+        self.BIO_free(bio)
+        if not self.pkey:
+            raise BackendUnavailable(f"{self.library} cannot read the key (no ML-DSA support?)")
+        self.key_type = next((t for t in key_types if self.EVP_PKEY_is_a(self.pkey, t.encode())),
+                             None)
+        if self.key_type is None:
+            self.EVP_PKEY_free(self.pkey)
+            raise BackendUnavailable(f"key is not {self.algorithm}")
+        self.max_sig_len = self.EVP_PKEY_get_size(self.pkey)
+
+    def _open_verify_only(self, key_type: str):
+        self.pkey = None
+        self.key_type = key_type
+        self._propq = NATIVE_PROPQ
+        probe = self.EVP_PKEY_new_raw_public_key_ex(None, key_type.encode(), self._propq,
+                                                    bytes(MLDSA87_PK_LEN), MLDSA87_PK_LEN)
+        if not probe:
+            self.ERR_get_error()
+            raise BackendUnavailable(f"{self.library} has no native {key_type} (needs OpenSSL 3.5+)")
+        self.EVP_PKEY_free(probe)
+        self.max_sig_len = MLDSA87_SIG_LEN
+        self._mu_supported = True
+
+    def _setup_functions(self):
+        c = self.crypto
+        for name, restype, argtypes in (
+                ("OSSL_PROVIDER_load", c_void_p, [c_void_p, c_char_p]),
+                ("BIO_new_mem_buf", c_void_p, [c_char_p, c_int]),
+                ("BIO_free", c_int, [c_void_p]),
+                ("PEM_read_bio_PrivateKey", c_void_p, [c_void_p, c_void_p, c_void_p, c_void_p]),
+                ("EVP_PKEY_is_a", c_int, [c_void_p, c_char_p]),
+                ("EVP_PKEY_get_size", c_int, [c_void_p]),
+                ("EVP_PKEY_get_bits", c_int, [c_void_p]),
+                ("EVP_PKEY_get_utf8_string_param", c_int,
+                 [c_void_p, c_char_p, c_char_p, c_size_t, POINTER(c_size_t)]),
+                ("i2d_PUBKEY", c_int, [c_void_p, POINTER(c_void_p)]),
+                ("d2i_PUBKEY", c_void_p, [c_void_p, POINTER(c_void_p), ctypes.c_long]),
+                ("EVP_PKEY_get_raw_public_key", c_int,
+                 [c_void_p, POINTER(c_uint8), POINTER(c_size_t)]),
+                ("EVP_PKEY_new_raw_public_key_ex", c_void_p,
+                 [c_void_p, c_char_p, c_char_p, c_char_p, c_size_t]),
+                ("EVP_PKEY_free", None, [c_void_p]),
+                ("EVP_MD_CTX_new", c_void_p, []),
+                ("EVP_MD_CTX_free", None, [c_void_p]),
+                ("EVP_DigestSignInit_ex", c_int,
+                 [c_void_p, c_void_p, c_char_p, c_void_p, c_char_p, c_void_p,
+                  POINTER(OSSL_PARAM)]),
+                ("EVP_DigestSign", c_int,
+                 [c_void_p, POINTER(c_uint8), POINTER(c_size_t), c_void_p, c_size_t]),
+                ("EVP_DigestVerifyInit_ex", c_int,
+                 [c_void_p, c_void_p, c_char_p, c_void_p, c_char_p, c_void_p,
+                  POINTER(OSSL_PARAM)]),
+                ("EVP_DigestVerify", c_int, [c_void_p, c_void_p, c_size_t, c_void_p, c_size_t]),
+                ("ERR_get_error", c_ulong, []),
+        ):
+            fn = getattr(c, name)
+            fn.restype = restype
+            fn.argtypes = argtypes
+            setattr(self, name, fn)
+
+    def _thread_context(self):
+        """Return this thread's (EVP_MD_CTX, signature buffer, length)
+
+        Checked on every call: after close() a thread's cached context is freed.
+        """
+        if self._closed:
+            raise Exception("Signer is closed")
+        ctx = getattr(self._local, 'ctx', None)
+        if ctx is None:
+            md_ctx = self.EVP_MD_CTX_new()
+            if not md_ctx:
+                raise MemoryError("EVP_MD_CTX_new failed")
+            with self._lock:
+                self._contexts.append(md_ctx)
+            ctx = (md_ctx, (c_uint8 * self.max_sig_len)(), c_size_t())
+            self._local.ctx = ctx
+        return ctx
+
+    def sign(self, message) -> bytes:
+        md_ctx, sig_buf, sig_len = self._thread_context()
+        if self.pkey is None:
+            raise BackendUnavailable(f"{self.name} was opened without a key")
+        sig_len.value = self.max_sig_len
+        with borrow(message) as (msg_ptr, msg_len):
+            ok = (self.EVP_DigestSignInit_ex(md_ctx, None, self._digest, None, None, self.pkey,
+                                             self._sign_params) == 1
+                  and self.EVP_DigestSign(md_ctx, sig_buf, byref(sig_len), msg_ptr, msg_len) == 1)
+        if not ok:
+            raise Exception(f"EVP signing failed (error {self.ERR_get_error():#x})")
+        return ctypes.string_at(sig_buf, sig_len.value)
+
+    def public_key(self) -> bytes:
+        size = c_size_t(0)
+        if self.EVP_PKEY_get_raw_public_key(self.pkey, None, byref(size)) != 1:
+            raise Exception(f"cannot export the public key (error {self.ERR_get_error():#x})")
+        buf = (c_uint8 * size.value)()
+        self.EVP_PKEY_get_raw_public_key(self.pkey, buf, byref(size))
+        return bytes(buf[:size.value])
+
+    def _sign_once(self, message, params, what: str) -> bytes:
+        # A context of its own: "mu" or a context string must not leak into sign()
+        md_ctx = self.EVP_MD_CTX_new()
+        if not md_ctx:
+            raise MemoryError("EVP_MD_CTX_new failed")
+        try:
+            sig_buf, sig_len = (c_uint8 * self.max_sig_len)(), c_size_t(self.max_sig_len)
+            with borrow(message) as (msg_ptr, msg_len):
+                ok = (self.EVP_DigestSignInit_ex(md_ctx, None, None, None, None, self.pkey,
+                                                 params) == 1 and
+                      self.EVP_DigestSign(md_ctx, sig_buf, byref(sig_len), msg_ptr, msg_len) == 1)
+            if not ok:
+                raise Exception(f"EVP {what} signing failed (error {self.ERR_get_error():#x})")
+            return ctypes.string_at(sig_buf, sig_len.value)
+        finally:
+            self.EVP_MD_CTX_free(md_ctx)
+
+    def _verify_once(self, message, signature: bytes, pkey, params, what: str) -> bool:
+        md_ctx = self.EVP_MD_CTX_new()
+        if not md_ctx:
+            raise MemoryError("EVP_MD_CTX_new failed")
+        try:
+            if self.EVP_DigestVerifyInit_ex(md_ctx, None, None, None, self._propq, pkey,
+                                            params) != 1:
+                raise Exception(f"EVP {what} verify init failed "
+                                f"(error {self.ERR_get_error():#x})")
+            with borrow(message) as (msg_ptr, msg_len), borrow(signature) as (sig_ptr, sig_len):
+                ok = self.EVP_DigestVerify(md_ctx, sig_ptr, sig_len, msg_ptr, msg_len) == 1
+            self.ERR_get_error()
+            return ok
+        finally:
+            self.EVP_MD_CTX_free(md_ctx)
+
+    def _sign_mu(self, mu: bytes) -> bytes:
+        return self._sign_once(mu, self._mu_params, "external-mu")
+
+    context_strings = True
+
+    @staticmethod
+    def _context_params(context: bytes):
+        """(buffer, OSSL_PARAM array) setting "context-string"; keep both alive"""
+        buf = ctypes.create_string_buffer(context, max(len(context), 1))
+        return buf, (OSSL_PARAM * 2)(
+            OSSL_PARAM(b"context-string", OSSL_PARAM_OCTET_STRING, ctypes.addressof(buf),
+                       len(context), OSSL_PARAM_UNMODIFIED))
+
+    def sign_with_context(self, message, context: bytes) -> bytes:
+        if self._closed:
+            raise Exception("Signer is closed")
+        if self.pkey is None:
+            raise BackendUnavailable(f"{self.name} was opened without a key")
+        buf, params = self._context_params(_context(context))
+        return self._sign_once(message, params, "context-string")
+
+    def verify_with_context(self, message, signature: bytes, context: bytes,
+                            public_key: Optional[bytes] = None) -> bool:
+        if self._closed:
+            raise Exception("Signer is closed")
+        pkey = self.pkey if public_key is None else self._public_pkey(bytes(public_key))
+        buf, params = self._context_params(_context(context))
+        return self._verify_once(message, signature, pkey, params, "context-string")
+
+    def _probe_mu(self) -> bool:
+        """Whether "mu" is honoured: providers that do not know it sign mu
+        as an ordinary message, which would then not verify"""
+        try:
+            tr = mldsa_tr(self.public_key())
+            signature = self._sign_mu(MuHasher(tr).update(MU_PROBE_MESSAGE).digest())
+            return self.verify(MU_PROBE_MESSAGE, signature)
+        except Exception:
+            self.ERR_get_error()
+            return False
+
+    def sign_mu(self, mu: bytes) -> bytes:
+        if self._closed:
+            raise Exception("Signer is closed")
+        if self.pkey is None:
+            raise BackendUnavailable(f"{self.name} was opened without a key")
+        if len(mu) != MLDSA_MU_LEN:
+            raise ValueError(f"Expected a {MLDSA_MU_LEN}-byte mu")
+        if self._mu_supported is None:
+            self._mu_supported = self._probe_mu()
+        if not self._mu_supported:
+            raise BackendUnavailable(f"{self.library} cannot sign an external mu "
+                                     f"(needs OpenSSL 3.5+ ML-DSA)")
+        return self._sign_mu(bytes(mu))
+
+    def verify_mu(self, mu: bytes, signature: bytes, public_key: bytes) -> bool:
+        if self._closed:
+            raise Exception("Signer is closed")
+        if len(mu) != MLDSA_MU_LEN:
+            raise ValueError(f"Expected a {MLDSA_MU_LEN}-byte mu")
+        if self._mu_supported is None:
+            self._mu_supported = self._probe_mu()
+        if not self._mu_supported:
+            raise BackendUnavailable(f"{self.library} cannot verify an external mu "
+                                     f"(needs OpenSSL 3.5+ ML-DSA)")
+        return self._verify_once(bytes(mu), signature, self._public_pkey(bytes(public_key)),
+                                 self._mu_params, "external-mu")
+
+    def _load_public_key(self, public_key: bytes):
+        return self.EVP_PKEY_new_raw_public_key_ex(None, self.key_type.encode(), self._propq,
+                                                   public_key, len(public_key))
+
+    def _public_pkey(self, public_key: bytes):
+        pkey = self._public_keys.get(public_key)
+        if pkey is None:
+            pkey = self._load_public_key(public_key)
+            if not pkey:
+                raise ValueError(f"OpenSSL rejected the {len(public_key)}-byte public key")
+            with self._lock:
+                self._public_keys[public_key] = pkey
+        return pkey
+
+    def verify(self, message: bytes, signature: bytes, public_key: Optional[bytes] = None) -> bool:
+        """Verify against public_key, or against this backend's own key"""
+        md_ctx, _, _ = self._thread_context()
+        pkey = self.pkey if public_key is None else self._public_pkey(bytes(public_key))
+        if self.EVP_DigestVerifyInit_ex(md_ctx, None, self._digest, None, None, pkey,
+                                        self._sign_params) != 1:
+            raise Exception(f"EVP verify init failed (error {self.ERR_get_error():#x})")
+        with borrow(message) as (msg_ptr, msg_len), borrow(signature) as (sig_ptr, sig_len):
+            ok = self.EVP_DigestVerify(md_ctx, sig_ptr, sig_len, msg_ptr, msg_len) == 1
+        self.ERR_get_error()
+        return ok
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            contexts, self._contexts = self._contexts, []
+            public_keys, self._public_keys = list(self._public_keys.values()), {}
+        for md_ctx in contexts:
+            self.EVP_MD_CTX_free(md_ctx)
+        for pkey in public_keys + [self.pkey]:
+            if pkey:
+                self.EVP_PKEY_free(pkey)
+
+# OpenSSL group names of the curves composites pair with ML-DSA
+CURVE_NAMES = {"prime256v1": "P256", "secp384r1": "P384", "secp521r1": "P521"}
+
+class ClassicalBackend(OpenSSLBackend):
+    """ECDSA or RSA-PSS with SHA-512 through OpenSSL 3 EVP
+
+    The classical half of a CompositeBackend. `algorithm` names what the
+    key signs ("ECDSA-P384", "RSA4096-PSS"), which picks the composite OID;
+    public keys are DER SubjectPublicKeyInfo.
+    """
+
+    name = "classical"
+    algorithm = "ECDSA or RSA"
+    algorithm_oid = None
+
+    def __init__(self, key_pem: bytes, library: str):
+        super().__init__(key_pem, library, CLASSICAL_KEY_TYPES)
+        self._digest = CLASSICAL_DIGEST.encode()
+        if self.key_type == "EC":
+            group = ctypes.create_string_buffer(64)
+            if self.EVP_PKEY_get_utf8_string_param(self.pkey, b"group", group, len(group),
+                                                   None) != 1:
+                self.close()
+                raise BackendUnavailable("cannot read the EC key's curve")
+            curve = group.value.decode()
+            self.algorithm = f"ECDSA-{CURVE_NAMES.get(curve, curve)}"
+        else:
+            self.algorithm = f"RSA{self.EVP_PKEY_get_bits(self.pkey)}-PSS"
+            self._pad_mode = ctypes.create_string_buffer(b"pss")
+            self._salt_len = ctypes.create_string_buffer(b"digest")
+            self._sign_params = (OSSL_PARAM * 3)(
+                OSSL_PARAM(b"pad-mode", OSSL_PARAM_UTF8_STRING,
+                           ctypes.addressof(self._pad_mode), 3, OSSL_PARAM_UNMODIFIED),
+                OSSL_PARAM(b"saltlen", OSSL_PARAM_UTF8_STRING,
+                           ctypes.addressof(self._salt_len), 6, OSSL_PARAM_UNMODIFIED))
+
+    sign_mu = SignerBackend.sign_mu
+    verify_mu = SignerBackend.verify_mu
+    context_strings = False
+    sign_with_context = SignerBackend.sign_with_context
+    verify_with_context = SignerBackend.verify_with_context
+
+    def public_key(self) -> bytes:
+        size = self.i2d_PUBKEY(self.pkey, None)
+        buf = ctypes.create_string_buffer(max(size, 0))
+        if size <= 0 or self.i2d_PUBKEY(self.pkey, byref(c_void_p(ctypes.addressof(buf)))) != size:
+            raise Exception(f"cannot export the public key (error {self.ERR_get_error():#x})")
+        return buf.raw
+
+    def _load_public_key(self, public_key: bytes):
+        buf = ctypes.create_string_buffer(public_key, len(public_key))
+        return self.d2i_PUBKEY(None, byref(c_void_p(ctypes.addressof(buf))), len(public_key))
+
+class StandInBackend(SignerBackend):
+    """standin_signer.StandInSigner as a backend - never a real signature"""
+
+    name = "standin"
+
+    def __init__(self):
+        super().__init__()
+        self._signer = StandInSigner()
+
+    def sign(self, message: bytes) -> bytes:
+        return self._signer.sign(message)
+
+    def verify(self, message: bytes, signature: bytes, public_key: Optional[bytes] = None) -> bool:
+        return self._signer.verify(message, signature)
+
+    def sign_mu(self, mu: bytes) -> bytes:
+        return self._signer.sign(mu)
+
+    context_strings = True
+
+    def sign_with_context(self, message, context: bytes) -> bytes:
+        context = _context(context)
+        return self._signer.sign(bytes([len(context)]) + context + bytes(message))
+
+    def verify_with_context(self, message, signature: bytes, context: bytes,
+                            public_key: Optional[bytes] = None) -> bool:
+        context = _context(context)
+        return self._signer.verify(bytes([len(context)]) + context + bytes(message), signature)
+
+class CompositeBackend(SignerBackend):
+    """ML-DSA-87 + ECDSA/RSA composite, both components signed concurrently
+
+    The ML-DSA-87 half is signed on the calling thread while a helper
+    thread signs the classical half. Both are ctypes calls into C, which
+    drop the GIL, so a composite signature takes about as long as the
+    slower component rather than the two added up.
+
+    sign() returns mldsaSig || classicalSig, the draft composite encoding
+    (ML-DSA-87 signatures are a fixed MLDSA87_SIG_LEN bytes), and
+    algorithm_oid is the draft OID for the pair. Both components sign the
+    draft's domain-separated M' (message_representative), ML-DSA-87 with
+    the DER OID as its context string, so the ML-DSA-87 backend must
+    support context strings; the application `context` defaults to empty,
+    as X.509 uses it.
+    """
+
+    name = "composite"
+
+    def __init__(self, pq: SignerBackend, classical: ClassicalBackend,
+                 threads: int = COMPOSITE_THREADS, context: bytes = b""):
+        super().__init__()
+        self.algorithm_oid = COMPOSITE_OIDS.get(classical.algorithm)
+        if self.algorithm_oid is None:
+            raise BackendUnavailable(f"no ML-DSA-87 composite with {classical.algorithm} "
+                                     f"(have {', '.join(COMPOSITE_OIDS)})")
+        if not pq.context_strings:
+            raise BackendUnavailable(f"{pq.spec} cannot sign with a context string, "
+                                     f"which composite ML-DSA-87 needs")
+        self.pq = pq
+        self.classical = classical
+        self.algorithm = f"ML-DSA-87 + {classical.algorithm}"
+        self.domain = oid(self.algorithm_oid)
+        self.context = _context(context)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="composite")
+
+    @property
+    def spec(self) -> str:
+        return f"{self.name}:{self.pq.spec}+{self.classical.spec}"
+
+    def message_representative(self, message) -> bytes:
+        """M' = Prefix || Domain || len(ctx) || ctx || SHA-512(M)"""
+        return (COMPOSITE_PREFIX + self.domain + bytes([len(self.context)]) + self.context +
+                hashlib.sha512(message).digest())
+
+    def sign_components(self, message) -> Tuple[bytes, bytes]:
+        """(ML-DSA-87 signature, classical signature) over M', signed at the same time"""
+        representative = self.message_representative(message)
+        classical = self._executor.submit(self.classical.sign, representative)
+        try:
+            pq_signature = self.pq.sign_with_context(representative, self.domain)
+        finally:
+            classical_signature = classical.result()
+        return pq_signature, classical_signature
+
+    def sign(self, message) -> bytes:
+        return b"".join(self.sign_components(message))
+
+    def verify(self, message: bytes, signature: bytes, public_key: Optional[bytes] = None) -> bool:
+        """Both components must verify: ML-DSA-87 against public_key (as for
+        the other backends), the classical half against this backend's key"""
+        if len(signature) <= MLDSA87_SIG_LEN:
+            return False
+        representative = self.message_representative(message)
+        classical = self._executor.submit(self.classical.verify, representative,
+                                          signature[MLDSA87_SIG_LEN:])
+        try:
+            pq_ok = self.pq.verify_with_context(representative, signature[:MLDSA87_SIG_LEN],
+                                                self.domain, public_key)
+        finally:
+            classical_ok = classical.result()
+        return pq_ok and classical_ok
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pq.close()
+        self.classical.close()
+
+BACKENDS = {
+    "liboqs": LibOQSBackend,
+    "openssl": OpenSSLBackend,
+    "standin": StandInBackend,
+    "classical": ClassicalBackend,
+    "composite": CompositeBackend,
+}
+
+# ============================================================================
+# SELECTION
+# ============================================================================
+
+def _open(name: str, library: Optional[str], key_pem: bytes, key_buffer=None) -> SignerBackend:
+    if name == "liboqs":
+        return LibOQSBackend(extract_mldsa87_key(key_pem), library, key_buffer)
+    if name == "openssl":
+        return OpenSSLBackend(key_pem, library)
+    if name == "standin":
+        return StandInBackend()
+    if name == "classical":
+        return ClassicalBackend(key_pem, library)
+    if name == "composite":
+        return open_composite(library, key_pem, key_buffer)
+    raise ValueError(f"Unknown signing backend: {name}")
+
+def candidates(names: Iterable[str] = DEFAULT_BACKENDS) -> List[tuple]:
+    """(name, library) pairs worth trying, in preference order"""
+    found = []
+    for name in names:
+        if name == "liboqs":
+            found += [(name, lib) for lib in liboqs_libraries()]
+        elif name in ("openssl", "classical"):
+            found += [(name, lib) for lib in libcrypto_libraries()]
+        elif name in BACKENDS:
+            found.append((name, None))
+        else:
+            raise ValueError(f"Unknown signing backend: {name}")
+    return found
+
+def open_backend(spec: str, key_pem: bytes, key_buffer=None) -> SignerBackend:
+    """Open the backend named by a spec: "name" or "name:library"
+
+    A bare name opens the first library of that kind that works. liboqs
+    keeps the secret key in `key_buffer` when one is given.
+    """
+    name, _, library = spec.partition(":")
+    if library or name == "standin":
+        return _open(name, library or None, key_pem, key_buffer)
+    errors = []
+    for _, lib in candidates([name]):
+        try:
+            return _open(name, lib, key_pem, key_buffer)
+        except BackendUnavailable as e:
+            errors.append(str(e))
+    raise BackendUnavailable(f"no usable {name} library" + (f": {'; '.join(errors)}" if errors else ""))
+
+def compose(pq: SignerBackend, classical_pem: bytes,
+            classical_spec: str = "classical") -> CompositeBackend:
+    """Pair an open ML-DSA-87 backend with a classical key; closes pq on failure"""
+    try:
+        classical = open_backend(classical_spec, classical_pem)
+    except BaseException:
+        pq.close()
+        raise
+    try:
+        return CompositeBackend(pq, classical)
+    except BaseException:
+        pq.close()
+        classical.close()
+        raise
+
+def open_composite(components: Optional[str], key_pem: bytes, key_buffer=None) -> CompositeBackend:
+    """CompositeBackend from a PEM file holding both private keys
+
+    `components` is "<ML-DSA-87 spec>+<classical spec>", as
+    CompositeBackend.spec writes it. Without it, the first backend in
+    DEFAULT_BACKENDS that opens signs ML-DSA-87 and the first libcrypto the
+    classical half.
+    """
+    mldsa_pem, classical_pem = split_composite_key(key_pem)
+    pq_spec, _, classical_spec = (components or "").partition("+")
+    if pq_spec:
+        return compose(open_backend(pq_spec, mldsa_pem, key_buffer), classical_pem,
+                       classical_spec or "classical")
+    errors = []
+    for name in DEFAULT_BACKENDS:
+        try:
+            return compose(open_backend(name, mldsa_pem, key_buffer), classical_pem)
+        except BackendUnavailable as e:
+            errors.append(str(e))
+    raise BackendUnavailable("no ML-DSA-87 backend for the composite: " + "; ".join(errors))
+
+def open_verifier(spec: Optional[str] = None) -> SignerBackend:
+    """Open a public-key-only backend
+
+    `spec` is "liboqs" or "liboqs:library" for OQS_SIG_verify, or "openssl"
+    or "openssl:library" for native OpenSSL 3.5+ ML-DSA, which can also
+    verify an external mu (verify_mu). By default the first library found
+    is used.
+    """
+    name, _, library = (spec or "liboqs").partition(":")
+    if name not in ("liboqs", "openssl"):
+        raise ValueError(f"Only liboqs and openssl verify without a key, not {name}")
+    backend, found = ((LibOQSBackend, liboqs_libraries) if name == "liboqs"
+                      else (OpenSSLBackend, libcrypto_libraries))
+    errors = []
+    for lib in [library] if library else found():
+        try:
+            return backend(None, lib)
+        except BackendUnavailable as e:
+            errors.append(str(e))
+    raise BackendUnavailable(f"no usable {name} library" + (f": {'; '.join(errors)}" if errors else ""))
+
+def time_backend(backend: SignerBackend, rounds: int = SELECT_ROUNDS,
+                 message: bytes = SELECT_MESSAGE) -> float:
+    """Median seconds per signature over `rounds` signatures, after a warm-up"""
+    backend.sign(message)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        backend.sign(message)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def select_backend(key_pem: bytes, names: Iterable[str] = DEFAULT_BACKENDS,
+                   public_key: Optional[bytes] = None, rounds: int = SELECT_ROUNDS,
+                   report: bool = True) -> SignerBackend:
+    """Open every available backend, time them, return the fastest
+
+    Candidates that fail to load, sign, or (given public_key) verify their
+    own signature are skipped. Raises BackendUnavailable if none is left.
+    """
+    timed, skipped = [], []
+    for name, library in candidates(names):
+        label = f"{name} ({library})" if library else name
+        try:
+            backend = _open(name, library, key_pem)
+        except (BackendUnavailable, ValueError) as e:
+            skipped.append((label, str(e)))
+            continue
+        try:
+            signature = backend.sign(SELECT_MESSAGE)
+            if public_key is not None and not backend.verify(SELECT_MESSAGE, signature, public_key):
+                raise BackendUnavailable("signature does not verify against the public key")
+            timed.append((time_backend(backend, rounds), label, backend))
+        except Exception as e:
+            backend.close()
+            skipped.append((label, str(e)))
+
+    if report:
+        print(f"[*] Signing backends (median of {rounds} signatures):")
+        for seconds, label, _ in sorted(timed, key=lambda t: t[0]):
+            print(f"      {label:<56} {seconds * 1000:>8.3f} ms")
+        for label, reason in skipped:
+            print(f"      {label:<56} unavailable: {reason}")
+    if not timed:
+        raise BackendUnavailable("no ML-DSA-87 signing backend available")
+
+    seconds, label, best = min(timed, key=lambda t: t[0])
+    for _, _, backend in timed:
+        if backend is not best:
+            backend.close()
+    if report:
+        print(f"[✓] Signing with {label}")
+    return best
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Batch ML-DSA-87 signing across worker processes
+
+A signature is pure CPU work inside liboqs, so a single process signs on
+one core no matter how many threads call it. SigningPool fans a batch of
+messages out to worker processes. Each worker calls `signer_factory()`
+once at start-up (loading the library and secret key there) and then
+signs every message it is handed with the callable it returned.
+
+The factory must be picklable: a module-level function, or a
+functools.partial of one.
+
+    with SigningPool(open_signer, workers=8) as pool:
+        signatures = pool.sign_many(messages)           # ordered list
+        for sig in pool.imap(messages): ...             # ordered stream
+        for i, sig in pool.imap_unordered(messages): ...  # as they finish
+"""
+
+import os
+import multiprocessing
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Messages handed to a worker per round trip; small batches keep the
+# stream responsive, larger ones cut IPC overhead for tiny messages
+MAX_CHUNKSIZE = 32
+
+# ============================================================================
+# WORKER SIDE
+# ============================================================================
+
+_worker_sign: Optional[Callable[[bytes], bytes]] = None
+
+def _init_worker(signer_factory: Callable[[], Callable[[bytes], bytes]]):
+    """Pool initializer: build this worker's signer once"""
+    global _worker_sign
+    _worker_sign = signer_factory()
+
+def _sign(message: bytes) -> bytes:
+    return _worker_sign(message)
+
+def _sign_indexed(item: Tuple[int, bytes]) -> Tuple[int, bytes]:
+    index, message = item
+    return index, _worker_sign(message)
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class SigningPool:
+    """Process pool whose workers each hold a loaded signer"""
+
+    def __init__(self, signer_factory: Callable[[], Callable[[bytes], bytes]],
+                 workers: Optional[int] = None, start_method: Optional[str] = None):
+        self.workers = workers or os.cpu_count() or 1
+        ctx = multiprocessing.get_context(start_method)
+        self._pool = ctx.Pool(self.workers, initializer=_init_worker,
+                              initargs=(signer_factory,))
+
+    def _chunksize(self, messages) -> int:
+        try:
+            count = len(messages)
+        except TypeError:
+            return 1
+        return max(1, min(MAX_CHUNKSIZE, count // (self.workers * 4)))
+
+    def sign_many(self, messages: Iterable[bytes]) -> List[bytes]:
+        """Sign every message; signatures come back in input order"""
+        if not hasattr(messages, '__len__'):
+            messages = list(messages)
+        return self._pool.map(_sign, messages, self._chunksize(messages))
+
+    def imap(self, messages: Iterable[bytes], chunksize: Optional[int] = None) -> Iterator[bytes]:
+        """Stream signatures in input order as they become available"""
+        return self._pool.imap(_sign, messages, chunksize or self._chunksize(messages))
+
+    def imap_unordered(self, messages: Iterable[bytes],
+                       chunksize: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        """Stream (input index, signature) pairs in completion order"""
+        return self._pool.imap_unordered(_sign_indexed, enumerate(messages),
+                                         chunksize or self._chunksize(messages))
+
+    def close(self):
+        """Let queued work finish, then stop the workers"""
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+def sign_many(signer_factory: Callable[[], Callable[[bytes], bytes]],
+              messages: Iterable[bytes], workers: Optional[int] = None) -> List[bytes]:
+    """One-shot helper: start a pool, sign the batch in order, shut it down"""
+    with SigningPool(signer_factory, workers) as pool:
+        return pool.sign_many(messages)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for the ML-DSA-87 signer - benchmarks and dry runs only
+
+Produces ML-DSA-87-sized signatures (4627 bytes) as SHAKE-256 over the
+key and message, so the DER, cache and server paths can be exercised
+and timed on machines without liboqs. The output is NOT a signature:
+anyone can compute it, and no verifier outside this module accepts it.
+
+StandInSigner mirrors MLDSA87Signer (sign/verify/close); it is also the
+"standin" backend in signer_backends.py.
+"""
+
+import hashlib
+
+MLDSA87_SK_LEN = 4896
+MLDSA87_SIG_LEN = 4627
+
+DEFAULT_KEY = hashlib.shake_256(b"pqc-lab stand-in ML-DSA-87 key").digest(MLDSA87_SK_LEN)
+
+def standin_signature(key: bytes, message) -> bytes:
+    xof = hashlib.shake_256(key)
+    xof.update(message)         # any bytes-like object, hashed in place
+    return xof.digest(MLDSA87_SIG_LEN)
+
+class StandInSigner:
+    """Drop-in for MLDSA87Signer with deterministic, insecure output"""
+
+    def __init__(self, key_bytes: bytes = DEFAULT_KEY):
+        self.key_bytes = key_bytes
+
+    def sign(self, message: bytes) -> bytes:
+        return standin_signature(self.key_bytes, message)
+
+    def verify(self, message: bytes, signature: bytes, public_key: bytes = None) -> bool:
+        return signature == standin_signature(self.key_bytes, message)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_standin_signer():
+    """SigningPool factory"""
+    return StandInSigner().sign